@@ -0,0 +1,46 @@
+"""Fake ``az`` and ``gcloud`` for the offline benchmark.
+
+Invoked through the shims in ``benchmarks/fakebin`` (put that directory first
+on PATH). Answers the probes the server runs at startup, returns a padded JSON
+list for read commands and a small success object for everything else, after
+sleeping ``BENCH_CLI_LATENCY_MS``. ``BENCH_CLI_OUTPUT_BYTES`` sets the
+approximate size of list output.
+"""
+
+import json
+import os
+import sys
+import time
+
+READ_VERBS = {"list", "show", "describe", "get-value", "get", "search"}
+
+
+def respond(binary: str, args: list) -> object:
+    words = [arg for arg in args if not arg.startswith("-")]
+    if words[:1] == ["version"]:
+        return {"azure-cli": "2.99.0", "extensions": {}} if binary == "az" else {"Google Cloud SDK": "999.0.0"}
+    if binary == "az" and words[:2] == ["account", "show"]:
+        return {"id": "00000000-0000-0000-0000-000000000000", "name": "bench", "user": {"name": "bench@example.com"}}
+    if binary == "gcloud" and words[:2] == ["auth", "list"]:
+        return [{"account": "bench@example.com", "status": "ACTIVE"}]
+    if binary == "gcloud" and words[:2] == ["config", "get-value"]:
+        return "bench-project"
+    if not READ_VERBS.intersection(words):
+        return {"status": "Succeeded"}
+
+    size = int(os.getenv("BENCH_CLI_OUTPUT_BYTES", "4096"))
+    item = {"name": "resource-0000", "location": "westeurope", "status": "RUNNING", "tags": {}}
+    count = max(1, size // len(json.dumps(item)))
+    return [{**item, "name": f"resource-{i:04d}"} for i in range(count)]
+
+
+def main() -> int:
+    binary, args = sys.argv[1], sys.argv[2:]
+    time.sleep(float(os.getenv("BENCH_CLI_LATENCY_MS", "200")) / 1000)
+    output = respond(binary, args)
+    print(output if isinstance(output, str) else json.dumps(output))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+"""Offline load and latency benchmark for the HTTP API.
+
+Starts the server with the scripted stub model (``benchmarks.stub_model``),
+fake ``az``/``gcloud`` binaries (``benchmarks/fakebin``) and a local MCP stub
+(``benchmarks.mcp_stub``), so runs need no cloud credentials, Bedrock access
+or network. Then drives ``/invoke`` and ``/v1/chat/completions`` (buffered and
+streamed) at a fixed concurrency and reports p50/p95/p99 latency, throughput,
+errors and the server's peak RSS::
+
+    python -m benchmarks.load --concurrency 8 --requests 100
+    python -m benchmarks.load --duration 60 --save-baseline bench-main.json
+    python -m benchmarks.load --duration 60 --baseline bench-main.json
+
+Streamed chat also reports time to first token. ``--url`` benchmarks an
+already running server instead (RSS is then only reported with ``--pid``).
+Requests send ``X-Sky-Agent-Cache: bypass`` unless ``--cache`` is given, so
+the response cache does not turn the run into a cache benchmark.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.stats import summarize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKEBIN = os.path.join(ROOT, "benchmarks", "fakebin")
+ROUTES = ("invoke", "chat", "chat-stream")
+
+# One prompt per execution path: specialist fast path, coordinator handoff,
+# MCP-backed agent and cross-cloud fan-out
+DEFAULT_PROMPTS = [
+    "List the running GKE clusters in project {n}",
+    "Can you take a look at request {n} for me?",
+    "Show open Jira tickets in project OPS, batch {n}",
+    "Compare the compute footprint across AWS, Azure and GCP for team {n}",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, process: subprocess.Popen, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(process.args)} exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+
+
+def rss_kb(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+class RssSampler:
+    """Samples a process's resident set size in the background, keeping the peak."""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.2):
+        self.pid = pid
+        self.interval = interval
+        self.start_kb = rss_kb(pid) if pid else None
+        self.peak_kb = self.start_kb
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            current = rss_kb(self.pid)
+            if current is not None:
+                self.peak_kb = max(self.peak_kb or 0, current)
+
+    def __enter__(self):
+        if self.pid:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+
+
+class BenchServer:
+    """The API server, and the MCP stub it talks to, running on local ports."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.processes: List[subprocess.Popen] = []
+        self.workdir = tempfile.TemporaryDirectory(prefix="sky-agent-bench-")
+        self.url = ""
+        self.pid: Optional[int] = None
+
+    def _spawn(self, name: str, argv: List[str], env: Dict[str, str]) -> subprocess.Popen:
+        log = open(os.path.join(self.workdir.name, f"{name}.log"), "w")
+        process = subprocess.Popen(argv, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        self.processes.append(process)
+        return process
+
+    def __enter__(self):
+        try:
+            self._start()
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def _start(self):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+
+        mcp_port = free_port()
+        mcp = self._spawn("mcp_stub", [sys.executable, "-m", "benchmarks.mcp_stub", "--port", str(mcp_port),
+                           "--latency-ms", str(self.args.mcp_latency_ms)], env)
+        stub = {"transport": "sse", "url": f"http://127.0.0.1:{mcp_port}/sse"}
+        servers_file = os.path.join(self.workdir.name, "servers.json")
+        with open(servers_file, "w", encoding="utf-8") as f:
+            json.dump({"servers": {"atlassian": stub, "github": stub}}, f)
+        wait_for(f"http://127.0.0.1:{mcp_port}/sse", mcp, 30)
+
+        port = free_port()
+        env.update({
+            "PATH": FAKEBIN + os.pathsep + env.get("PATH", ""),
+            "BENCH_PYTHON": sys.executable,
+            "BENCH_CLI_LATENCY_MS": str(self.args.cli_latency_ms),
+            "BENCH_CLI_OUTPUT_BYTES": str(self.args.cli_output_bytes),
+            "SKY_AGENT_MODEL_FACTORY": "benchmarks.stub_model:create_model",
+            "SKY_AGENT_MCP_SERVERS_FILE": servers_file,
+            "SKY_AGENT_DATA_DIR": self.workdir.name,
+            "SKY_AGENT_MCP_SNAPSHOT_DIR": os.path.join(self.workdir.name, "mcp"),
+            "SKY_AGENT_AZURE_WARM_WORKERS": "0",
+            "SKY_AGENT_INVENTORY_ENABLED": "false",
+            # Keep gcloud/az from reading the developer's real configuration
+            "CLOUDSDK_CONFIG": os.path.join(self.workdir.name, "gcloud"),
+            "AZURE_CONFIG_DIR": os.path.join(self.workdir.name, "azure"),
+        })
+        if self.args.model_latency_ms is not None:
+            env["BENCH_MODEL_LATENCY_MS"] = str(self.args.model_latency_ms)
+        server = self._spawn("server", [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1",
+                              "--port", str(port), "--log-level", "warning"], env)
+        self.url = f"http://127.0.0.1:{port}"
+        self.pid = server.pid
+        wait_for(f"{self.url}/ready", server, 120)
+
+    def __exit__(self, *exc):
+        for process in reversed(self.processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.workdir.cleanup()
+
+
+def build_request(base_url: str, route: str, prompt: str, cache: bool) -> urllib.request.Request:
+    headers = {"Content-Type": "application/json"}
+    if not cache:
+        headers["X-Sky-Agent-Cache"] = "bypass"
+    if route == "invoke":
+        url, body = f"{base_url}/invoke", {"prompt": prompt}
+    else:
+        url = f"{base_url}/v1/chat/completions"
+        body = {"model": "sky-agent", "messages": [{"role": "user", "content": prompt}], "stream": route == "chat-stream"}
+    return urllib.request.Request(url, data=json.dumps(body).encode("utf-8"), headers=headers, method="POST")
+
+
+def send(request: urllib.request.Request, timeout: float) -> Tuple[bool, float, Optional[float]]:
+    """Send one request; returns (ok, total ms, time to first streamed token in ms)."""
+    started = time.perf_counter()
+    first_token = None
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            if json.loads(request.data).get("stream"):
+                for line in response:
+                    if first_token is None and line.startswith(b"data: ") and b'"content"' in line:
+                        first_token = (time.perf_counter() - started) * 1000
+                    if line.strip() == b"data: [DONE]":
+                        break
+            else:
+                json.loads(response.read())
+        ok = True
+    except (urllib.error.URLError, OSError, ValueError):
+        ok = False
+    return ok, (time.perf_counter() - started) * 1000, first_token
+
+
+def run_route(base_url: str, route: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Drive one route at the configured concurrency and summarize it."""
+    counter = itertools.count()
+    deadline = time.monotonic() + args.duration if args.duration else None
+    lock = threading.Lock()
+    samples: List[float] = []
+    first_tokens: List[float] = []
+    errors = 0
+
+    def worker():
+        nonlocal errors
+        while True:
+            n = next(counter)
+            if deadline is None and n >= args.requests or deadline is not None and time.monotonic() >= deadline:
+                return
+            prompt = args.prompts[n % len(args.prompts)].format(n=n)
+            ok, elapsed, first_token = send(build_request(base_url, route, prompt, args.cache), args.timeout)
+            with lock:
+                if ok:
+                    samples.append(elapsed)
+                    if first_token is not None:
+                        first_tokens.append(first_token)
+                else:
+                    errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(args.concurrency)]:
+            future.result()
+    wall = time.perf_counter() - started
+
+    report = summarize(samples, errors)
+    report["throughput_rps"] = round(len(samples) / wall, 2) if wall else 0.0
+    if first_tokens:
+        report["first_token"] = summarize(first_tokens, 0)
+    return report
+
+
+def run(base_url: str, pid: Optional[int], args: argparse.Namespace) -> Dict[str, Any]:
+    # One warm-up request per route so imports, MCP sessions and CLI probes are not measured
+    for route in args.routes:
+        send(build_request(base_url, route, args.prompts[0].format(n="warmup"), args.cache), args.timeout)
+
+    results: Dict[str, Any] = {
+        "settings": {
+            "concurrency": args.concurrency,
+            "requests": None if args.duration else args.requests,
+            "duration_s": args.duration,
+            "model_latency_ms": args.model_latency_ms,
+            "cli_latency_ms": args.cli_latency_ms,
+            "mcp_latency_ms": args.mcp_latency_ms,
+        },
+        "routes": {},
+    }
+    with RssSampler(pid) as rss:
+        for route in args.routes:
+            results["routes"][route] = run_route(base_url, route, args)
+    if pid:
+        results["rss_mb"] = {
+            "start": round((rss.start_kb or 0) / 1024, 1),
+            "peak": round((rss.peak_kb or 0) / 1024, 1),
+            "end": round((rss_kb(pid) or 0) / 1024, 1),
+        }
+    return results
+
+
+def delta(current: Optional[float], baseline: Optional[float], lower_is_better: bool = True) -> str:
+    if current is None or not baseline:
+        return ""
+    change = (current - baseline) / baseline
+    better = change < 0 if lower_is_better else change > 0
+    return f" ({change:+.0%}{' better' if better and abs(change) >= 0.01 else ''})"
+
+
+def print_table(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    print(f"{'route':<12} {'n':>6} {'err':>5} {'p50 ms':>16} {'p95 ms':>16} {'p99 ms':>16} {'req/s':>16}")
+    for route, stats in results["routes"].items():
+        base = (baseline or {}).get("routes", {}).get(route, {})
+        cells = [
+            f"{stats.get(key, '-')}{delta(stats.get(key), base.get(key))}" for key in ("p50_ms", "p95_ms", "p99_ms")
+        ]
+        rps = f"{stats['throughput_rps']}{delta(stats['throughput_rps'], base.get('throughput_rps'), lower_is_better=False)}"
+        print(f"{route:<12} {stats['n']:>6} {stats['errors']:>5} {cells[0]:>16} {cells[1]:>16} {cells[2]:>16} {rps:>16}")
+        if "first_token" in stats:
+            first, base_first = stats["first_token"], base.get("first_token", {})
+            cells = [f"{first[key]}{delta(first[key], base_first.get(key))}" for key in ("p50_ms", "p95_ms", "p99_ms")]
+            print(f"{'  1st token':<12} {'':>6} {'':>5} {cells[0]:>16} {cells[1]:>16} {cells[2]:>16}")
+    if "rss_mb" in results:
+        rss = results["rss_mb"]
+        base_peak = (baseline or {}).get("rss_mb", {}).get("peak")
+        print(f"server RSS: start {rss['start']} MB, peak {rss['peak']}{delta(rss['peak'], base_peak)} MB, end {rss['end']} MB")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Benchmark a running server instead of starting one")
+    parser.add_argument("--pid", type=int, help="PID of the --url server, for RSS sampling")
+    parser.add_argument("--route", dest="routes", action="append", choices=ROUTES, help="Route to drive (repeatable, default all)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=50, help="Requests per route")
+    parser.add_argument("--duration", type=float, help="Seconds per route (overrides --requests)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-request timeout in seconds")
+    parser.add_argument("--prompt", dest="prompts", action="append", help="Prompt template, {n} is the request number (repeatable)")
+    parser.add_argument("--cache", action="store_true", help="Allow response cache hits")
+    parser.add_argument("--model-latency-ms", type=float, help="Stub model latency per call (default from the scenario)")
+    parser.add_argument("--cli-latency-ms", type=float, default=200)
+    parser.add_argument("--cli-output-bytes", type=int, default=4096)
+    parser.add_argument("--mcp-latency-ms", type=float, default=50)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    parser.add_argument("--save-baseline", metavar="FILE", help="Write the results to FILE for later comparison")
+    parser.add_argument("--baseline", metavar="FILE", help="Compare against results saved with --save-baseline")
+    args = parser.parse_args(argv)
+    args.routes = args.routes or list(ROUTES)
+    args.prompts = args.prompts or DEFAULT_PROMPTS
+
+    if args.url:
+        results = run(args.url.rstrip("/"), args.pid, args)
+    else:
+        with BenchServer(args) as server:
+            results = run(server.url, server.pid, args)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results, baseline)
+    return 1 if any(stats["errors"] for stats in results["routes"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""Latency of proxied vs direct MCP call paths.
+
+For every server in the MCP servers file that defines a ``proxied`` route,
+opens one session per route, then measures ``list_tools`` and each of the
+server's ``benchmark_calls`` over that kept-alive session::
+
+    python -m benchmarks.mcp_latency --iterations 20
+    python -m benchmarks.mcp_latency --server atlassian --json
+
+Servers without a ``proxied`` route are measured on their configured route
+only.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from mcp import ClientSession
+
+from benchmarks.stats import summarize
+from src.mcp_config import ServerSpec, load_servers
+
+
+async def timed(operation) -> Optional[float]:
+    started = time.perf_counter()
+    try:
+        result = await operation()
+    except Exception:
+        return None
+    if getattr(result, "isError", False) or getattr(result, "is_error", False):
+        return None
+    return (time.perf_counter() - started) * 1000
+
+
+async def measure_route(spec: ServerSpec, calls: List[Dict[str, Any]], iterations: int, warmup: int) -> Dict[str, Any]:
+    """Connect once over one route, then time list_tools and each benchmark call."""
+    report: Dict[str, Any] = {"url": spec.url, "transport": spec.transport}
+    started = time.perf_counter()
+    try:
+        async with spec.transport_factory()() as streams:
+            async with ClientSession(streams[0], streams[1]) as session:
+                await session.initialize()
+                report["connect_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+                operations = {"list_tools": lambda: session.list_tools()}
+                for call in calls:
+                    operations[call["tool"]] = (
+                        lambda call=call: session.call_tool(call["tool"], call.get("arguments") or {})
+                    )
+                for name, operation in operations.items():
+                    for _ in range(warmup):
+                        await timed(operation)
+                    samples = [await timed(operation) for _ in range(iterations)]
+                    ok = [sample for sample in samples if sample is not None]
+                    report[name] = summarize(ok, len(samples) - len(ok))
+    except Exception as e:
+        report["error"] = f"{type(e).__name__}: {e}"
+    return report
+
+
+async def run(servers: Dict[str, ServerSpec], iterations: int, warmup: int) -> Dict[str, Any]:
+    results = {}
+    for name, spec in servers.items():
+        routes = {"direct": spec}
+        if spec.proxied:
+            routes["proxied"] = spec.proxied
+        results[name] = {
+            route: await measure_route(route_spec, spec.benchmark_calls, iterations, warmup)
+            for route, route_spec in routes.items()
+        }
+    return results
+
+
+def print_table(results: Dict[str, Any]):
+    print(f"{'server':<12} {'route':<8} {'operation':<24} {'n':>4} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+    for server, routes in results.items():
+        for route, report in routes.items():
+            if "error" in report:
+                print(f"{server:<12} {route:<8} {'(connect failed)':<24} {report['error']}")
+                continue
+            print(f"{server:<12} {route:<8} {'connect':<24} {1:>4} {0:>4} {report['connect_ms']:>9}")
+            for operation, stats in report.items():
+                if not isinstance(stats, dict):
+                    continue
+                print(
+                    f"{server:<12} {route:<8} {operation:<24} {stats['n']:>4} {stats['errors']:>4} "
+                    f"{stats.get('p50_ms', '-'):>9} {stats.get('p95_ms', '-'):>9} {stats.get('mean_ms', '-'):>9}"
+                )
+        direct, proxied = routes.get("direct", {}), routes.get("proxied", {})
+        for operation, stats in direct.items():
+            other = proxied.get(operation)
+            if isinstance(stats, dict) and isinstance(other, dict) and stats.get("p50_ms") and other.get("p50_ms"):
+                saved = other["p50_ms"] - stats["p50_ms"]
+                print(f"{server:<12} {'':<8} {operation:<24} direct saves {saved:.1f} ms ({saved / other['p50_ms']:.0%}) at p50")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers-file", help="MCP servers file (defaults to SKY_AGENT_MCP_SERVERS_FILE)")
+    parser.add_argument("--server", action="append", help="Only benchmark this server (repeatable)")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    servers = load_servers(args.servers_file)
+    if args.server:
+        servers = {name: spec for name, spec in servers.items() if name in args.server}
+    if not servers:
+        print("No matching MCP servers", file=sys.stderr)
+        return 1
+
+    results = asyncio.run(run(servers, args.iterations, args.warmup))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Local MCP SSE server standing in for the Atlassian and GitHub servers.
+
+Serves the read tools the stub model's default scenario calls, each returning
+a fixed payload after ``--latency-ms``::
+
+    python -m benchmarks.mcp_stub --port 9100 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import List, Optional
+
+try:
+    from mcp.server.mcpserver import MCPServer
+except ImportError:  # mcp 1.x
+    from mcp.server.fastmcp import FastMCP as MCPServer
+
+
+def create_server(host: str, port: int, latency_ms: float, items: int):
+    try:
+        server = MCPServer("bench-stub")
+    except TypeError:
+        server = MCPServer("bench-stub", host=host, port=port)
+
+    async def payload(kind: str) -> str:
+        await asyncio.sleep(latency_ms / 1000)
+        return json.dumps([{"id": f"{kind}-{i}", "title": f"Stub {kind} {i}", "status": "Open"} for i in range(items)])
+
+    @server.tool()
+    async def jira_search(jql: str, limit: int = 10) -> str:
+        return await payload("issue")
+
+    @server.tool()
+    async def jira_get_issue(issue_key: str) -> str:
+        return await payload("issue")
+
+    @server.tool()
+    async def confluence_search(query: str, limit: int = 10) -> str:
+        return await payload("page")
+
+    @server.tool()
+    async def get_me() -> str:
+        return json.dumps({"login": "bench"})
+
+    @server.tool()
+    async def search_repositories(query: str) -> str:
+        return await payload("repo")
+
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--items", type=int, default=20, help="Results returned by search tools")
+    args = parser.parse_args(argv)
+
+    server = create_server(args.host, args.port, args.latency_ms, args.items)
+    try:
+        server.run("sse", host=args.host, port=args.port)
+    except TypeError:
+        server.run("sse")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""Latency summaries shared by the benchmark scripts."""
+
+import statistics
+from typing import Any, Dict, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float], errors: int) -> Dict[str, Any]:
+    """Count, error count and p50/p95/p99/mean of millisecond samples."""
+    if not samples:
+        return {"n": 0, "errors": errors}
+    return {
+        "n": len(samples),
+        "errors": errors,
+        "p50_ms": round(percentile(samples, 50), 1),
+        "p95_ms": round(percentile(samples, 95), 1),
+        "p99_ms": round(percentile(samples, 99), 1),
+        "mean_ms": round(statistics.fmean(samples), 1),
+    }
@@ -0,0 +1,156 @@
+"""Deterministic stub model that scripts each agent's tool calls and handoffs.
+
+Used by the load benchmark in place of Bedrock::
+
+    SKY_AGENT_MODEL_FACTORY=benchmarks.stub_model:create_model
+
+Each agent follows a script of steps from the scenario (``BENCH_SCENARIO``, a
+JSON file, or ``DEFAULT_SCENARIO``). A step calls a tool (handoffs are the
+swarm's ``handoff_to_agent`` tool, fan-out plans the ``FanOutPlan``
+structured-output tool); once the script is used up the agent answers with
+text. The step is derived from the conversation (tool results since the last
+user message), so the same model instance can serve any number of runs. The
+stub summarizer records how many steps a summary replaced, so context
+management does not restart an agent's script.
+
+Every model call sleeps ``model_latency_ms`` (``BENCH_MODEL_LATENCY_MS``
+overrides it) before the first token and streams the answer in
+``text_chunks`` deltas, so runs cost realistic wall time without any
+CPU-bound work.
+"""
+
+import asyncio
+import json
+import os
+import re
+import uuid
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from strands.models.model import Model
+
+DEFAULT_SCENARIO: Dict[str, Any] = {
+    "model_latency_ms": 150,
+    "text_chunks": 20,
+    "answer_bytes": 1500,
+    "agents": {
+        "sky_agent": [
+            {"tool": "handoff_to_agent", "input": {"agent_name": "gcp_agent", "message": "Handle this GCP request"}},
+        ],
+        "gcp_agent": [
+            {"tool": "use_gcp", "input": {"command": "container clusters list"}},
+        ],
+        "azure_agent": [
+            {"tool": "use_azure", "input": {"command": "vm list"}},
+        ],
+        "aws_agent": [],
+        "atlassian_agent": [
+            {"tool": "jira_search", "input": {"jql": "project = OPS AND status = Open", "limit": 10}},
+        ],
+        "coding_agent": [
+            {"tool": "search_repositories", "input": {"query": "sky-agent"}},
+        ],
+        "planner_agent": [
+            {"tool": "FanOutPlan", "input": {
+                "independent": True,
+                "tasks": [
+                    {"agent": "aws_agent", "task": "Summarize the compute footprint"},
+                    {"agent": "azure_agent", "task": "Summarize the compute footprint"},
+                    {"agent": "gcp_agent", "task": "Summarize the compute footprint"},
+                ],
+            }},
+        ],
+        "merge_agent": [],
+    },
+}
+
+
+@lru_cache(maxsize=1)
+def load_scenario() -> Dict[str, Any]:
+    scenario = dict(DEFAULT_SCENARIO)
+    path = os.getenv("BENCH_SCENARIO")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            scenario.update(json.load(f))
+    if os.getenv("BENCH_MODEL_LATENCY_MS"):
+        scenario["model_latency_ms"] = float(os.environ["BENCH_MODEL_LATENCY_MS"])
+    return scenario
+
+
+SUMMARIZER = "summarizer_agent"
+STEPS_MARK = re.compile(r"\[steps:(\d+)\]")
+
+
+def _step_index(messages: List[Dict[str, Any]]) -> int:
+    """Number of tool calls the agent has already made in its current turn."""
+    steps = 0
+    for message in reversed(messages):
+        blocks = message.get("content") or []
+        if message.get("role") == "user" and not any("toolResult" in block for block in blocks):
+            # A summary of earlier history carries the number of steps it replaced
+            text = " ".join(block.get("text", "") for block in blocks)
+            summarized = STEPS_MARK.search(text)
+            if summarized:
+                steps += int(summarized.group(1))
+                continue
+            break
+        if message.get("role") == "assistant":
+            steps += sum(1 for block in blocks if "toolUse" in block)
+    return steps
+
+
+class ScriptedModel(Model):
+    """Plays back one agent's script from the scenario."""
+
+    def __init__(self, agent_name: str, scenario: Optional[Dict[str, Any]] = None):
+        self.agent_name = agent_name
+        self.scenario = scenario or load_scenario()
+        self.config: Dict[str, Any] = {"model_id": f"stub:{agent_name}"}
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        script = self.scenario["agents"].get(self.agent_name, [])
+        data = next((step["input"] for step in script if step.get("tool") == output_model.__name__), {})
+        yield {"output": output_model.model_validate(data)}
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs) -> AsyncGenerator[Dict[str, Any], None]:
+        await asyncio.sleep(self.scenario["model_latency_ms"] / 1000)
+        available = {spec["name"] for spec in tool_specs or []}
+        script = [step for step in self.scenario["agents"].get(self.agent_name, []) if step.get("tool") in available]
+        index = _step_index(messages)
+        input_tokens = sum(len(json.dumps(message)) for message in messages) // 4
+
+        yield {"messageStart": {"role": "assistant"}}
+        if index < len(script):
+            step = script[index]
+            yield {"contentBlockStart": {"start": {"toolUse": {"name": step["tool"], "toolUseId": f"stub-{uuid.uuid4().hex}"}}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(step.get("input") or {})}}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "tool_use"}}
+            output_tokens = 20
+        else:
+            answer = f"{self.agent_name}: done. " + "x" * max(0, self.scenario["answer_bytes"])
+            if self.agent_name == SUMMARIZER:
+                answer = f"{self.agent_name}: summary [steps:{_step_index(messages[:-1]) if messages else 0}]"
+            chunks = max(1, self.scenario["text_chunks"])
+            size = -(-len(answer) // chunks)
+            for start in range(0, len(answer), size):
+                yield {"contentBlockDelta": {"delta": {"text": answer[start:start + size]}}}
+                await asyncio.sleep(0)
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+            output_tokens = len(answer) // 4
+        yield {"metadata": {
+            "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens, "totalTokens": input_tokens + output_tokens},
+            "metrics": {"latencyMs": self.scenario["model_latency_ms"]},
+        }}
+
+
+def create_model(agent_name: str) -> ScriptedModel:
+    """Model factory for SKY_AGENT_MODEL_FACTORY."""
+    return ScriptedModel(agent_name)
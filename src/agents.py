@@ -0,0 +1,164 @@
+"""Agent factory for the sky-agent swarm.
+
+Strands ``Agent`` instances keep their conversation in ``messages`` and are not
+safe to share between concurrent runs, so every run builds its own set of
+agents (and its own ``Swarm``) from this factory.
+"""
+
+import copy
+import importlib
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Any
+from strands import Agent
+from strands.multiagent import Swarm
+from strands_tools import use_aws
+from src.context import create_context_manager
+from src.metrics import metrics_hook
+from src.tool_audit import ToolAuditHook
+from src.token_usage import token_budget_hook
+from src.cancellation import cancellation_hook
+from src.tools.claude_code import claude_code
+from src.tools.inventory_search import inventory_search
+from src.tools.use_gcp import use_gcp, use_gcp_batch, gcp_query_all_projects, gcp_auth_status, gcp_set_project, gcp_project_info
+from src.tools.use_azure import use_azure, use_azure_batch, azure_query_all_subscriptions, azure_auth_status, azure_set_subscription, azure_subscription_info, azure_list_subscriptions, azure_set_location
+from src.prompts.sky_agent import SKY_AGENT_PROMPT
+from src.prompts.aws_agent import AWS_AGENT_PROMPT
+from src.prompts.azure_agent import AZURE_AGENT_PROMPT
+from src.prompts.gcp_agent import GCP_AGENT_PROMPT
+from src.prompts.coding_agent import CODING_AGENT_PROMPT
+from src.prompts.atlassian_agent import ATLASSIAN_AGENT_PROMPT
+from src.prompts.summarizer_agent import SUMMARIZER_AGENT_PROMPT
+from src import config
+
+COORDINATOR = "sky_agent"
+
+tool_audit_hook = ToolAuditHook()
+
+
+@lru_cache(maxsize=1)
+def _model_factory():
+    if not config.MODEL_FACTORY:
+        return None
+    module, _, name = config.MODEL_FACTORY.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def model_for(agent_name: str) -> Optional[Any]:
+    """Model for an agent from SKY_AGENT_MODEL_FACTORY, or None for the strands default."""
+    factory = _model_factory()
+    return factory(agent_name) if factory is not None else None
+
+
+def _summarizer() -> Agent:
+    return Agent(
+        name="summarizer_agent",
+        model=model_for("summarizer_agent"),
+        system_prompt=SUMMARIZER_AGENT_PROMPT,
+        callback_handler=None,
+    )
+
+
+def context_manager_for(agent_name: str) -> Optional[Any]:
+    """Conversation manager for an agent from its SKY_AGENT_CONTEXT_POLICY, or None for the strands default."""
+    return create_context_manager(agent_name, summarizer=_summarizer)
+
+
+def create_agents(mcp_tools: Mapping[str, List[Any]], messages: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Agent]:
+    """
+    Create a fresh set of specialist agents.
+
+    Args:
+        mcp_tools: MCP tools keyed by server name ("atlassian", "github")
+        messages: Prior conversation to seed every agent with
+
+    Returns:
+        Agents keyed by agent name
+    """
+    agents = [
+        Agent(
+            name="sky_agent",
+            model=model_for("sky_agent"),
+            conversation_manager=context_manager_for("sky_agent"),
+            system_prompt=SKY_AGENT_PROMPT,
+        ),
+        Agent(
+            name="aws_agent",
+            model=model_for("aws_agent"),
+            conversation_manager=context_manager_for("aws_agent"),
+            system_prompt=AWS_AGENT_PROMPT,
+            tools=[use_aws, inventory_search]
+        ),
+        Agent(
+            name="azure_agent",
+            model=model_for("azure_agent"),
+            conversation_manager=context_manager_for("azure_agent"),
+            system_prompt=AZURE_AGENT_PROMPT,
+            tools=[use_azure, use_azure_batch, azure_query_all_subscriptions, azure_auth_status, azure_set_subscription, azure_subscription_info, azure_list_subscriptions, azure_set_location, inventory_search]
+        ),
+        Agent(
+            name="gcp_agent",
+            model=model_for("gcp_agent"),
+            conversation_manager=context_manager_for("gcp_agent"),
+            system_prompt=GCP_AGENT_PROMPT,
+            tools=[use_gcp, use_gcp_batch, gcp_query_all_projects, gcp_auth_status, gcp_set_project, gcp_project_info, inventory_search]
+        ),
+        Agent(
+            name="coding_agent",
+            model=model_for("coding_agent"),
+            conversation_manager=context_manager_for("coding_agent"),
+            system_prompt=CODING_AGENT_PROMPT,
+            tools=[claude_code, mcp_tools.get("github", [])]
+        ),
+        # Atlassian agent with MCP tools
+        Agent(
+            name="atlassian_agent",
+            model=model_for("atlassian_agent"),
+            conversation_manager=context_manager_for("atlassian_agent"),
+            system_prompt=ATLASSIAN_AGENT_PROMPT,
+            tools=[mcp_tools.get("atlassian", [])]
+        ),
+    ]
+    for agent in agents:
+        # Lets a run find out whether any of its tool calls changed state
+        agent.hooks.add_hook(tool_audit_hook)
+        agent.hooks.add_hook(metrics_hook)
+        agent.hooks.add_hook(token_budget_hook)
+        agent.hooks.add_hook(cancellation_hook)
+        if messages:
+            agent.messages = copy.deepcopy(messages)
+    return {agent.name: agent for agent in agents}
+
+
+def create_swarm(
+    mcp_tools: Mapping[str, List[Any]],
+    entry_point: Optional[str] = None,
+    messages: Optional[List[Dict[str, Any]]] = None
+) -> Swarm:
+    """
+    Create a new swarm with a fresh set of agents.
+
+    Args:
+        mcp_tools: MCP tools keyed by server name
+        entry_point: Name of the agent to start with (defaults to the coordinator)
+        messages: Prior conversation to seed every agent with
+
+    Returns:
+        A swarm that is owned by a single run (or a single conversation session)
+    """
+    agents = create_agents(mcp_tools, messages=messages)
+    return Swarm(
+        list(agents.values()),
+        entry_point=agents[entry_point or COORDINATOR],  # Start with the coordinator
+        max_handoffs=20,
+        max_iterations=20,
+        execution_timeout=3600.0,  # 60 minutes
+        node_timeout=3600.0,       # 60 minutes per agent
+        repetitive_handoff_detection_window=8,  # There must be >= 3 unique agents in the last 8 handoffs
+        repetitive_handoff_min_unique_agents=3,
+        hooks=[cancellation_hook]  # A cancelled run stops before its next handoff
+    )
+
+
+def set_entry_point(swarm: Swarm, agent_name: Optional[str] = None):
+    """Make the next run of a swarm start at agent_name (the coordinator when None)."""
+    swarm.entry_point = swarm.nodes[agent_name or COORDINATOR].executor
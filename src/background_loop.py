@@ -0,0 +1,64 @@
+"""Dedicated asyncio event loop running on a daemon thread.
+
+Strands runs synchronous tools on worker threads, each of which may or may
+not have an event loop of its own. Async infrastructure that has to be shared
+across those threads (subprocess limiters, long-lived SDK clients) lives on a
+single background loop instead, and synchronous callers submit coroutines to it.
+
+A caller that belongs to a run has its coroutine cancelled when the run is
+cancelled, so the work it started on the loop is interrupted rather than left
+running for nobody.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Optional
+
+from src import cancellation
+
+
+class BackgroundLoop:
+    """An event loop on its own thread that accepts coroutines from any thread."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The background loop, started on first use."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name=self.name, daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    @property
+    def started(self) -> bool:
+        return self._loop is not None
+
+    def submit(self, coro: Awaitable[Any]):
+        """Schedule a coroutine on the loop and return a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the loop and block until it finishes.
+
+        Raises:
+            RunCancelledError: When the caller's run is cancelled first
+        """
+        future = self.submit(coro)
+        run_cancellation = cancellation.current()
+        if run_cancellation is None:
+            return future.result(timeout)
+        unregister = run_cancellation.on_cancel(future.cancel)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.CancelledError:
+            raise cancellation.RunCancelledError(run_cancellation.message())
+        finally:
+            unregister()
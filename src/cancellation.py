@@ -0,0 +1,159 @@
+"""Cooperative cancellation of runs.
+
+A run that nobody waits for any more (the HTTP client disconnected, its job
+was deleted, the server is shutting down) should stop consuming workers,
+model quota and cloud API calls. A run carries a ``Cancellation``; once it is
+cancelled:
+
+- ``CancellationHook`` stops the swarm or graph before its next node (no more
+  handoffs), skips further model calls and refuses further tool calls;
+- work already in flight is interrupted through the callbacks registered with
+  ``on_cancel``: synchronous tools waiting on a background loop (``az`` and
+  ``gcloud`` subprocesses, Claude Code prompts) have their coroutine cancelled,
+  which kills the CLI process group or closes the Claude Code client.
+
+The cancellation travels with the run in its invocation state (for hooks) and
+in a context variable (for tools, which run on threads that inherit the run's
+context).
+"""
+
+import contextvars
+import itertools
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from strands.hooks import BeforeModelCallEvent, BeforeNodeCallEvent, BeforeToolCallEvent, HookProvider, HookRegistry
+
+from src.metrics import CANCELLATIONS, CANCELLED_OPERATIONS
+
+logger = logging.getLogger(__name__)
+
+INVOCATION_STATE_KEY = "cancellation"
+
+# Reasons a run is cancelled, as reported in metrics
+CLIENT_DISCONNECTED = "client_disconnected"
+JOB_CANCELLED = "job_cancelled"
+SHUTDOWN = "shutdown"
+
+_current: contextvars.ContextVar[Optional["Cancellation"]] = contextvars.ContextVar("sky_agent_cancellation", default=None)
+
+
+class RunCancelledError(Exception):
+    """Raised when work is abandoned because its run was cancelled."""
+
+
+class Cancellation:
+    """Cancellation state of one run, and the clean-up callbacks of its in-flight work."""
+
+    def __init__(self):
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._callbacks: Dict[int, Callable[[], Any]] = {}
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str) -> bool:
+        """
+        Cancel the run and interrupt its in-flight work.
+
+        Args:
+            reason: Why the run is cancelled (one of the reason constants)
+
+        Returns:
+            True if this call cancelled the run, False if it was already cancelled
+        """
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        logger.info(f"Cancelling run ({reason}), interrupting {len(callbacks)} operations in flight")
+        CANCELLATIONS.labels(reason).inc()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Error interrupting cancelled work: {str(e)}")
+        return True
+
+    def on_cancel(self, callback: Callable[[], Any]) -> Callable[[], None]:
+        """
+        Call ``callback`` when the run is cancelled (at once if it already is).
+
+        Returns:
+            A function that unregisters the callback once the work has finished
+        """
+        with self._lock:
+            if not self._event.is_set():
+                callback_id = next(self._ids)
+                self._callbacks[callback_id] = callback
+                return lambda: self._callbacks.pop(callback_id, None)
+        callback()
+        return lambda: None
+
+    def message(self) -> str:
+        return f"Cancelled: {(self.reason or 'cancelled').replace('_', ' ')}."
+
+    def invocation_state(self) -> Dict[str, Any]:
+        """Invocation state to pass to a swarm or graph run so its hooks see this cancellation."""
+        return {INVOCATION_STATE_KEY: self}
+
+    @contextmanager
+    def active(self) -> Iterator["Cancellation"]:
+        """Make this the current cancellation for code (and tool threads) started inside the block."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+def current() -> Optional[Cancellation]:
+    """Cancellation of the run the calling code belongs to, if any."""
+    return _current.get()
+
+
+def _from_state(invocation_state: Optional[Dict[str, Any]]) -> Optional[Cancellation]:
+    cancellation = (invocation_state or {}).get(INVOCATION_STATE_KEY)
+    return cancellation if cancellation is not None and cancellation.cancelled else None
+
+
+class CancellationHook(HookProvider):
+    """Stops cancelled runs at the next node, model call or tool call."""
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeNodeCallEvent, self.before_node_call)
+        registry.add_callback(BeforeModelCallEvent, self.before_model_call)
+        registry.add_callback(BeforeToolCallEvent, self.before_tool_call)
+
+    @staticmethod
+    def before_node_call(event: BeforeNodeCallEvent) -> None:
+        cancellation = _from_state(event.invocation_state)
+        if cancellation is not None:
+            CANCELLED_OPERATIONS.labels("node").inc()
+            event.cancel_node = cancellation.message()
+
+    @staticmethod
+    def before_model_call(event: BeforeModelCallEvent) -> None:
+        cancellation = _from_state(event.invocation_state)
+        if cancellation is not None:
+            CANCELLED_OPERATIONS.labels("model_call").inc()
+            event.cancel = cancellation.message()
+
+    @staticmethod
+    def before_tool_call(event: BeforeToolCallEvent) -> None:
+        cancellation = _from_state(event.invocation_state)
+        if cancellation is not None:
+            CANCELLED_OPERATIONS.labels("tool_call").inc()
+            event.cancel_tool = cancellation.message()
+
+
+cancellation_hook = CancellationHook()
@@ -3,42 +3,207 @@
 Continuous Chat Interface for Sky Agent
 
 This script provides a command-line chat interface to interact with the
-Sky Agent running on localhost:8000.
+Sky Agent running on localhost:8000. Each message runs as a server-side job
+(POST /jobs) whose progress is followed over server-sent events, so long runs
+survive dropped connections, and the agents' output is printed as it arrives.
+
+The client is asynchronous (httpx) and reuses its keep-alive connections.
+With ``--batch prompts.jsonl`` it runs many prompts concurrently instead of
+chatting and writes one JSON line per prompt with its answer and latency,
+e.g. for scheduled operational checks.
 """
 
-import requests
+import argparse
+import asyncio
+import itertools
 import json
 import sys
-from typing import Dict, Any
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, TextIO, Tuple
+
+import httpx
 
 
 class AgentChatClient:
-    def __init__(self, base_url: str = "http://127.0.0.1:8000"):
+    def __init__(self, base_url: str = "http://127.0.0.1:8000", max_reconnects: int = 10, max_connections: int = 10):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({"Content-Type": "application/json"})
-
-    def check_health(self) -> bool:
+        self.max_reconnects = max_reconnects
+        # One pooled client for every request, so connections to the server are kept alive and reused
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Content-Type": "application/json"},
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(30.0, connect=10.0),
+        )
+
+    async def __aenter__(self) -> "AgentChatClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the client's pooled connections."""
+        await self.client.aclose()
+
+    async def check_health(self) -> bool:
         """Check if the agent is running and healthy."""
         try:
-            response = self.session.get(f"{self.base_url}/health", timeout=5)
+            response = await self.client.get("/health", timeout=5)
             return response.status_code == 200
-        except requests.exceptions.RequestException:
+        except httpx.HTTPError:
             return False
 
-    def send_message(self, prompt: str) -> Dict[str, Any]:
-        """Send a message to the agent and return the response."""
+    async def send_message(self, prompt: str, on_progress: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Run a prompt as a server-side job and return its result.
+
+        The job keeps running on the server if the connection drops; the event
+        stream is re-opened where it stopped until the job finishes. A server at
+        capacity (429) is retried after the delay it asks for.
+
+        Args:
+            prompt: The message for the agent
+            on_progress: Called with each progress event's type and data as it arrives, e.g.
+                "node_start", {"node": "aws_agent"} or "text", {"node": "aws_agent", "text": "..."}
+        """
+        try:
+            for attempt in itertools.count():
+                response = await self.client.post("/jobs", json={"prompt": prompt})
+                if response.status_code == 429 and attempt < self.max_reconnects:
+                    await asyncio.sleep(float(response.headers.get("Retry-After", 5)))
+                    continue
+                if response.status_code in (429, 503):
+                    return {"error": response.json().get("error", f"HTTP {response.status_code}")}
+                response.raise_for_status()
+                job_id = response.json()["id"]
+                break
+        except httpx.HTTPError as e:
+            return {"error": f"Request failed: {str(e)}"}
+        except (json.JSONDecodeError, KeyError) as e:
+            return {"error": f"Invalid JSON response: {str(e)}"}
+
+        last_event_id = 0
+        failures = 0
+        while True:
+            try:
+                async with aclosing(self._job_events(job_id, last_event_id)) as events:
+                    async for event_id, event_type, data in events:
+                        last_event_id = event_id
+                        failures = 0
+                        if on_progress:
+                            on_progress(event_type, data)
+                        if event_type == "done":
+                            return await self._job_result(job_id)
+            except httpx.HTTPError as e:
+                failures += 1
+                if failures > self.max_reconnects:
+                    return {"error": f"Lost the job's event stream (job {job_id} keeps running on the server): {str(e)}"}
+            # The stream ended or dropped before the job finished; reconnect with a short backoff
+            await asyncio.sleep(min(2 ** failures, 30))
+
+    async def _job_events(self, job_id: str, after: int) -> AsyncIterator[Tuple[int, str, Dict[str, Any]]]:
+        """Yield (id, type, data) for the job's server-sent events after the given event id."""
+        async with self.client.stream(
+            "GET",
+            f"/jobs/{job_id}/events",
+            headers={"Accept": "text/event-stream", "Last-Event-ID": str(after)},
+            timeout=httpx.Timeout(60.0, connect=10.0),
+        ) as response:
+            response.raise_for_status()
+            event_id, event_type, data = after, "message", []
+            async for line in response.aiter_lines():
+                if line.startswith(":"):
+                    continue
+                if line == "":
+                    if data:
+                        yield event_id, event_type, json.loads("\n".join(data))
+                    event_type, data = "message", []
+                    continue
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "id" and value.isdigit():
+                    event_id = int(value)
+                elif field == "event":
+                    event_type = value
+                elif field == "data":
+                    data.append(value)
+
+    async def _job_result(self, job_id: str) -> Dict[str, Any]:
+        """The stored result of a finished job, in the /invoke response format."""
         try:
-            payload = {"prompt": prompt}
-            response = self.session.post(
-                f"{self.base_url}/invoke", json=payload, timeout=3000
-            )
+            response = await self.client.get(f"/jobs/{job_id}")
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            job = response.json()
+        except httpx.HTTPError as e:
             return {"error": f"Request failed: {str(e)}"}
         except json.JSONDecodeError as e:
             return {"error": f"Invalid JSON response: {str(e)}"}
+        if job.get("status") != "completed":
+            return {"error": job.get("error") or f"Job {job_id} {job.get('status')}"}
+        return {**(job.get("result") or {}), "usage": job.get("usage")}
+
+    async def run_batch(self, prompts: List[Dict[str, Any]], concurrency: int, output: TextIO) -> int:
+        """
+        Run many prompts concurrently, writing one JSON line per prompt as it finishes.
+
+        Each line carries the prompt's id, whether it succeeded, its latency and
+        the time until the first agent output, the formatted answer or error, and
+        its token usage. A summary is printed to stderr.
+
+        Args:
+            prompts: Objects with a "prompt" and an optional "id" (defaults to the prompt's position)
+            concurrency: Prompts running at once
+            output: Where the JSON lines are written
+
+        Returns:
+            The number of prompts that failed
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        latencies: List[float] = []
+        failed = 0
+        started = time.perf_counter()
+
+        async def run_one(index: int, item: Dict[str, Any]):
+            nonlocal failed
+            async with semaphore:
+                prompt_started = time.perf_counter()
+                first_output: Optional[float] = None
+
+                def on_progress(event_type: str, data: Dict[str, Any]):
+                    nonlocal first_output
+                    if event_type == "text" and first_output is None:
+                        first_output = time.perf_counter() - prompt_started
+
+                response = await self.send_message(item["prompt"], on_progress)
+                latency = time.perf_counter() - prompt_started
+            ok = "error" not in response and response.get("status") != "Status.FAILED"
+            latencies.append(latency)
+            failed += not ok
+            record = {
+                "id": item.get("id", index),
+                "prompt": item["prompt"],
+                "ok": ok,
+                "latency_ms": round(latency * 1000, 1),
+                "first_output_ms": round(first_output * 1000, 1) if first_output is not None else None,
+                "response": self.format_response(response) if ok else None,
+                "error": None if ok else response.get("error") or self.format_response(response),
+                "usage": response.get("usage"),
+            }
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+
+        await asyncio.gather(*(run_one(index, item) for index, item in enumerate(prompts)))
+
+        ordered = sorted(latencies)
+        percentile = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000 if ordered else 0.0
+        print(
+            f"{len(prompts)} prompts, {failed} failed in {time.perf_counter() - started:.1f}s "
+            f"(latency p50 {percentile(0.5):.0f} ms, p95 {percentile(0.95):.0f} ms, max {percentile(1.0):.0f} ms)",
+            file=sys.stderr,
+        )
+        return failed
 
     def format_response(self, response: Dict[str, Any]) -> str:
         """Format the agent's response for display."""
@@ -118,14 +283,14 @@ class AgentChatClient:
 
         return ""
 
-    def run_chat(self):
+    async def run_chat(self):
         """Run the continuous chat interface."""
         print("🤖 Sky Agent Chat Interface")
         print("=" * 50)
 
         # Check if agent is running
         print("🔍 Checking agent health...")
-        if not self.check_health():
+        if not await self.check_health():
             print("❌ Agent is not running or not healthy!")
             print("   Please start the agent with: python sky_agent.py")
             sys.exit(1)
@@ -140,7 +305,7 @@ class AgentChatClient:
 
         try:
             while True:
-                # Get user input
+                # Get user input (nothing else runs on the loop while the prompt waits)
                 try:
                     user_input = input("\n🧑 You: ").strip()
                 except (EOFError, KeyboardInterrupt):
@@ -160,15 +325,32 @@ class AgentChatClient:
                     print("💭 Please enter a message or type 'help' for assistance.")
                     continue
 
-                # Send message to agent
+                # Send message to agent; its output is printed as it is generated
                 print("🤖 Agent: ", end="", flush=True)
-                response = self.send_message(user_input)
-                formatted_response = self.format_response(response)
-                print(formatted_response)
+                streamed = []
+
+                def on_progress(event_type: str, data: Dict[str, Any]):
+                    if event_type == "text":
+                        streamed.append(data)
+                    self.show_progress(event_type, data)
+
+                response = await self.send_message(user_input, on_progress=on_progress)
+                if "error" in response or not streamed:
+                    print(self.format_response(response))
 
         except KeyboardInterrupt:
             print("\n\n👋 Chat interrupted. Goodbye!")
 
+    @staticmethod
+    def show_progress(event_type: str, data: Dict[str, Any]):
+        """Print agent output as it arrives, with a marker whenever an agent starts working on the job."""
+        if event_type == "node_start":
+            print(f"\n→ {data.get('node')}\n", end="", flush=True)
+        elif event_type == "text":
+            print(data.get("text", ""), end="", flush=True)
+        elif event_type == "done":
+            print()
+
     def show_help(self):
         """Show help information."""
         print("\n📚 Help - Available Commands:")
@@ -184,10 +366,51 @@ class AgentChatClient:
         print("   - How do I implement CI/CD pipelines?")
 
 
+def load_prompts(path: str) -> List[Dict[str, Any]]:
+    """
+    Read a batch file: one JSON value per line, either a prompt string or an
+    object with a "prompt" and an optional "id". Blank lines are skipped.
+    """
+    prompts = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{number}: invalid JSON: {str(e)}")
+            if isinstance(item, str):
+                item = {"prompt": item}
+            if not isinstance(item, dict) or not isinstance(item.get("prompt"), str):
+                raise ValueError(f'{path}:{number}: expected a string or an object with a "prompt"')
+            prompts.append(item)
+    return prompts
+
+
+async def run(args: argparse.Namespace) -> int:
+    if args.batch is None:
+        async with AgentChatClient(args.url) as client:
+            await client.run_chat()
+        return 0
+
+    try:
+        prompts = load_prompts(args.batch)
+    except (OSError, ValueError) as e:
+        print(f"❌ {str(e)}", file=sys.stderr)
+        return 2
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        async with AgentChatClient(args.url, max_connections=max(1, args.concurrency) + 2) as client:
+            failed = await client.run_batch(prompts, args.concurrency, output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 1 if failed else 0
+
+
 def main():
     """Main entry point."""
-    import argparse
-
     parser = argparse.ArgumentParser(
         description="Continuous chat interface for Sky Agent"
     )
@@ -196,11 +419,29 @@ def main():
         default="http://127.0.0.1:8000",
         help="Base URL of the agent (default: http://127.0.0.1:8000)",
     )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Run the prompts in a JSONL file instead of chatting, and write one JSON result line per prompt",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Prompts run at once in batch mode (default: 4)",
+    )
+    parser.add_argument(
+        "--output",
+        default="-",
+        help="Where batch results are written (default: stdout)",
+    )
 
     args = parser.parse_args()
 
-    client = AgentChatClient(args.url)
-    client.run_chat()
+    try:
+        sys.exit(asyncio.run(run(args)))
+    except KeyboardInterrupt:
+        print("\n\n👋 Chat interrupted. Goodbye!")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,153 @@
+"""Runtime settings for the sky-agent server, read from the environment."""
+
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting, falling back to the default when unset or invalid."""
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting, falling back to the default when unset or invalid."""
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting ("1", "true", "yes" and "on" are truthy)."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Model used by every agent: "module:callable" taking the agent name and returning a strands Model
+# (empty uses the strands default, Bedrock). The benchmark suite points this at its scripted stub model.
+MODEL_FACTORY = os.getenv("SKY_AGENT_MODEL_FACTORY", "")
+
+# Execution engine
+MAX_CONCURRENT_RUNS = env_int("SKY_AGENT_MAX_CONCURRENT_RUNS", 8)
+MAX_QUEUED_RUNS = env_int("SKY_AGENT_MAX_QUEUED_RUNS", 32)
+RETRY_AFTER_SECONDS = env_int("SKY_AGENT_RETRY_AFTER_SECONDS", 5)
+# How often a non-streamed request checks whether its client is still connected (its run is cancelled if not)
+DISCONNECT_POLL_SECONDS = env_float("SKY_AGENT_DISCONNECT_POLL_SECONDS", 1.0)
+
+# Token budgets (0 = no limit). A run stops cleanly once the request, or one of its agents, has used its budget.
+# SKY_AGENT_TOKEN_BUDGET_AGENTS overrides the per-agent budget for named agents: "coding_agent=400000,aws_agent=100000"
+TOKEN_BUDGET_PER_REQUEST = env_int("SKY_AGENT_TOKEN_BUDGET_PER_REQUEST", 2_000_000)
+TOKEN_BUDGET_PER_AGENT = env_int("SKY_AGENT_TOKEN_BUDGET_PER_AGENT", 0)
+TOKEN_BUDGET_AGENTS = {
+    name.strip(): int(budget)
+    for name, _, budget in (
+        item.partition("=") for item in os.getenv("SKY_AGENT_TOKEN_BUDGET_AGENTS", "").split(",") if "=" in item
+    )
+    if budget.strip().isdigit()
+}
+
+# Conversation management per agent: "sliding" compacts old tool results and keeps a window of recent messages,
+# "summarizing" also summarizes older history past a token threshold, "default" keeps the strands default.
+# SKY_AGENT_CONTEXT_POLICIES overrides the policy for named agents: "sky_agent=summarizing,coding_agent=default"
+CONTEXT_POLICY = os.getenv("SKY_AGENT_CONTEXT_POLICY", "sliding")
+CONTEXT_POLICIES = {
+    name.strip(): policy.strip()
+    for name, _, policy in (
+        item.partition("=") for item in os.getenv("SKY_AGENT_CONTEXT_POLICIES", "").split(",") if "=" in item
+    )
+}
+CONTEXT_WINDOW_MESSAGES = env_int("SKY_AGENT_CONTEXT_WINDOW_MESSAGES", 40)
+CONTEXT_TOOL_RESULT_CHARS = env_int("SKY_AGENT_CONTEXT_TOOL_RESULT_CHARS", 4000)
+CONTEXT_KEEP_RECENT_MESSAGES = env_int("SKY_AGENT_CONTEXT_KEEP_RECENT_MESSAGES", 4)
+CONTEXT_SUMMARIZE_TOKENS = env_int("SKY_AGENT_CONTEXT_SUMMARIZE_TOKENS", 60000)
+
+# Fast-path routing of single-provider prompts past the coordinator
+ROUTER_ENABLED = env_bool("SKY_AGENT_ROUTER_ENABLED", True)
+ROUTER_MIN_CONFIDENCE = env_float("SKY_AGENT_ROUTER_MIN_CONFIDENCE", 0.75)
+FANOUT_ENABLED = env_bool("SKY_AGENT_FANOUT_ENABLED", True)
+
+# Conversation sessions
+SESSION_MAX_SESSIONS = env_int("SKY_AGENT_SESSION_MAX_SESSIONS", 256)
+SESSION_TTL_SECONDS = env_float("SKY_AGENT_SESSION_TTL_SECONDS", 3600.0)
+SESSION_MAX_BYTES = env_int("SKY_AGENT_SESSION_MAX_BYTES", 64 * 1024 * 1024)
+CONVERSATION_ID_HEADERS = [
+    header.strip()
+    for header in os.getenv("SKY_AGENT_CONVERSATION_ID_HEADERS", "X-Conversation-Id,X-OpenWebUI-Chat-Id").split(",")
+    if header.strip()
+]
+
+# Read-only az/gcloud result cache
+CLI_CACHE_ENABLED = env_bool("SKY_AGENT_CLI_CACHE_ENABLED", True)
+CLI_CACHE_LIST_TTL_SECONDS = env_float("SKY_AGENT_CLI_CACHE_LIST_TTL_SECONDS", 30.0)
+CLI_CACHE_SHOW_TTL_SECONDS = env_float("SKY_AGENT_CLI_CACHE_SHOW_TTL_SECONDS", 60.0)
+CLI_CACHE_MAX_ENTRIES = env_int("SKY_AGENT_CLI_CACHE_MAX_ENTRIES", 512)
+CLI_CACHE_MAX_BYTES = env_int("SKY_AGENT_CLI_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+
+# API response cache for runs that only read state
+RESPONSE_CACHE_ENABLED = env_bool("SKY_AGENT_RESPONSE_CACHE_ENABLED", True)
+RESPONSE_CACHE_INVOKE_TTL_SECONDS = env_float("SKY_AGENT_RESPONSE_CACHE_INVOKE_TTL_SECONDS", 120.0)
+RESPONSE_CACHE_CHAT_TTL_SECONDS = env_float("SKY_AGENT_RESPONSE_CACHE_CHAT_TTL_SECONDS", 120.0)
+RESPONSE_CACHE_MAX_ENTRIES = env_int("SKY_AGENT_RESPONSE_CACHE_MAX_ENTRIES", 256)
+RESPONSE_CACHE_MAX_BYTES = env_int("SKY_AGENT_RESPONSE_CACHE_MAX_BYTES", 16 * 1024 * 1024)
+
+# Cloud CLI capability registry
+CLI_CAPABILITY_REFRESH_SECONDS = env_float("SKY_AGENT_CLI_CAPABILITY_REFRESH_SECONDS", 300.0)
+
+# Warm in-process Azure CLI workers (0 disables them and forks az per command)
+AZURE_WARM_WORKERS = env_int("SKY_AGENT_AZURE_WARM_WORKERS", 2)
+AZURE_WORKER_MAX_COMMANDS = env_int("SKY_AGENT_AZURE_WORKER_MAX_COMMANDS", 200)
+
+# Asynchronous CLI subprocess engine
+CLI_MAX_PARALLEL = env_int("SKY_AGENT_CLI_MAX_PARALLEL", 8)
+CLI_BATCH_MAX_COMMANDS = env_int("SKY_AGENT_CLI_BATCH_MAX_COMMANDS", 25)
+
+# How JSON output of az/gcloud tools is returned to the model: "auto" (a table for lists of resources when that is
+# shorter, otherwise minified JSON), "table", "json" (minified) or "raw" (as printed). Tools can override it per call.
+CLI_OUTPUT_ENCODING = os.getenv("SKY_AGENT_CLI_OUTPUT_ENCODING", "auto")
+if CLI_OUTPUT_ENCODING not in ("auto", "table", "json", "raw"):
+    CLI_OUTPUT_ENCODING = "auto"
+
+# Identical read-only az/gcloud commands and MCP reads already in flight share one execution
+SINGLE_FLIGHT_ENABLED = env_bool("SKY_AGENT_SINGLE_FLIGHT_ENABLED", True)
+
+# Local state (inventory index, snapshots)
+DATA_DIR = os.path.expanduser(os.getenv("SKY_AGENT_DATA_DIR", "~/.sky-agent"))
+
+# Cloud inventory index
+INVENTORY_ENABLED = env_bool("SKY_AGENT_INVENTORY_ENABLED", True)
+INVENTORY_DB_PATH = os.getenv("SKY_AGENT_INVENTORY_DB", os.path.join(DATA_DIR, "inventory.db"))
+INVENTORY_REFRESH_SECONDS = env_float("SKY_AGENT_INVENTORY_REFRESH_SECONDS", 900.0)
+INVENTORY_MAX_AGE_SECONDS = env_float("SKY_AGENT_INVENTORY_MAX_AGE_SECONDS", 3600.0)
+INVENTORY_LIVE_REFRESH_TIMEOUT_SECONDS = env_float("SKY_AGENT_INVENTORY_LIVE_REFRESH_TIMEOUT_SECONDS", 60.0)
+INVENTORY_AWS_REGIONS = [
+    region.strip() for region in os.getenv("SKY_AGENT_INVENTORY_AWS_REGIONS", "").split(",") if region.strip()
+]
+
+# Asynchronous jobs (POST /jobs) and their SQLite store
+JOBS_DB_PATH = os.getenv("SKY_AGENT_JOBS_DB", os.path.join(DATA_DIR, "jobs.db"))
+JOB_RETENTION_SECONDS = env_float("SKY_AGENT_JOB_RETENTION_SECONDS", 7 * 24 * 3600.0)
+JOB_EVENT_FLUSH_SECONDS = env_float("SKY_AGENT_JOB_EVENT_FLUSH_SECONDS", 0.5)
+JOB_EVENTS_KEEPALIVE_SECONDS = env_float("SKY_AGENT_JOB_EVENTS_KEEPALIVE_SECONDS", 15.0)
+
+# Claude Code SDK session pool
+CLAUDE_MAX_SESSIONS = env_int("SKY_AGENT_CLAUDE_MAX_SESSIONS", 4)
+CLAUDE_SESSION_IDLE_SECONDS = env_float("SKY_AGENT_CLAUDE_SESSION_IDLE_SECONDS", 900.0)
+CLAUDE_SESSION_MAX_TURNS = env_int("SKY_AGENT_CLAUDE_SESSION_MAX_TURNS", 50)
+
+# MCP server connections
+MCP_SNAPSHOT_DIR = os.getenv("SKY_AGENT_MCP_SNAPSHOT_DIR", os.path.join(DATA_DIR, "mcp"))
+MCP_EAGER_CONNECT = env_bool("SKY_AGENT_MCP_EAGER_CONNECT", True)
+MCP_CONNECT_TIMEOUT_SECONDS = env_float("SKY_AGENT_MCP_CONNECT_TIMEOUT_SECONDS", 30.0)
+MCP_RECONNECT_MIN_SECONDS = env_float("SKY_AGENT_MCP_RECONNECT_MIN_SECONDS", 1.0)
+MCP_RECONNECT_MAX_SECONDS = env_float("SKY_AGENT_MCP_RECONNECT_MAX_SECONDS", 60.0)
+MCP_HEALTH_CHECK_SECONDS = env_float("SKY_AGENT_MCP_HEALTH_CHECK_SECONDS", 30.0)
+MCP_SERVERS_FILE = os.getenv("SKY_AGENT_MCP_SERVERS_FILE", "mcp-servers/servers.json")
+
+# Read-through cache of read-only MCP tool results
+MCP_CACHE_ENABLED = env_bool("SKY_AGENT_MCP_CACHE_ENABLED", True)
+MCP_CACHE_MAX_ENTRIES = env_int("SKY_AGENT_MCP_CACHE_MAX_ENTRIES", 1024)
+MCP_CACHE_MAX_BYTES = env_int("SKY_AGENT_MCP_CACHE_MAX_BYTES", 32 * 1024 * 1024)
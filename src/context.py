@@ -0,0 +1,206 @@
+"""Per-agent conversation (context window) management.
+
+Every model call re-sends the agent's whole history, so a run that lists
+resources with ``az ... --output json`` keeps paying for every earlier dump on
+every later step. ``ContextManager`` runs before each model call and, oldest
+first:
+
+- replaces large tool results outside the most recent messages with a compact
+  summary (list size, keys, identifiers and a preview) that tells the agent to
+  re-run the tool if it needs the full output; recent CLI results are served
+  from the result cache, so that is cheap;
+- once the history is estimated to pass a token threshold, summarizes the
+  oldest part of it with a dedicated summarizer agent (``summarizing`` policy);
+- keeps a sliding window of recent messages, never splitting a tool call from
+  its result.
+
+The policy is chosen per agent: ``sliding`` (compaction and window),
+``summarizing`` (compaction, summaries and window) or ``default`` (the strands
+default manager, unchanged).
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from strands.agent.conversation_manager import (
+    ConversationManager,
+    SlidingWindowConversationManager,
+    SummarizingConversationManager,
+)
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("default", "sliding", "summarizing")
+COMPACTED_PREFIX = "[Compacted earlier tool result"
+
+# Fields whose values identify resources in CLI and MCP JSON output
+ID_FIELDS = ("name", "id", "key", "displayName", "projectId", "full_name")
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Rough token count of a message history (about four characters per token)."""
+    return len(json.dumps(messages, default=str)) // 4
+
+
+def _identifiers(items: List[Any], limit: int = 30) -> List[str]:
+    found = []
+    for item in items:
+        if isinstance(item, dict):
+            value = next((item[field] for field in ID_FIELDS if isinstance(item.get(field), (str, int))), None)
+            if value is not None:
+                found.append(str(value))
+        if len(found) >= limit:
+            break
+    return found
+
+
+def summarize_output(text: str, preview_chars: int) -> str:
+    """
+    Compact stand-in for a large tool result.
+
+    Args:
+        text: The tool result text
+        preview_chars: How much of the original text to keep as a preview
+
+    Returns:
+        A short description of the result's shape and identifiers, with a preview
+    """
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    if isinstance(data, dict):
+        for field in ("value", "items", "issues", "results"):
+            if isinstance(data.get(field), list):
+                data = data[field]
+                break
+    if isinstance(data, list):
+        shape = f"JSON list of {len(data)} items"
+        if data and isinstance(data[0], dict):
+            shape += f" with keys {', '.join(list(data[0])[:12])}"
+        identifiers = _identifiers(data)
+        if identifiers:
+            more = f" and {len(data) - len(identifiers)} more" if len(data) > len(identifiers) else ""
+            shape += f"; identifiers: {', '.join(identifiers)}{more}"
+    elif isinstance(data, dict):
+        shape = f"JSON object with keys {', '.join(list(data)[:20])}"
+    else:
+        shape = f"{text.count(chr(10)) + 1} lines of text"
+    return (
+        f"{COMPACTED_PREFIX}: {shape}; {len(text)} characters originally. "
+        f"Preview: {text[:preview_chars]}...] Re-run the tool if you need the full output."
+    )
+
+
+def compact_tool_results(messages: List[Dict[str, Any]], keep_recent: int, max_chars: int) -> int:
+    """
+    Replace large tool results outside the last ``keep_recent`` messages with compact summaries.
+
+    Returns:
+        Number of characters removed from the history
+    """
+    saved = 0
+    for message in messages[:max(0, len(messages) - keep_recent)]:
+        for block in message.get("content") or []:
+            result = block.get("toolResult") if isinstance(block, dict) else None
+            if not result:
+                continue
+            for item in result.get("content") or []:
+                if "json" in item:
+                    text = json.dumps(item["json"], default=str)
+                elif isinstance(item.get("text"), str):
+                    text = item["text"]
+                else:
+                    continue
+                if len(text) <= max_chars or text.startswith(COMPACTED_PREFIX):
+                    continue
+                compacted = summarize_output(text, preview_chars=max_chars // 4)
+                item.pop("json", None)
+                item["text"] = compacted
+                saved += len(text) - len(compacted)
+    return saved
+
+
+class ContextManager(SlidingWindowConversationManager):
+    """Sliding window that also compacts old tool results and can summarize old history."""
+
+    def __init__(
+        self,
+        window_size: int,
+        max_tool_result_chars: int,
+        keep_recent_messages: int,
+        summarize_above_tokens: int = 0,
+        summarizer: Optional[Callable[[], Any]] = None,
+    ):
+        """
+        Args:
+            window_size: Messages to keep in the history
+            max_tool_result_chars: Tool results larger than this are compacted once they are no longer recent
+            keep_recent_messages: Tool results in this many of the latest messages are never compacted
+            summarize_above_tokens: Summarize the oldest history once it is estimated above this many tokens (0 disables)
+            summarizer: Creates the agent that writes summaries; required when summarizing
+        """
+        # Manage the history before every model call, not only when the agent finishes
+        super().__init__(window_size=window_size, should_truncate_results=True, per_turn=True)
+        self.max_tool_result_chars = max_tool_result_chars
+        self.keep_recent_messages = keep_recent_messages
+        self.summarize_above_tokens = summarize_above_tokens
+        self._summarizer_factory = summarizer
+        self._summarizing: Optional[SummarizingConversationManager] = None
+
+    def _summarize(self, agent: Any):
+        if self._summarizing is None:
+            self._summarizing = SummarizingConversationManager(
+                summary_ratio=0.5,
+                preserve_recent_messages=self.keep_recent_messages,
+                summarization_agent=self._summarizer_factory(),
+            )
+        before = len(agent.messages)
+        try:
+            self._summarizing.reduce_context(agent)
+        except Exception as e:
+            # The window still bounds the history; summarizing is best effort
+            logger.warning(f"Could not summarize {agent.name} history: {str(e)}")
+            return
+        logger.info(f"Summarized {before - len(agent.messages) + 1} earlier messages of {agent.name}")
+
+    def apply_management(self, agent: Any, **kwargs: Any) -> None:
+        saved = compact_tool_results(agent.messages, self.keep_recent_messages, self.max_tool_result_chars)
+        if saved:
+            logger.debug(f"Compacted {saved} characters of old tool results for {agent.name}")
+        if (
+            self.summarize_above_tokens
+            and self._summarizer_factory is not None
+            and estimate_tokens(agent.messages) > self.summarize_above_tokens
+        ):
+            self._summarize(agent)
+        super().apply_management(agent, **kwargs)
+
+
+def create_context_manager(agent_name: str, summarizer: Callable[[], Any]) -> Optional[ConversationManager]:
+    """
+    Conversation manager for an agent, following its configured policy.
+
+    Args:
+        agent_name: The agent's name, looked up in SKY_AGENT_CONTEXT_POLICIES
+        summarizer: Creates the agent that writes summaries for the summarizing policy
+
+    Returns:
+        The manager, or None to keep the strands default
+    """
+    policy = config.CONTEXT_POLICIES.get(agent_name, config.CONTEXT_POLICY)
+    if policy not in POLICIES:
+        logger.warning(f"Unknown context policy '{policy}' for {agent_name}, using 'sliding'")
+        policy = "sliding"
+    if policy == "default":
+        return None
+    return ContextManager(
+        window_size=config.CONTEXT_WINDOW_MESSAGES,
+        max_tool_result_chars=config.CONTEXT_TOOL_RESULT_CHARS,
+        keep_recent_messages=config.CONTEXT_KEEP_RECENT_MESSAGES,
+        summarize_above_tokens=config.CONTEXT_SUMMARIZE_TOKENS if policy == "summarizing" else 0,
+        summarizer=summarizer,
+    )
@@ -0,0 +1,312 @@
+"""Bounded execution engine for swarm runs.
+
+Swarm runs are long, blocking and CPU-light: most of their time is spent
+waiting on Bedrock and cloud CLIs. Running them inline in an ``async def``
+handler freezes the FastAPI event loop, so runs are handed to a bounded worker
+pool instead. Admission control keeps the backlog finite: once every worker is
+busy and the queue is full new runs are rejected with 429, and runs submitted
+while the engine is shutting down are rejected with 503.
+
+Each run makes its conversation (or, without one, the run itself) the
+current Claude Code session scope, so coding sessions are never shared
+between conversations.
+
+A run may carry a ``Cancellation``. It is made current on the worker thread
+so the run's tools can be interrupted, a run cancelled while still queued
+never starts, and a streamed run whose consumer goes away is cancelled.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import aclosing, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from src.agents import create_swarm, set_entry_point
+from src.cancellation import CLIENT_DISCONNECTED, Cancellation, RunCancelledError
+from src.fanout import create_fanout_graph, graph_task, plan
+from src.router import router
+from src.metrics import observe_run
+from src.sessions import Session
+from src.tools.claude_sessions import session_scope
+from src.tool_audit import ToolAudit
+from src.token_usage import TokenUsage
+from src import config
+
+logger = logging.getLogger(__name__)
+
+
+def _invocation_state(audit: Optional[ToolAudit], usage: Optional[TokenUsage],
+                      cancellation: Optional[Cancellation] = None) -> Optional[Dict[str, Any]]:
+    state: Dict[str, Any] = {}
+    for tracker in (audit, usage, cancellation):
+        if tracker is not None:
+            state.update(tracker.invocation_state())
+    return state or None
+
+
+@contextmanager
+def _activate(cancellation: Optional[Cancellation], session: Optional[Session] = None) -> Iterator[None]:
+    # Runs cancelled while they were queued never start
+    if cancellation is not None and cancellation.cancelled:
+        raise RunCancelledError(cancellation.message())
+    with session_scope(f"conversation:{session.id}" if session is not None else f"run:{uuid.uuid4().hex}"):
+        if cancellation is None:
+            yield
+            return
+        with cancellation.active():
+            yield
+
+
+class EngineSaturatedError(Exception):
+    """Raised when all workers are busy and the run queue is full."""
+
+
+class EngineUnavailableError(Exception):
+    """Raised when the engine is not accepting runs (e.g. during shutdown)."""
+
+
+class ExecutionEngine:
+    """Runs swarm executions on a bounded worker pool with admission control."""
+
+    def __init__(self, mcp_tools: Mapping[str, List[Any]], max_concurrency: int, max_queue_depth: int):
+        self.mcp_tools = mcp_tools
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue_depth = max(0, max_queue_depth)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="swarm-worker"
+        )
+        self._lock = threading.Lock()
+        self._running = 0
+        self._queued = 0
+        self._accepting = True
+
+    def _admit(self):
+        with self._lock:
+            if not self._accepting:
+                raise EngineUnavailableError("Sky Agent is shutting down")
+            if self._running + self._queued >= self.max_concurrency + self.max_queue_depth:
+                raise EngineSaturatedError(
+                    f"Sky Agent is at capacity ({self._running} running, {self._queued} queued)"
+                )
+            self._queued += 1
+
+    def _execute(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _dispatch(self, fn: Callable[..., Any], *args: Any) -> Future:
+        self._admit()
+        try:
+            future = self._executor.submit(self._execute, fn, *args)
+        except RuntimeError:
+            with self._lock:
+                self._queued -= 1
+            raise EngineUnavailableError("Sky Agent is shutting down")
+        future.add_done_callback(self._dropped)
+        return future
+
+    def _dropped(self, future: Future):
+        # Shutdown cancels queued work items without running _execute
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking callable on the worker pool.
+
+        Raises:
+            EngineSaturatedError: When the engine is at capacity
+            EngineUnavailableError: When the engine is shutting down
+        """
+        return await asyncio.wrap_future(self._dispatch(fn, *args))
+
+    def _prepare(self, prompt: str, session: Optional[Session],
+                 invocation_state: Optional[Dict[str, Any]] = None) -> Tuple[Any, str]:
+        """
+        Choose how a prompt runs.
+
+        Cross-cloud prompts whose plan has no cross-provider dependencies run on
+        a fan-out graph; everything else runs on a swarm that starts at the
+        routed specialist (or the coordinator).
+
+        Args:
+            prompt: The user's prompt
+            session: Conversation session the prompt belongs to, if any
+            invocation_state: Run state for the fan-out planner, so its tokens count towards the run
+
+        Returns:
+            The swarm or graph to run, and the task to give it
+        """
+        decision = router.route(prompt)
+        if config.FANOUT_ENABLED and len(decision.providers) > 1:
+            messages = session.agent_messages() if session is not None else None
+            fanout_plan = plan(prompt, messages, invocation_state)
+            if fanout_plan is not None and fanout_plan.parallel:
+                logger.info(f"Fanning out to {', '.join(task.agent for task in fanout_plan.tasks)} in parallel")
+                return create_fanout_graph(self.mcp_tools, fanout_plan, messages), graph_task(prompt, fanout_plan)
+            logger.info("Cross-cloud plan is not independent, running on the swarm")
+
+        # Single-provider prompts skip the coordinator's handoff round trip
+        entry_point = decision.agent if decision.fast_path else None
+        if session is None:
+            return create_swarm(self.mcp_tools, entry_point=entry_point), prompt
+        swarm = session.acquire(self.mcp_tools)
+        set_entry_point(swarm, entry_point)
+        return swarm, prompt
+
+    def _run_swarm(self, prompt: str, session: Optional[Session], audit: Optional[ToolAudit],
+                   usage: Optional[TokenUsage], cancellation: Optional[Cancellation] = None):
+        invocation_state = _invocation_state(audit, usage, cancellation)
+        with _activate(cancellation, session):
+            runner, task = self._prepare(prompt, session, invocation_state)
+            started = time.perf_counter()
+            try:
+                result = runner(task, invocation_state=invocation_state)
+            finally:
+                if session is not None:
+                    session.release(runner)
+        observe_run(result, type(runner).__name__.lower(), time.perf_counter() - started)
+        if audit is not None:
+            audit.finish(result)
+        return result
+
+    async def run(self, prompt: str, session: Optional[Session] = None, audit: Optional[ToolAudit] = None,
+                  usage: Optional[TokenUsage] = None, cancellation: Optional[Cancellation] = None):
+        """
+        Execute a prompt and return the swarm (or fan-out graph) result.
+
+        Args:
+            prompt: The task for the swarm
+            session: Conversation session whose warm swarm should run the prompt;
+                a fresh swarm is built when omitted
+            audit: Records the run's tool calls and outcome, if given
+            usage: Accounts the run's model tokens and enforces its token budgets, if given
+            cancellation: Stops the run and interrupts its tools once cancelled, if given
+
+        Raises:
+            RunCancelledError: When the run was cancelled before it started
+        """
+        return await self.submit(self._run_swarm, prompt, session, audit, usage, cancellation)
+
+    def stream(self, prompt: str, session: Optional[Session] = None, audit: Optional[ToolAudit] = None,
+               usage: Optional[TokenUsage] = None, cancellation: Optional[Cancellation] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute a prompt and return an iterator over the swarm's streaming events.
+
+        The run is admitted immediately, so admission errors surface before the
+        caller starts a response. The swarm runs on a worker thread with its own
+        event loop and events are forwarded to the caller's loop as they are
+        produced. The last event is the ``multiagent_result`` event carrying the
+        swarm result. Pass an audit to record the run's tool calls and outcome, a
+        token usage to account and budget the run's model tokens, and a
+        cancellation to stop the run; it is cancelled when the consumer stops
+        iterating before the run finishes.
+
+        Raises:
+            EngineSaturatedError: When the engine is at capacity
+            EngineUnavailableError: When the engine is shutting down
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stopped = threading.Event()
+
+        def emit(kind: str, payload: Any = None):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (kind, payload))
+            except RuntimeError:
+                # The consumer's loop is gone; nobody is listening any more
+                stopped.set()
+
+        invocation_state = _invocation_state(audit, usage, cancellation)
+
+        def produce():
+            async def pump(runner: Any, task: str):
+                started = time.perf_counter()
+                async with aclosing(runner.stream_async(task, invocation_state)) as events:
+                    async for event in events:
+                        if event.get("type") == "multiagent_result":
+                            observe_run(event.get("result"), type(runner).__name__.lower(), time.perf_counter() - started)
+                            if audit is not None:
+                                audit.finish(event.get("result"))
+                        if stopped.is_set():
+                            if cancellation is None:
+                                break
+                            # Nobody reads the events any more; let the cancelled run wind down by itself
+                            continue
+                        emit("event", event)
+
+            try:
+                with _activate(cancellation, session):
+                    runner, task = self._prepare(prompt, session, invocation_state)
+                    try:
+                        asyncio.run(pump(runner, task))
+                    finally:
+                        if session is not None:
+                            session.release(runner)
+                emit("done")
+            except Exception as e:
+                emit("error", e)
+
+        def dropped(future: Future):
+            if future.cancelled():
+                emit("error", EngineUnavailableError("Sky Agent shut down before the run started"))
+
+        self._dispatch(produce).add_done_callback(dropped)
+        return self._drain(queue, stopped, cancellation)
+
+    @staticmethod
+    async def _drain(queue: asyncio.Queue, stopped: threading.Event,
+                     cancellation: Optional[Cancellation]) -> AsyncIterator[Dict[str, Any]]:
+        finished = False
+        try:
+            while True:
+                kind, payload = await queue.get()
+                if kind == "done":
+                    finished = True
+                    break
+                if kind == "error":
+                    finished = True
+                    raise payload
+                yield payload
+        finally:
+            stopped.set()
+            if not finished and cancellation is not None:
+                cancellation.cancel(CLIENT_DISCONNECTED)
+
+    def stats(self) -> Dict[str, int]:
+        """Current worker pool occupancy."""
+        with self._lock:
+            return {
+                "running": self._running,
+                "queued": self._queued,
+                "max_concurrency": self.max_concurrency,
+                "max_queue_depth": self.max_queue_depth,
+            }
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting runs and release the worker pool."""
+        with self._lock:
+            self._accepting = False
+        logger.info("Execution engine shutting down")
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def create_engine(mcp_tools: Mapping[str, List[Any]]) -> ExecutionEngine:
+    """Create an execution engine configured from the environment."""
+    return ExecutionEngine(
+        mcp_tools,
+        max_concurrency=config.MAX_CONCURRENT_RUNS,
+        max_queue_depth=config.MAX_QUEUED_RUNS,
+    )
@@ -0,0 +1,126 @@
+"""Parallel fan-out execution for cross-cloud requests.
+
+Swarm handoffs are sequential, so "compare our compute footprint in AWS, Azure
+and GCP" costs the sum of three specialist runs. For prompts the router flags
+as cross-cloud, a planner splits the request into one task per provider and
+says whether the tasks are independent. Independent plans run as a
+``Graph``: the provider agents execute concurrently and a merge agent, which
+depends on all of them, combines their results. Plans with cross-provider
+dependencies (migrations, cross-cloud networking) run on the swarm as before.
+"""
+
+import copy
+import logging
+from typing import Any, Dict, List, Literal, Mapping, Optional
+
+from pydantic import BaseModel, Field
+from strands import Agent
+from strands.multiagent import GraphBuilder
+from strands.multiagent.graph import Graph
+
+from src.agents import context_manager_for, create_agents, model_for
+from src.metrics import metrics_hook
+from src.token_usage import token_budget_hook
+from src.cancellation import cancellation_hook
+from src.prompts.merge_agent import MERGE_AGENT_PROMPT
+from src.prompts.planner_agent import PLANNER_AGENT_PROMPT
+
+logger = logging.getLogger(__name__)
+
+MERGE_NODE = "merge_agent"
+
+
+class ProviderTask(BaseModel):
+    agent: Literal["aws_agent", "azure_agent", "gcp_agent"] = Field(description="Specialist that runs the task")
+    task: str = Field(description="Self-contained instructions for that specialist")
+
+
+class FanOutPlan(BaseModel):
+    independent: bool = Field(description="True if no task needs the output of another task")
+    tasks: List[ProviderTask] = Field(description="One task per cloud provider involved")
+
+    @property
+    def parallel(self) -> bool:
+        return self.independent and len({task.agent for task in self.tasks}) > 1
+
+
+def plan(
+    prompt: str,
+    messages: Optional[List[Dict[str, Any]]] = None,
+    invocation_state: Optional[Dict[str, Any]] = None
+) -> Optional[FanOutPlan]:
+    """
+    Ask the planner to split a cross-cloud prompt into per-provider tasks.
+
+    Args:
+        prompt: The user's request
+        messages: Prior conversation, so follow-up prompts can be planned in context
+        invocation_state: State of the run being planned (token usage and budgets)
+
+    Returns:
+        The plan, or None if the planner failed (the caller falls back to the swarm)
+    """
+    planner = Agent(
+        name="planner_agent",
+        model=model_for("planner_agent"),
+        system_prompt=PLANNER_AGENT_PROMPT,
+        messages=copy.deepcopy(messages or []),
+        callback_handler=None,
+    )
+    planner.hooks.add_hook(token_budget_hook)
+    planner.hooks.add_hook(cancellation_hook)
+    try:
+        result = planner(prompt, structured_output_model=FanOutPlan, invocation_state=invocation_state)
+    except Exception as e:
+        logger.warning(f"Fan-out planning failed, using the swarm: {str(e)}")
+        return None
+    return result.structured_output
+
+
+def graph_task(prompt: str, fanout_plan: FanOutPlan) -> str:
+    """The task every provider node receives: the request plus its own assignment."""
+    assignments = "\n".join(f"- {task.agent}: {task.task}" for task in fanout_plan.tasks)
+    return (
+        f"{prompt}\n\n"
+        f"This request is being handled by several specialists in parallel:\n{assignments}\n\n"
+        f"Do only the task assigned to you and report your findings; they will be merged with the others."
+    )
+
+
+def create_fanout_graph(
+    mcp_tools: Mapping[str, List[Any]],
+    fanout_plan: FanOutPlan,
+    messages: Optional[List[Dict[str, Any]]] = None
+) -> Graph:
+    """
+    Build a graph that runs the planned provider agents in parallel and merges their results.
+
+    Args:
+        mcp_tools: MCP tools keyed by server name
+        fanout_plan: An independent plan with tasks for at least two providers
+        messages: Prior conversation to seed every agent with
+
+    Returns:
+        A graph owned by a single run
+    """
+    agents = create_agents(mcp_tools, messages=messages)
+    builder = GraphBuilder()
+    merge = Agent(
+        name=MERGE_NODE,
+        model=model_for(MERGE_NODE),
+        conversation_manager=context_manager_for(MERGE_NODE),
+        system_prompt=MERGE_AGENT_PROMPT,
+        messages=copy.deepcopy(messages or [])
+    )
+    merge.hooks.add_hook(metrics_hook)
+    merge.hooks.add_hook(token_budget_hook)
+    merge.hooks.add_hook(cancellation_hook)
+    builder.add_node(merge, MERGE_NODE)
+    for agent_name in dict.fromkeys(task.agent for task in fanout_plan.tasks):
+        builder.add_node(agents[agent_name], agent_name)
+        builder.add_edge(agent_name, MERGE_NODE)
+        builder.set_entry_point(agent_name)
+    builder.set_execution_timeout(3600.0)  # 60 minutes
+    builder.set_node_timeout(3600.0)       # 60 minutes per agent
+    builder.set_hook_providers([cancellation_hook])  # A cancelled run does not start the merge
+    return builder.build()
@@ -0,0 +1,615 @@
+"""Local cloud inventory index.
+
+Inventory lookups ("which VM has IP X", "find buckets named *logs*") used to
+become a chain of live CLI calls. The inventory keeps a snapshot of the
+resources in every AWS region, Azure subscription and GCP project in a local
+SQLite database with a full-text index over names, types, regions, tags and
+IP addresses, so those lookups are answered from disk in milliseconds.
+
+Each (provider, scope) pair is a *source* that is refreshed on its own on a
+background thread once it is older than the refresh interval. The thread is
+started by the first lookup, so deployments that never search the inventory
+do not collect it. A refresh only
+rewrites rows whose content changed and removes rows that disappeared from
+that source, so the rest of the index is left untouched. Mutating CLI
+commands mark their scope stale so the next lookup re-collects it.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.tools.azure_executor import run_az
+from src.tools.cli_runner import run_command, run_command_async, run_on_cli_loop
+from src.tools.cloud_context import azure_subscriptions
+from src import config
+
+logger = logging.getLogger(__name__)
+
+Record = Dict[str, Any]
+
+PROVIDERS = ("aws", "azure", "gcp")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    uid TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    type TEXT,
+    name TEXT,
+    region TEXT,
+    tags TEXT,
+    ips TEXT,
+    data TEXT,
+    digest TEXT,
+    seen_at REAL
+);
+CREATE INDEX IF NOT EXISTS resources_source ON resources (source, seen_at);
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    refreshed_at REAL,
+    count INTEGER,
+    error TEXT
+);
+"""
+
+FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS resources_fts USING fts5(uid UNINDEXED, name, type, region, tags, ips, scope)"
+
+
+def _join(values: Iterable[Any]) -> str:
+    return " ".join(str(value) for value in values if value)
+
+
+def _basename(value: Optional[str]) -> Optional[str]:
+    return value.rstrip("/").rsplit("/", 1)[-1] if value else value
+
+
+def _record(uid: str, type_: str, name: str, region: Optional[str], tags: Optional[Dict[str, Any]],
+            ips: Iterable[str] = (), **data: Any) -> Record:
+    return {
+        "uid": uid,
+        "type": type_,
+        "name": name,
+        "region": region or "",
+        "tags": {str(k): str(v) for k, v in (tags or {}).items()},
+        "ips": sorted({ip for ip in ips if ip}),
+        "data": {k: v for k, v in data.items() if v is not None},
+    }
+
+
+# --- Collectors -------------------------------------------------------------
+# Each collector returns every resource in one scope, or raises.
+
+def _cli_json(argv: List[str]) -> Any:
+    result = run_command(argv, timeout=300)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"exit code {result.returncode}")
+    return json.loads(result.stdout or "[]")
+
+
+def _cli_json_many(commands: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Run several CLI commands concurrently; failed commands (e.g. disabled APIs) map to []."""
+    async def gather():
+        return await asyncio.gather(
+            *(run_command_async(argv, timeout=300) for argv in commands.values()), return_exceptions=True
+        )
+
+    output: Dict[str, Any] = {}
+    for key, result in zip(commands, run_on_cli_loop(gather())):
+        if isinstance(result, Exception) or result.returncode != 0:
+            reason = result if isinstance(result, Exception) else result.stderr.strip()
+            logger.debug(f"Inventory command {key} failed: {reason}")
+            output[key] = []
+            continue
+        try:
+            output[key] = json.loads(result.stdout or "[]")
+        except ValueError:
+            output[key] = []
+    return output
+
+
+def collect_azure(subscription: str) -> List[Record]:
+    """Resources, NIC and public IP addresses in one Azure subscription."""
+    result = run_az(["az", "resource", "list", "--subscription", subscription, "--output", "json"], timeout=300)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"exit code {result.returncode}")
+    resources = json.loads(result.stdout or "[]")
+    network = _cli_json_many({
+        "nics": ["az", "network", "nic", "list", "--subscription", subscription, "--output", "json"],
+        "public_ips": ["az", "network", "public-ip", "list", "--subscription", subscription, "--output", "json"],
+    })
+
+    # Resolve IPs onto public IPs, NICs and the VMs the NICs are attached to
+    ips: Dict[str, set] = {}
+    public_by_id = {}
+    for public_ip in network["public_ips"]:
+        resource_id = (public_ip.get("id") or "").lower()
+        public_by_id[resource_id] = public_ip.get("ipAddress")
+        ips.setdefault(resource_id, set()).add(public_ip.get("ipAddress"))
+    for nic in network["nics"]:
+        nic_ips = set()
+        for ip_config in nic.get("ipConfigurations") or []:
+            nic_ips.add(ip_config.get("privateIPAddress"))
+            public_id = ((ip_config.get("publicIPAddress") or {}).get("id") or "").lower()
+            nic_ips.add(public_by_id.get(public_id))
+        ips.setdefault((nic.get("id") or "").lower(), set()).update(nic_ips)
+        vm_id = ((nic.get("virtualMachine") or {}).get("id") or "").lower()
+        if vm_id:
+            ips.setdefault(vm_id, set()).update(nic_ips)
+
+    return [
+        _record(
+            f"azure:{resource['id'].lower()}",
+            resource.get("type"),
+            resource.get("name"),
+            resource.get("location"),
+            resource.get("tags"),
+            ips.get(resource["id"].lower(), ()),
+            id=resource["id"],
+            resourceGroup=resource.get("resourceGroup"),
+            kind=resource.get("kind"),
+        )
+        for resource in resources if resource.get("id")
+    ]
+
+
+def collect_gcp(project: str) -> List[Record]:
+    """Compute instances, buckets, GKE clusters and Cloud SQL instances in one GCP project."""
+    def gcloud(*args: str) -> List[str]:
+        return ["gcloud", *args, "--project", project, "--format", "json", "--quiet"]
+
+    found = _cli_json_many({
+        "instances": gcloud("compute", "instances", "list"),
+        "buckets": gcloud("storage", "buckets", "list"),
+        "clusters": gcloud("container", "clusters", "list"),
+        "sql": gcloud("sql", "instances", "list"),
+    })
+    records = []
+    for instance in found["instances"]:
+        interfaces = instance.get("networkInterfaces") or []
+        addresses = [interface.get("networkIP") for interface in interfaces] + [
+            config_.get("natIP") for interface in interfaces for config_ in interface.get("accessConfigs") or []
+        ]
+        records.append(_record(
+            f"gcp:{instance.get('selfLink') or instance.get('id')}",
+            "compute.instances",
+            instance.get("name"),
+            _basename(instance.get("zone")),
+            {**(instance.get("labels") or {}), **{tag: "" for tag in (instance.get("tags") or {}).get("items", [])}},
+            addresses,
+            machineType=_basename(instance.get("machineType")),
+            status=instance.get("status"),
+        ))
+    for bucket in found["buckets"]:
+        name = bucket.get("name")
+        records.append(_record(
+            f"gcp:gs://{name}", "storage.buckets", name, (bucket.get("location") or "").lower(),
+            bucket.get("labels"), storage_url=bucket.get("storage_url"),
+        ))
+    for cluster in found["clusters"]:
+        records.append(_record(
+            f"gcp:{cluster.get('selfLink') or cluster.get('name')}", "container.clusters", cluster.get("name"),
+            cluster.get("location"), cluster.get("resourceLabels"), [cluster.get("endpoint")],
+            status=cluster.get("status"),
+        ))
+    for instance in found["sql"]:
+        records.append(_record(
+            f"gcp:{instance.get('selfLink') or instance.get('name')}", "sql.instances", instance.get("name"),
+            instance.get("region"), (instance.get("settings") or {}).get("userLabels"),
+            [address.get("ipAddress") for address in instance.get("ipAddresses") or []],
+            databaseVersion=instance.get("databaseVersion"),
+        ))
+    return records
+
+
+def collect_aws(region: str) -> List[Record]:
+    """Tagged resources and EC2 instances (plus S3 buckets in the first region) in one AWS region."""
+    import boto3
+
+    session = boto3.Session(region_name=region)
+    records: Dict[str, Record] = {}
+
+    for page in session.client("resourcegroupstaggingapi").get_paginator("get_resources").paginate():
+        for mapping in page.get("ResourceTagMappingList", []):
+            arn = mapping["ResourceARN"]
+            tags = {tag["Key"]: tag["Value"] for tag in mapping.get("Tags", [])}
+            parts = arn.split(":", 5)
+            resource = parts[5] if len(parts) > 5 else arn
+            resource_type = f"{parts[2]}:{resource.split('/')[0]}" if "/" in resource else parts[2] if len(parts) > 2 else ""
+            records[arn] = _record(f"aws:{arn}", resource_type, tags.get("Name") or _basename(resource), region, tags, arn=arn)
+
+    for page in session.client("ec2").get_paginator("describe_instances").paginate():
+        for reservation in page.get("Reservations", []):
+            for instance in reservation.get("Instances", []):
+                arn = f"arn:aws:ec2:{region}:{reservation.get('OwnerId')}:instance/{instance['InstanceId']}"
+                tags = {tag["Key"]: tag["Value"] for tag in instance.get("Tags", [])}
+                addresses = [instance.get("PrivateIpAddress"), instance.get("PublicIpAddress")] + [
+                    address.get("PrivateIpAddress")
+                    for interface in instance.get("NetworkInterfaces", [])
+                    for address in interface.get("PrivateIpAddresses", [])
+                ]
+                records[arn] = _record(
+                    f"aws:{arn}", "ec2:instance", tags.get("Name") or instance["InstanceId"],
+                    (instance.get("Placement") or {}).get("AvailabilityZone") or region, tags, addresses,
+                    arn=arn, instanceId=instance["InstanceId"], state=(instance.get("State") or {}).get("Name"),
+                    instanceType=instance.get("InstanceType"),
+                )
+
+    # S3 is global; list buckets once, with the first configured region
+    if region == aws_regions()[0]:
+        for bucket in session.client("s3").list_buckets().get("Buckets", []):
+            arn = f"arn:aws:s3:::{bucket['Name']}"
+            records.setdefault(arn, _record(f"aws:{arn}", "s3:bucket", bucket["Name"], "global", {}, arn=arn))
+
+    return list(records.values())
+
+
+# --- Scopes -----------------------------------------------------------------
+
+def aws_regions() -> List[str]:
+    if config.INVENTORY_AWS_REGIONS:
+        return config.INVENTORY_AWS_REGIONS
+    region = os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION")
+    return [region] if region else []
+
+
+def azure_subscription_ids() -> List[str]:
+    return [
+        subscription["id"] for subscription in azure_subscriptions()
+        if subscription.get("state", "Enabled") == "Enabled" and subscription.get("id")
+    ]
+
+
+def gcp_project_ids() -> List[str]:
+    projects = _cli_json(["gcloud", "projects", "list", "--filter=lifecycleState:ACTIVE", "--format", "json", "--quiet"])
+    return [project["projectId"] for project in projects]
+
+
+SCOPES: Dict[str, Callable[[], List[str]]] = {
+    "aws": aws_regions,
+    "azure": azure_subscription_ids,
+    "gcp": gcp_project_ids,
+}
+
+COLLECTORS: Dict[str, Callable[[str], List[Record]]] = {
+    "aws": collect_aws,
+    "azure": collect_azure,
+    "gcp": collect_gcp,
+}
+
+
+# --- Store ------------------------------------------------------------------
+
+def _fts_query(query: str) -> str:
+    # Every whitespace-separated term must match, as a prefix; quotes keep dots and dashes literal
+    terms = [term.strip("*\"'") for term in query.split()]
+    return " ".join(f'"{term}"*' for term in terms if term)
+
+
+class InventoryStore:
+    """SQLite storage for inventory records and per-source refresh state."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = self._connection()
+        connection.executescript(SCHEMA)
+        try:
+            connection.execute(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; fall back to LIKE matching
+            logger.warning("SQLite FTS5 is unavailable, inventory search falls back to substring matching")
+            self.fts = False
+        connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def replace_source(self, provider: str, scope: str, records: List[Record]) -> int:
+        """Upsert one source's records, drop the ones that disappeared, and mark it refreshed."""
+        source = f"{provider}:{scope}"
+        now = time.time()
+        connection = self._connection()
+        with self._write_lock, connection:
+            existing = dict(connection.execute("SELECT uid, digest FROM resources WHERE source = ?", (source,)).fetchall())
+            for record in records:
+                row = (
+                    record["type"], record["name"], record["region"],
+                    json.dumps(record["tags"], sort_keys=True), _join(record["ips"]),
+                    json.dumps(record["data"], sort_keys=True),
+                )
+                digest = hashlib.sha256(json.dumps(row).encode("utf-8")).hexdigest()
+                if existing.get(record["uid"]) == digest:
+                    connection.execute("UPDATE resources SET seen_at = ? WHERE uid = ?", (now, record["uid"]))
+                    continue
+                connection.execute(
+                    "INSERT OR REPLACE INTO resources (uid, source, provider, scope, type, name, region, tags, ips, data, digest, seen_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (record["uid"], source, provider, scope, *row, digest, now),
+                )
+                if self.fts:
+                    connection.execute("DELETE FROM resources_fts WHERE uid = ?", (record["uid"],))
+                    connection.execute(
+                        "INSERT INTO resources_fts (uid, name, type, region, tags, ips, scope) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (record["uid"], record["name"], record["type"], record["region"],
+                         _join(f"{k} {v}" for k, v in record["tags"].items()), _join(record["ips"]), scope),
+                    )
+            gone = [uid for (uid,) in connection.execute(
+                "SELECT uid FROM resources WHERE source = ? AND seen_at < ?", (source, now)
+            ).fetchall()]
+            for uid in gone:
+                connection.execute("DELETE FROM resources WHERE uid = ?", (uid,))
+                if self.fts:
+                    connection.execute("DELETE FROM resources_fts WHERE uid = ?", (uid,))
+            connection.execute(
+                "INSERT OR REPLACE INTO sources (source, provider, scope, refreshed_at, count, error) VALUES (?, ?, ?, ?, ?, NULL)",
+                (source, provider, scope, now, len(records)),
+            )
+        return len(records)
+
+    def record_error(self, provider: str, scope: str, error: str):
+        """Keep the previous snapshot but remember why the last refresh failed."""
+        connection = self._connection()
+        with self._write_lock, connection:
+            connection.execute(
+                "INSERT INTO sources (source, provider, scope, refreshed_at, count, error) VALUES (?, ?, ?, NULL, 0, ?)"
+                " ON CONFLICT(source) DO UPDATE SET error = excluded.error",
+                (f"{provider}:{scope}", provider, scope, error),
+            )
+
+    def mark_stale(self, provider: str, scope: Optional[str] = None):
+        connection = self._connection()
+        with self._write_lock, connection:
+            if scope:
+                connection.execute("UPDATE sources SET refreshed_at = 0 WHERE source = ?", (f"{provider}:{scope}",))
+            else:
+                connection.execute("UPDATE sources SET refreshed_at = 0 WHERE provider = ?", (provider,))
+
+    def sources(self, provider: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        sql = "SELECT * FROM sources" + (" WHERE provider = ?" if provider else "")
+        rows = self._connection().execute(sql, (provider,) if provider else ()).fetchall()
+        return {row["source"]: dict(row) for row in rows}
+
+    def search(self, query: str, provider: Optional[str] = None, resource_type: Optional[str] = None,
+               region: Optional[str] = None, limit: int = 20) -> List[Record]:
+        """
+        Full-text search over names, types, regions, tags, IPs and scopes.
+
+        Args:
+            query: Search terms; every term must match (as a prefix) somewhere in the record
+            provider: Only return resources from this provider
+            resource_type: Only return resources whose type contains this text
+            region: Only return resources in regions starting with this text
+            limit: Maximum number of results
+
+        Returns:
+            Matching resources, best matches first
+        """
+        where, params = [], []
+        if query.strip() and self.fts:
+            sql = "SELECT r.* FROM resources_fts f JOIN resources r ON r.uid = f.uid WHERE resources_fts MATCH ?"
+            params.append(_fts_query(query))
+            order = " ORDER BY f.rank"
+        else:
+            sql = "SELECT r.* FROM resources r WHERE 1 = 1"
+            order = " ORDER BY r.name"
+            for term in query.split():
+                where.append("(r.name || ' ' || r.type || ' ' || r.region || ' ' || r.tags || ' ' || r.ips || ' ' || r.scope) LIKE ?")
+                params.append(f"%{term.strip('*')}%")
+        if provider:
+            where.append("r.provider = ?")
+            params.append(provider)
+        if resource_type:
+            where.append("lower(r.type) LIKE ?")
+            params.append(f"%{resource_type.lower()}%")
+        if region:
+            where.append("lower(r.region) LIKE ?")
+            params.append(f"{region.lower()}%")
+        sql += "".join(f" AND {clause}" for clause in where) + order + " LIMIT ?"
+        params.append(limit)
+
+        results = []
+        for row in self._connection().execute(sql, params).fetchall():
+            results.append({
+                "provider": row["provider"],
+                "scope": row["scope"],
+                "type": row["type"],
+                "name": row["name"],
+                "region": row["region"],
+                "tags": json.loads(row["tags"] or "{}"),
+                "ips": row["ips"].split() if row["ips"] else [],
+                **json.loads(row["data"] or "{}"),
+            })
+        return results
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM resources").fetchone()[0]
+
+
+# --- Refresh ----------------------------------------------------------------
+
+class Inventory:
+    """Inventory store plus the background refresher that keeps every source fresh."""
+
+    def __init__(self, path: str, refresh_interval: float, max_age: float, enabled: bool = True):
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.enabled = enabled
+        self._store: Optional[InventoryStore] = None
+        self._lock = threading.Lock()
+        self._source_locks: Dict[str, threading.Lock] = {}
+        self._scopes: Dict[str, tuple] = {}
+        # Scopes changed by CLI commands, written to the store off the CLI loop
+        self._pending_stale: List[tuple] = []
+        self._started = False
+        self._stop = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="inventory")
+
+    @property
+    def store(self) -> InventoryStore:
+        with self._lock:
+            if self._store is None:
+                self._store = InventoryStore(self.path)
+            return self._store
+
+    def start(self):
+        """Keep refreshing stale sources on a daemon thread; called on the first lookup."""
+        with self._lock:
+            if self._started or not self.enabled or self._stop.is_set():
+                return
+            self._started = True
+        threading.Thread(target=self._refresh_loop, name="inventory-refresh", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._flush_stale()
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            for provider in PROVIDERS:
+                if self._stop.is_set():
+                    return
+                for scope in self.scopes(provider):
+                    if self._stop.is_set():
+                        return
+                    self.refresh_source(provider, scope, max_age=self.refresh_interval)
+            self._stop.wait(min(self.refresh_interval, 60))
+
+    def scopes(self, provider: str) -> List[str]:
+        """Regions/subscriptions/projects of a provider, re-listed at most once per refresh interval."""
+        expires_at, scopes = self._scopes.get(provider, (0.0, []))
+        if time.time() >= expires_at:
+            try:
+                scopes = SCOPES[provider]()
+            except Exception as e:
+                logger.debug(f"Could not list {provider} inventory scopes: {str(e)}")
+                scopes = []
+            self._scopes[provider] = (time.time() + self.refresh_interval, scopes)
+        return scopes
+
+    def refresh_source(self, provider: str, scope: str, max_age: float = 0.0) -> bool:
+        """
+        Re-collect one source unless it was refreshed within max_age seconds.
+
+        Concurrent refreshes of the same source wait for the first one instead
+        of collecting twice.
+
+        Returns:
+            Whether the source now holds data no older than max_age
+        """
+        source = f"{provider}:{scope}"
+        with self._lock:
+            source_lock = self._source_locks.setdefault(source, threading.Lock())
+        self._flush_stale()
+        with source_lock:
+            state = self.store.sources(provider).get(source) or {}
+            if max_age and time.time() - (state.get("refreshed_at") or 0) < max_age:
+                return True
+            started = time.time()
+            try:
+                count = self.store.replace_source(provider, scope, COLLECTORS[provider](scope))
+            except Exception as e:
+                logger.warning(f"Inventory refresh of {source} failed: {str(e)}")
+                self.store.record_error(provider, scope, str(e))
+                return False
+            logger.info(f"Inventory refreshed {source}: {count} resources in {time.time() - started:.1f}s")
+            return True
+
+    def mark_stale(self, provider: str, scope: Optional[str] = None):
+        """
+        Force the next lookup to re-collect a scope (or a whole provider) after a change.
+
+        Called on the CLI loop, so the mark is only queued here; lookups and
+        refreshes write it to the store before they read it.
+        """
+        if self.enabled:
+            with self._lock:
+                self._pending_stale.append((provider, scope))
+
+    def _flush_stale(self):
+        with self._lock:
+            pending, self._pending_stale = self._pending_stale, []
+        for provider, scope in dict.fromkeys(pending):
+            try:
+                self.store.mark_stale(provider, scope)
+            except sqlite3.Error as e:
+                logger.debug(f"Could not mark inventory stale: {str(e)}")
+
+    def stale_sources(self, providers: Iterable[str]) -> List[str]:
+        """Sources of the given providers that are missing or older than max_age."""
+        self._flush_stale()
+        now = time.time()
+        stale = []
+        for provider in providers:
+            sources = self.store.sources(provider)
+            for scope in self.scopes(provider):
+                refreshed_at = (sources.get(f"{provider}:{scope}") or {}).get("refreshed_at") or 0
+                if now - refreshed_at >= self.max_age:
+                    stale.append(f"{provider}:{scope}")
+        return stale
+
+    def refresh_now(self, sources: List[str], timeout: float) -> List[str]:
+        """
+        Refresh sources in parallel, waiting at most timeout seconds.
+
+        Refreshes that are still running when the timeout expires carry on in
+        the background.
+
+        Returns:
+            Sources that are still stale
+        """
+        futures = {
+            self._pool.submit(self.refresh_source, *source.split(":", 1), self.max_age): source
+            for source in sources
+        }
+        done, _ = wait(futures, timeout=timeout)
+        return [source for future, source in futures.items() if future not in done or not future.result()]
+
+    def freshness(self, providers: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Age and last error of every known source of the given providers."""
+        self._flush_stale()
+        now = time.time()
+        report = {}
+        for provider in providers:
+            for source, state in self.store.sources(provider).items():
+                refreshed_at = state.get("refreshed_at") or 0
+                report[source] = {
+                    "age_seconds": round(now - refreshed_at) if refreshed_at else None,
+                    "resources": state.get("count"),
+                    **({"error": state["error"]} if state.get("error") else {}),
+                }
+        return report
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {"enabled": False}
+        return {"enabled": True, "resources": self.store.count(), "sources": self.freshness(PROVIDERS)}
+
+
+inventory = Inventory(
+    path=config.INVENTORY_DB_PATH,
+    refresh_interval=config.INVENTORY_REFRESH_SECONDS,
+    max_age=config.INVENTORY_MAX_AGE_SECONDS,
+    enabled=config.INVENTORY_ENABLED,
+)
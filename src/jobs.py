@@ -0,0 +1,405 @@
+"""Asynchronous jobs for long-running swarm runs.
+
+A swarm run may take up to an hour, far longer than proxies and load
+balancers keep an idle request open. ``POST /jobs`` admits the run and
+returns a job id at once; the run continues in the background whether or not
+anyone is listening. Its progress (agent starts and stops, handoffs and the
+agents' output, coalesced into a few writes per second) and its final result
+are kept in a local SQLite store, so a client can poll ``GET /jobs/{id}`` or
+follow ``GET /jobs/{id}/events`` and pick up where it left off after a
+disconnect.
+
+``DELETE /jobs/{id}`` cancels a job: its run stops at the next handoff,
+model or tool call and its CLI processes are killed. Jobs still queued or
+running when the server stops are marked failed on the next start. Finished
+jobs are deleted after the retention period.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from src.cancellation import JOB_CANCELLED, SHUTDOWN, Cancellation
+from src.streaming import text_delta
+from src.token_usage import TokenUsage
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+# Last event of every job; followers stop after it
+DONE_EVENT = "done"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    prompt TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT,
+    usage TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, finished_at);
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    data TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+
+def _job(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    for field in ("result", "usage"):
+        job[field] = json.loads(job[field]) if job[field] else None
+    return job
+
+
+class JobStore:
+    """SQLite storage for jobs, their results and their progress events."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = self._connection()
+        connection.executescript(SCHEMA)
+        connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def create(self, prompt: str) -> Dict[str, Any]:
+        """Record a new queued job."""
+        job_id = uuid.uuid4().hex
+        connection = self._connection()
+        with self._write_lock, connection:
+            connection.execute(
+                "INSERT INTO jobs (id, prompt, status, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, prompt, QUEUED, time.time()),
+            )
+        return self.get(job_id)
+
+    def start(self, job_id: str):
+        """Mark a job running."""
+        connection = self._connection()
+        with self._write_lock, connection:
+            connection.execute("UPDATE jobs SET status = ?, started_at = ? WHERE id = ?", (RUNNING, time.time(), job_id))
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None,
+               usage: Optional[Dict[str, Any]] = None):
+        """Store a job's outcome and append its ``done`` event."""
+        connection = self._connection()
+        with self._write_lock, connection:
+            connection.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ?, usage = ? WHERE id = ?",
+                (status, time.time(), json.dumps(result) if result is not None else None, error,
+                 json.dumps(usage) if usage is not None else None, job_id),
+            )
+            self._append(connection, job_id, [(DONE_EVENT, {"status": status, "error": error})])
+
+    def add_events(self, job_id: str, events: List[tuple]):
+        """Append ``(type, data)`` progress events to a job."""
+        if not events:
+            return
+        connection = self._connection()
+        with self._write_lock, connection:
+            self._append(connection, job_id, events)
+
+    @staticmethod
+    def _append(connection: sqlite3.Connection, job_id: str, events: List[tuple]):
+        (seq,) = connection.execute("SELECT COALESCE(MAX(seq), 0) FROM job_events WHERE job_id = ?", (job_id,)).fetchone()
+        now = time.time()
+        connection.executemany(
+            "INSERT INTO job_events (job_id, seq, type, data, created_at) VALUES (?, ?, ?, ?, ?)",
+            [(job_id, seq + i, kind, json.dumps(data), now) for i, (kind, data) in enumerate(events, start=1)],
+        )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job(row) if row is not None else None
+
+    def events(self, job_id: str, after: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        """A job's events with a sequence number above ``after``, oldest first."""
+        rows = self._connection().execute(
+            "SELECT seq, type, data, created_at FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (job_id, after, limit),
+        ).fetchall()
+        return [{"seq": row["seq"], "type": row["type"], "data": json.loads(row["data"]), "created_at": row["created_at"]}
+                for row in rows]
+
+    def interrupt_unfinished(self, reason: str) -> int:
+        """Fail every job that is still queued or running (left over from a previous process)."""
+        connection = self._connection()
+        with self._write_lock, connection:
+            job_ids = [job_id for (job_id,) in connection.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchall()]
+            for job_id in job_ids:
+                connection.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                    (FAILED, time.time(), reason, job_id),
+                )
+                self._append(connection, job_id, [(DONE_EVENT, {"status": FAILED, "error": reason})])
+        return len(job_ids)
+
+    def prune(self, older_than: float) -> int:
+        """Delete jobs that finished before ``older_than`` (epoch seconds), with their events."""
+        connection = self._connection()
+        with self._write_lock, connection:
+            job_ids = [job_id for (job_id,) in connection.execute(
+                "SELECT id FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (older_than,)
+            ).fetchall()]
+            for job_id in job_ids:
+                connection.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+                connection.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return len(job_ids)
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+
+class JobManager:
+    """Runs jobs on the execution engine in the background and records them in the job store."""
+
+    def __init__(self, path: str, engine: Any, render: Callable[[Any], Dict[str, Any]],
+                 retention: float, flush_interval: float, keepalive_interval: float):
+        """
+        Args:
+            path: SQLite database file of the job store
+            engine: Execution engine the jobs run on
+            render: Turns a swarm or graph result into the stored job result
+            retention: Seconds finished jobs are kept
+            flush_interval: Seconds agents' output is collected before it is written as one event
+            keepalive_interval: Seconds between keepalive comments on an idle event stream
+        """
+        self.path = path
+        self.engine = engine
+        self.render = render
+        self.retention = retention
+        self.flush_interval = flush_interval
+        self.keepalive_interval = keepalive_interval
+        self._store: Optional[JobStore] = None
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._usage: Dict[str, TokenUsage] = {}
+        self._cancellations: Dict[str, Cancellation] = {}
+        self._pruned_at = 0.0
+
+    @property
+    def store(self) -> JobStore:
+        with self._lock:
+            if self._store is None:
+                self._store = JobStore(self.path)
+            return self._store
+
+    def start(self):
+        """Fail jobs a previous process left unfinished and drop expired ones."""
+        interrupted = self.store.interrupt_unfinished("The server restarted before the job finished")
+        if interrupted:
+            logger.warning(f"Marked {interrupted} interrupted jobs as failed")
+        self._prune()
+
+    async def stop(self):
+        """Cancel running jobs and wait until their state is recorded as failed."""
+        for cancellation in list(self._cancellations.values()):
+            cancellation.cancel(SHUTDOWN)
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        # Let each job record its outcome before the event loop goes away
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _prune(self):
+        self._pruned_at = time.time()
+        removed = self.store.prune(self._pruned_at - self.retention)
+        if removed:
+            logger.info(f"Removed {removed} expired jobs")
+
+    async def submit(self, prompt: str, usage: Optional[TokenUsage] = None) -> Dict[str, Any]:
+        """
+        Admit a run on the engine and record it as a job.
+
+        Args:
+            prompt: The task for the swarm
+            usage: Accounts the run's model tokens and enforces its token budgets
+
+        Returns:
+            The new job
+
+        Raises:
+            EngineSaturatedError: When the engine is at capacity
+            EngineUnavailableError: When the engine is shutting down
+        """
+        usage = usage or TokenUsage()
+        cancellation = Cancellation()
+        events = self.engine.stream(prompt, usage=usage, cancellation=cancellation)
+        try:
+            job = await asyncio.to_thread(self.store.create, prompt)
+        except Exception:
+            # The run is already dispatched, and closing the unstarted stream does not stop it
+            cancellation.cancel(JOB_CANCELLED)
+            await events.aclose()
+            raise
+        job_id = job["id"]
+        self._usage[job_id] = usage
+        self._cancellations[job_id] = cancellation
+        task = asyncio.create_task(self._run(job_id, events, usage, cancellation), name=f"job-{job_id}")
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._forget(job_id))
+        logger.info(f"Job {job_id} submitted")
+        return job
+
+    def _forget(self, job_id: str):
+        self._tasks.pop(job_id, None)
+        self._usage.pop(job_id, None)
+        self._cancellations.pop(job_id, None)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job running in this process.
+
+        Returns:
+            False if the job is not running here (unknown or already finished)
+        """
+        cancellation = self._cancellations.get(job_id)
+        if cancellation is None:
+            return False
+        if cancellation.cancel(JOB_CANCELLED):
+            logger.info(f"Job {job_id} cancelled")
+        return True
+
+    async def _run(self, job_id: str, events: AsyncIterator[Dict[str, Any]], usage: TokenUsage,
+                   cancellation: Cancellation):
+        store = self.store
+        pending: List[tuple] = []
+        # Output per agent since the last write, in the order agents produced it
+        text: Dict[str, List[str]] = {}
+        flushed_at = time.monotonic()
+
+        def collect_text():
+            for node_id, parts in text.items():
+                pending.append(("text", {"node": node_id, "text": "".join(parts)}))
+            text.clear()
+
+        async def flush():
+            nonlocal flushed_at
+            collect_text()
+            if pending:
+                batch = list(pending)
+                pending.clear()
+                await asyncio.to_thread(store.add_events, job_id, batch)
+            flushed_at = time.monotonic()
+
+        result = None
+        started = False
+        try:
+            async for event in events:
+                if not started:
+                    started = True
+                    await asyncio.to_thread(store.start, job_id)
+                event_type = event.get("type")
+                if event_type == "multiagent_node_start":
+                    collect_text()
+                    pending.append(("node_start", {"node": event.get("node_id")}))
+                elif event_type == "multiagent_node_stream":
+                    delta = text_delta(event)
+                    if delta:
+                        text.setdefault(event.get("node_id") or "", []).append(delta)
+                elif event_type == "multiagent_node_stop":
+                    collect_text()
+                    pending.append(("node_stop", {"node": event.get("node_id")}))
+                elif event_type == "multiagent_handoff":
+                    pending.append(("handoff", {
+                        "from": event.get("from_node_ids") or [],
+                        "to": event.get("to_node_ids") or [],
+                    }))
+                elif event_type == "multiagent_result":
+                    result = event.get("result")
+                if (pending or text) and time.monotonic() - flushed_at >= self.flush_interval:
+                    await flush()
+            await flush()
+            if cancellation.cancelled:
+                # Keep what the run produced before it stopped
+                rendered = self.render(result) if result is not None else None
+                await asyncio.to_thread(store.finish, job_id, CANCELLED, rendered, cancellation.message(), usage.summary())
+                logger.info(f"Job {job_id} stopped after cancellation")
+            elif result is None:
+                raise RuntimeError("The run ended without a result")
+            else:
+                await asyncio.to_thread(store.finish, job_id, COMPLETED, self.render(result), None, usage.summary())
+                logger.info(f"Job {job_id} completed")
+        except asyncio.CancelledError:
+            # Shutting down: the event loop is going away, so record the outcome directly
+            store.finish(job_id, FAILED, error="The server shut down before the job finished", usage=usage.summary())
+            raise
+        except Exception as e:
+            logger.warning(f"Job {job_id} failed: {str(e)}")
+            try:
+                await flush()
+            except Exception:
+                pass
+            status = CANCELLED if cancellation.cancelled else FAILED
+            await asyncio.to_thread(store.finish, job_id, status, None, str(e), usage.summary())
+        if time.time() - self._pruned_at > min(self.retention, 3600):
+            await asyncio.to_thread(self._prune)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job's state; running jobs report their token usage so far."""
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is not None and job["status"] not in FINISHED and job_id in self._usage:
+            job["usage"] = self._usage[job_id].summary()
+        return job
+
+    async def follow(self, job_id: str, after: int = 0, poll_interval: float = 0.25) -> AsyncIterator[str]:
+        """
+        Server-sent events for a job's progress, from the event after ``after`` until its ``done`` event.
+
+        Each event carries its sequence number as the SSE id, so a client that
+        reconnects with ``Last-Event-ID`` resumes where it stopped. Idle streams
+        get a comment every keepalive interval so intermediaries keep them open.
+        """
+        idle_since = time.monotonic()
+        while True:
+            events = await asyncio.to_thread(self.store.events, job_id, after)
+            for event in events:
+                after = event["seq"]
+                payload = json.dumps({**event["data"], "created_at": event["created_at"]}, ensure_ascii=False)
+                yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {payload}\n\n"
+                if event["type"] == DONE_EVENT:
+                    return
+            if events:
+                idle_since = time.monotonic()
+                continue
+            if time.monotonic() - idle_since >= self.keepalive_interval:
+                idle_since = time.monotonic()
+                yield ": keepalive\n\n"
+            await asyncio.sleep(poll_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        """Jobs per status and how many run in this process."""
+        return {"running_here": len(self._tasks), "jobs": self.store.counts()}
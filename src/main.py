@@ -1,22 +1,31 @@
 import logging
-from strands import Agent
-from strands_tools import use_aws
-from strands.tools.mcp.mcp_client import MCPClient
-from strands.multiagent import Swarm
-from mcp.client.sse import sse_client
-from src.tools.claude_code import claude_code
-from src.tools.use_gcp import use_gcp, gcp_auth_status, gcp_set_project, gcp_project_info
-from src.tools.use_azure import use_azure, azure_auth_status, azure_set_subscription, azure_subscription_info, azure_list_subscriptions, azure_set_location
-from src.prompts.sky_agent import SKY_AGENT_PROMPT
-from src.prompts.aws_agent import AWS_AGENT_PROMPT
-from src.prompts.azure_agent import AZURE_AGENT_PROMPT
-from src.prompts.gcp_agent import GCP_AGENT_PROMPT
-from src.prompts.coding_agent import CODING_AGENT_PROMPT
-from src.prompts.atlassian_agent import ATLASSIAN_AGENT_PROMPT
-from fastapi import FastAPI
+from src.mcp_config import load_servers
+from src.mcp_manager import McpManager
+from src.execution import create_engine, EngineSaturatedError, EngineUnavailableError
+from src.streaming import cached_completion_chunks, chat_completion_chunks
+from src.sessions import create_session_store
+from src.router import router
+from src.tools.cli_cache import command_cache
+from src.tools.cli_runner import cli_flights
+from src.mcp_cache import mcp_cache
+from src.response_cache import CACHE_STATUS_HEADER, bypass_requested, response_cache
+from src.tool_audit import ToolAudit
+from src.token_usage import TokenUsage, for_request
+from src.cancellation import CLIENT_DISCONNECTED, Cancellation
+from src.tools.cli_registry import cli_registry
+from src.tools.azure_executor import azure_executor
+from src.inventory import inventory
+from src.jobs import JobManager
+from src.tools.claude_code import claude_sessions
+from src import config, metrics
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import uvicorn
+import asyncio
 import time
 import uuid
 
@@ -26,65 +35,78 @@ logging.basicConfig(
     format="%(levelname)s | %(name)s | %(message)s",
     handlers=[logging.StreamHandler()]
 )
+logger = logging.getLogger(__name__)
+
+# MCP servers connect in the background; their tools come from schema snapshots until then
+mcp_servers = McpManager.from_specs(load_servers())
+
+# Each run builds its own swarm from the agent factory; the engine bounds how many run at once
+engine = create_engine(mcp_servers)
+
+# Conversation sessions keep a warm swarm per chat so follow-up turns only append
+sessions = create_session_store()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Detect az/gcloud versions, extensions and auth once instead of on every tool call
+    cli_registry.start()
+    mcp_servers.start()
+    azure_executor.start()
+    jobs.start()
+    yield
+    await jobs.stop()
+    inventory.stop()
+    claude_sessions.shutdown()
+    mcp_servers.stop()
+    cli_registry.stop()
+    azure_executor.shutdown()
+    engine.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+class RequestMetricsMiddleware:
+    """Latency and in-flight count per route (time to first byte for streamed responses)
+
+    A plain ASGI middleware: ``@app.middleware("http")`` would hide client disconnects from the handlers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        route = scope["path"] if scope["path"] in {route.path for route in app.routes} else "other"
+        started = time.perf_counter()
+        in_flight = metrics.REQUESTS_IN_FLIGHT.labels(route)
+        in_flight.inc()
+        status = "500"
+        recorded = False
+
+        def record():
+            nonlocal recorded
+            if not recorded:
+                recorded = True
+                in_flight.dec()
+                metrics.REQUEST_DURATION.labels(route, scope["method"], status).observe(time.perf_counter() - started)
+
+        async def send_with_metrics(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                record()
+            await send(message)
 
-atlassian_mcp_client = MCPClient(lambda: sse_client("http://mcp-proxy:8090/servers/atlassian/sse"))
-atlassian_mcp_client.start()
-atlassian = atlassian_mcp_client.list_tools_sync()
-
-github_mcp_client = MCPClient(lambda: sse_client("http://mcp-proxy:8090/servers/github/sse"))
-github_mcp_client.start()
-github = github_mcp_client.list_tools_sync()
-
-# Create specialized cloud agents
-sky_agent = Agent(
-    name="sky_agent",
-    system_prompt=SKY_AGENT_PROMPT,
-)
-
-aws_agent = Agent(
-    name="aws_agent",
-    system_prompt=AWS_AGENT_PROMPT,
-    tools=[use_aws]
-)
-
-azure_agent = Agent(
-    name="azure_agent",
-    system_prompt=AZURE_AGENT_PROMPT,
-    tools=[use_azure, azure_auth_status, azure_set_subscription, azure_subscription_info, azure_list_subscriptions, azure_set_location]
-)
-
-gcp_agent = Agent(
-    name="gcp_agent",
-    system_prompt=GCP_AGENT_PROMPT,
-    tools=[use_gcp, gcp_auth_status, gcp_set_project, gcp_project_info]
-)
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            record()
 
-coding_agent = Agent(
-    name="coding_agent",
-    system_prompt=CODING_AGENT_PROMPT,
-    tools=[claude_code, github]
-)
 
-# Create Atlassian agent with MCP tools
-atlassian_agent = Agent(
-    name="atlassian_agent",
-    system_prompt=ATLASSIAN_AGENT_PROMPT,
-    tools=[atlassian]
-)
-
-# Create a swarm with these agents, starting with the multicloud coordinator
-swarm = Swarm(
-    [sky_agent, aws_agent, azure_agent, gcp_agent, coding_agent, atlassian_agent],
-    entry_point=sky_agent,  # Start with the coordinator
-    max_handoffs=20,
-    max_iterations=20,
-    execution_timeout=3600.0,  # 60 minutes
-    node_timeout=3600.0,       # 60 minutes per agent
-    repetitive_handoff_detection_window=8,  # There must be >= 3 unique agents in the last 8 handoffs
-    repetitive_handoff_min_unique_agents=3
-)
-
-app = FastAPI()
+app.add_middleware(RequestMetricsMiddleware)
 
 class InvokeRequest(BaseModel):
     prompt: str
@@ -100,6 +122,7 @@ class ChatCompletionRequest(BaseModel):
     temperature: Optional[float] = 0.7
     max_tokens: Optional[int] = None
     stream: Optional[bool] = False
+    stream_options: Optional[Dict[str, Any]] = None
 
 class ChatCompletionChoice(BaseModel):
     index: int
@@ -129,28 +152,135 @@ class ModelsResponse(BaseModel):
     object: str = "list"
     data: List[ModelInfo]
 
+def admission_error_response(error: Exception) -> JSONResponse:
+    """Map execution engine admission errors to 429/503 responses"""
+    status_code = 429 if isinstance(error, EngineSaturatedError) else 503
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": str(error)},
+        headers={"Retry-After": str(config.RETRY_AFTER_SECONDS)}
+    )
+
+async def until_disconnected(http_request: Request, cancellation: Cancellation, run: Any) -> Any:
+    """Await a run, cancelling it if the HTTP client disconnects first"""
+    task = asyncio.ensure_future(run)
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=config.DISCONNECT_POLL_SECONDS)
+            if not task.done() and await http_request.is_disconnected():
+                logger.info(f"Client disconnected from {http_request.url.path}, cancelling its run")
+                cancellation.cancel(CLIENT_DISCONNECTED)
+                break
+        return await task
+    except asyncio.CancelledError:
+        cancellation.cancel(CLIENT_DISCONNECTED)
+        raise
+
+def invoke_payload(result: Any) -> Dict[str, Any]:
+    """JSON body of a swarm or fan-out graph result, as returned by /invoke and stored for jobs"""
+    response_data = {
+        "status": str(result.status),
+        "node_history": [node.node_id for node in getattr(result, "node_history", None) or result.execution_order],
+        "results": result.results if result.results else "No results available"
+    }
+    return jsonable_encoder(response_data)
+
+# Long-running prompts run as background jobs whose progress and results survive client disconnects
+jobs = JobManager(
+    config.JOBS_DB_PATH,
+    engine,
+    render=invoke_payload,
+    retention=config.JOB_RETENTION_SECONDS,
+    flush_interval=config.JOB_EVENT_FLUSH_SECONDS,
+    keepalive_interval=config.JOB_EVENTS_KEEPALIVE_SECONDS,
+)
+
+def conversation_id(http_request: Request) -> Optional[str]:
+    """Conversation id from the first configured header present on the request"""
+    for header in config.CONVERSATION_ID_HEADERS:
+        value = http_request.headers.get(header)
+        if value:
+            return value
+    return None
+
 @app.post("/invoke")
-async def invoke_agent(request: InvokeRequest):
+async def invoke_agent(request: InvokeRequest, http_request: Request, http_response: Response):
     """Invoke the agent with a prompt"""
     try:
-        # Execute the sky-agent swarm with the given prompt
-        result = swarm(request.prompt)
+        # Repeated read-only questions are answered from the response cache
+        bypass = bypass_requested(http_request.headers)
+        cache_key = None if bypass else response_cache.key("invoke", request.prompt)
+        cached = response_cache.get(cache_key)
+        http_response.headers[CACHE_STATUS_HEADER] = "bypass" if bypass else "hit" if cached is not None else "miss"
+        if cached is not None:
+            # No model tokens were spent on a cached answer
+            return {**cached, "usage": TokenUsage().summary()}
+
+        # Execute the sky-agent swarm with the given prompt on the worker pool
+        audit = ToolAudit()
+        usage = for_request(http_request.headers)
+        cancellation = Cancellation()
+        result = await until_disconnected(
+            http_request, cancellation, engine.run(request.prompt, audit=audit, usage=usage, cancellation=cancellation)
+        )
 
         # Access the final result
         # print(f"Status: {result.status}")
         # print(f"Node history: {[node.node_id for node in result.node_history]}")
         # print(f"Final response: {result.final_response}")
 
-        response_data = {
-            "status": str(result.status),
-            "node_history": [node.node_id for node in result.node_history],
-            "results": result.results if result.results else "No results available"
-        }
+        response_data = invoke_payload(result)
+        # A run cut short by its token budget or cancelled is not a reusable answer
+        if usage.exceeded is None and not cancellation.cancelled:
+            response_cache.store("invoke", cache_key, response_data, audit)
 
-        return response_data
+        return {**response_data, "usage": usage.summary()}
+    except (EngineSaturatedError, EngineUnavailableError) as e:
+        return admission_error_response(e)
     except Exception as e:
         return {"error": str(e)}
 
+@app.post("/jobs", status_code=202)
+async def submit_job(request: InvokeRequest, http_request: Request):
+    """Run a prompt in the background and return its job id immediately"""
+    try:
+        job = await jobs.submit(request.prompt, usage=for_request(http_request.headers))
+    except (EngineSaturatedError, EngineUnavailableError) as e:
+        return admission_error_response(e)
+    return {"id": job["id"], "status": job["status"], "created_at": job["created_at"]}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status of a job, with its result once it has finished"""
+    job = await jobs.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": f"Unknown job: {job_id}"})
+    return job
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; it stops at its next handoff, model or tool call"""
+    job = await jobs.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": f"Unknown job: {job_id}"})
+    if not jobs.cancel(job_id):
+        return JSONResponse(status_code=409, content={"error": f"Job {job_id} is not running", "status": job["status"]})
+    return JSONResponse(status_code=202, content={"id": job_id, "status": "cancelling"})
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, http_request: Request, after: int = 0):
+    """Server-sent progress events of a job; resume with Last-Event-ID or ?after=<seq>"""
+    if await jobs.get(job_id) is None:
+        return JSONResponse(status_code=404, content={"error": f"Unknown job: {job_id}"})
+    last_event_id = http_request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        after = max(after, int(last_event_id))
+    return StreamingResponse(
+        jobs.follow(job_id, after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # OpenAI-compatible endpoints for Open WebUI integration
 @app.get("/v1/models")
 async def list_models():
@@ -166,19 +296,75 @@ async def list_models():
     )
 
 @app.post("/v1/chat/completions")
-async def chat_completions(request: ChatCompletionRequest):
+async def chat_completions(request: ChatCompletionRequest, http_request: Request, http_response: Response):
     """OpenAI-compatible chat completions endpoint"""
     try:
         # Extract the user's message from the chat format
-        user_messages = [msg.content for msg in request.messages if msg.role == "user"]
-        if not user_messages:
+        user_indexes = [i for i, msg in enumerate(request.messages) if msg.role == "user"]
+        if not user_indexes:
             return {"error": "No user message found"}
 
-        # Use the last user message as the prompt
-        prompt = user_messages[-1]
+        # Use the last user message as the prompt; everything before it is the conversation so far
+        prompt = request.messages[user_indexes[-1]].content
+        history = [(msg.role, msg.content) for msg in request.messages[:user_indexes[-1]]]
+        session = sessions.resolve(conversation_id(http_request), history)
+
+        # Repeated read-only questions are answered from the response cache
+        bypass = bypass_requested(http_request.headers)
+        cache_key = None if bypass else response_cache.key("chat", prompt, history)
+        cached = response_cache.get(cache_key)
+        cache_status = "bypass" if bypass else "hit" if cached is not None else "miss"
+        http_response.headers[CACHE_STATUS_HEADER] = cache_status
+        stream_headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", CACHE_STATUS_HEADER: cache_status}
+        # OpenAI clients opt in to a final streamed chunk carrying the usage
+        include_usage = bool((request.stream_options or {}).get("include_usage"))
+
+        if cached is not None:
+            if request.stream:
+                return StreamingResponse(
+                    cached_completion_chunks(
+                        cached,
+                        request.model,
+                        on_complete=lambda reply: sessions.commit(session, history, prompt, reply),
+                        usage=TokenUsage() if include_usage else None
+                    ),
+                    media_type="text/event-stream",
+                    headers=stream_headers
+                )
+            sessions.commit(session, history, prompt, cached)
+            return ChatCompletionResponse(
+                id=f"chatcmpl-{str(uuid.uuid4())}",
+                created=int(time.time()),
+                model=request.model,
+                choices=[ChatCompletionChoice(index=0, message=ChatMessage(role="assistant", content=cached), finish_reason="stop")],
+                usage=ChatCompletionUsage(**TokenUsage().openai_usage())
+            )
+
+        audit = ToolAudit()
+        usage = for_request(http_request.headers)
+        cancellation = Cancellation()
+
+        def complete(reply: str):
+            # Nobody saw the reply of a cancelled run; leave the conversation as it was
+            if cancellation.cancelled:
+                return
+            sessions.commit(session, history, prompt, reply)
+            if usage.exceeded is None:
+                response_cache.store("chat", cache_key, reply, audit)
+
+        # Stream chat.completion.chunk events while the swarm works; the run is cancelled if the client goes away
+        if request.stream:
+            events = engine.stream(prompt, session=session, audit=audit, usage=usage, cancellation=cancellation)
+            return StreamingResponse(
+                chat_completion_chunks(events, request.model, on_complete=complete, usage=usage, include_usage=include_usage),
+                media_type="text/event-stream",
+                headers=stream_headers
+            )
 
-        # Call the existing agent system
-        result = swarm(prompt)
+        # Call the existing agent system on the worker pool
+        result = await until_disconnected(
+            http_request, cancellation, engine.run(prompt, session=session, audit=audit, usage=usage, cancellation=cancellation)
+        )
 
         # Format the agent response for Open WebUI
         try:
@@ -212,8 +398,10 @@ async def chat_completions(request: ChatCompletionRequest):
                 agent_response = f"Task executed with status: {result.status}"
 
             # Add agents involved footer
-            if hasattr(result, 'node_history') and result.node_history:
-                agents_used = [node.node_id for node in result.node_history]
+            # Swarm results record handoffs in node_history, fan-out graph results in execution_order
+            node_history = getattr(result, 'node_history', None) or getattr(result, 'execution_order', None)
+            if node_history:
+                agents_used = [node.node_id for node in node_history]
                 agent_response += f"**Agents involved:** {' → '.join(agents_used)}"
 
             # Ensure we always have a non-empty string response
@@ -228,9 +416,9 @@ async def chat_completions(request: ChatCompletionRequest):
         if not isinstance(agent_response, str):
             agent_response = str(agent_response)
 
-        # Debug: Log the response type and content
-        print(f"DEBUG: agent_response type: {type(agent_response)}")
-        print(f"DEBUG: agent_response content: {agent_response[:200]}...")
+        complete(agent_response)
+
+        logger.debug(f"agent_response: {agent_response[:200]}...")
 
         # Create OpenAI-compatible response
         response = ChatCompletionResponse(
@@ -247,15 +435,13 @@ async def chat_completions(request: ChatCompletionRequest):
                     finish_reason="stop"
                 )
             ],
-            usage=ChatCompletionUsage(
-                prompt_tokens=len(prompt.split()),
-                completion_tokens=len(agent_response.split()),
-                total_tokens=len(prompt.split()) + len(agent_response.split())
-            )
+            usage=ChatCompletionUsage(**usage.openai_usage())
         )
 
         return response
 
+    except (EngineSaturatedError, EngineUnavailableError) as e:
+        return admission_error_response(e)
     except Exception as e:
         return ChatCompletionResponse(
             id=f"chatcmpl-{str(uuid.uuid4())}",
@@ -278,10 +464,50 @@ async def chat_completions(request: ChatCompletionRequest):
             )
         )
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metrics: request, run, agent, tool, CLI and MCP latencies and token counts"""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters and occupancy of the result caches, and coalesced CLI commands"""
+    return {
+        "cli": command_cache.stats(),
+        "cli_in_flight": cli_flights.stats(),
+        "mcp": mcp_cache.stats(),
+        "responses": response_cache.stats(),
+    }
+
+@app.get("/capabilities")
+async def capabilities():
+    """Detected cloud CLI binaries, versions, extensions and auth state"""
+    return cli_registry.snapshot()
+
+@app.get("/inventory/stats")
+async def inventory_stats():
+    """Resource count and per-source freshness of the cloud inventory index"""
+    return inventory.stats()
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "executions": engine.stats(),
+        "sessions": sessions.stats(),
+        "routing": router.stats(),
+        "claude_code_sessions": claude_sessions.stats(),
+        "mcp": mcp_servers.status(),
+        "jobs": jobs.stats(),
+    }
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: every MCP server's tool schemas are known (live or from a snapshot)"""
+    status = mcp_servers.status()
+    return JSONResponse(status_code=200 if mcp_servers.ready else 503, content={"ready": mcp_servers.ready, "mcp": status})
 
 def main():
     """Main entry point for the sky-agent application."""
@@ -0,0 +1,273 @@
+"""Read-through cache for MCP tool results.
+
+The Atlassian and coding agents fetch the same Jira issues, Confluence pages,
+repository files and pull requests repeatedly, within one swarm run (across
+handoffs) and across users. Results of allowlisted read-only tools are cached,
+keyed on server, tool name and canonical (sorted, compact JSON) arguments,
+each tool with its own TTL, in an LRU bounded by entry count and total size.
+
+Every other tool is treated as a write. Before it runs, cached entries that
+touch the same issue, project, page, space or repository (taken from the
+call arguments) are dropped, as are entries that could not be tied to a
+resource (searches); a write whose target cannot be identified drops the
+whole server's entries.
+
+Identical read-only calls that are already in flight are coalesced through
+``src.single_flight``: the first caller runs the tool and the others wait
+for its result, even when caching is disabled.
+"""
+
+import copy
+import fnmatch
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional, Tuple
+
+from src.single_flight import SingleFlight
+from src import config
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, str, str]
+
+# Read-only tools of mcp-atlassian and github-mcp-server, with TTLs in seconds.
+# Servers can override these with a "cache" map in the MCP servers file.
+DEFAULT_READ_TOOLS: Dict[str, Dict[str, float]] = {
+    "atlassian": {
+        "jira_get_issue": 60,
+        "jira_search": 30,
+        "jira_get_project_issues": 30,
+        "jira_get_transitions": 300,
+        "jira_get_worklog": 60,
+        "jira_get_agile_boards": 300,
+        "jira_get_board_issues": 30,
+        "jira_get_sprints_from_board": 120,
+        "jira_get_sprint_issues": 30,
+        "jira_get_link_types": 3600,
+        "jira_get_all_projects": 600,
+        "jira_get_project_versions": 300,
+        "jira_search_fields": 3600,
+        "jira_get_user_profile": 600,
+        "confluence_get_page": 120,
+        "confluence_get_page_children": 120,
+        "confluence_get_comments": 60,
+        "confluence_get_labels": 120,
+        "confluence_search": 60,
+        "confluence_search_user": 600,
+    },
+    "github": {
+        "get_me": 600,
+        "get_file_contents": 120,
+        "get_issue": 60,
+        "get_issue_comments": 60,
+        "get_pull_request": 60,
+        "get_pull_request_*": 60,
+        "get_commit": 3600,
+        "get_tag": 600,
+        "list_*": 30,
+        "search_*": 60,
+    },
+}
+
+_ISSUE_KEY = re.compile(r"^([A-Z][A-Z0-9_]+)-\d+$")
+
+
+def canonical_arguments(arguments: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def resource_tags(arguments: Optional[Dict[str, Any]]) -> FrozenSet[str]:
+    """Issues, projects, pages, spaces and repositories a call refers to."""
+    args = {key.lower().replace("_", ""): value for key, value in (arguments or {}).items()}
+    tags = set()
+    for name in ("issuekey", "issueidorkey", "parentkey", "epickey", "inwardissuekey", "outwardissuekey"):
+        value = str(args.get(name) or "").upper()
+        if value:
+            tags.add(f"issue:{value}")
+            match = _ISSUE_KEY.match(value)
+            if match:
+                tags.add(f"project:{match.group(1)}")
+    if args.get("projectkey"):
+        tags.add(f"project:{str(args['projectkey']).upper()}")
+    for name in ("pageid", "parentid"):
+        if args.get(name):
+            tags.add(f"page:{args[name]}")
+    if args.get("spacekey"):
+        tags.add(f"space:{str(args['spacekey']).upper()}")
+    if args.get("owner") and args.get("repo"):
+        tags.add(f"repo:{str(args['owner']).lower()}/{str(args['repo']).lower()}")
+    return frozenset(tags)
+
+
+def _with_tool_use_id(result: Dict[str, Any], tool_use_id: str) -> Dict[str, Any]:
+    result = copy.deepcopy(result)
+    result["toolUseId"] = tool_use_id
+    return result
+
+
+class _Entry:
+    __slots__ = ("result", "size", "expires_at", "tags")
+
+    def __init__(self, result: Dict[str, Any], size: int, expires_at: float, tags: FrozenSet[str]):
+        self.result = result
+        self.size = size
+        self.expires_at = expires_at
+        self.tags = tags
+
+
+class McpResultCache:
+    """Size-bounded TTL cache of read-only MCP tool results with in-flight coalescing."""
+
+    def __init__(self, max_entries: int, max_bytes: int, enabled: bool = True, coalesce: bool = True):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._read_tools: Dict[str, Dict[str, float]] = dict(DEFAULT_READ_TOOLS)
+        self._entries: "OrderedDict[Key, _Entry]" = OrderedDict()
+        self._flights = SingleFlight("mcp", enabled=coalesce)
+        # Bumped by every write to a server, so reads racing with it are not stored
+        self._generations: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def configure(self, server: str, read_tools: Dict[str, float]):
+        """Replace the allowlist (tool name or glob -> TTL seconds) for one server."""
+        self._read_tools[server] = dict(read_tools)
+
+    def ttl(self, server: str, tool: str) -> Optional[float]:
+        """TTL for a read-only tool, or None if the tool is not allowlisted."""
+        rules = self._read_tools.get(server, {})
+        if tool in rules:
+            return rules[tool]
+        for pattern, ttl in rules.items():
+            if fnmatch.fnmatchcase(tool, pattern):
+                return ttl
+        return None
+
+    async def call(
+        self,
+        server: str,
+        tool: str,
+        arguments: Optional[Dict[str, Any]],
+        tool_use_id: str,
+        execute: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """
+        Serve a tool call from the cache, an identical in-flight call, or by executing it.
+
+        Args:
+            server: MCP server name
+            tool: Tool name on that server
+            arguments: Tool arguments
+            tool_use_id: Tool use id to put on the returned result
+            execute: Coroutine function performing the actual call
+
+        Returns:
+            The tool result
+        """
+        ttl = self.ttl(server, tool)
+        if ttl is None:
+            self.invalidate(server, resource_tags(arguments))
+            return await execute()
+
+        key = (server, tool, canonical_arguments(arguments))
+        if self.enabled:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.expires_at >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _with_tool_use_id(entry.result, tool_use_id)
+                if entry is not None:
+                    self._remove(key)
+
+        async def fetch() -> Dict[str, Any]:
+            with self._lock:
+                self.misses += 1
+                generation = self._generations.get(server, 0)
+            result = await execute()
+            with self._lock:
+                if self.enabled and self._generations.get(server, 0) == generation and result.get("status") == "success":
+                    self._store(key, result, ttl, resource_tags(arguments))
+            return result
+
+        result = await self._flights.do(key, fetch)
+        return result if result.get("toolUseId") == tool_use_id else _with_tool_use_id(result, tool_use_id)
+
+    def _store(self, key: Key, result: Dict[str, Any], ttl: float, tags: FrozenSet[str]):
+        size = len(json.dumps(result, default=str))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(result, size, time.monotonic() + ttl, tags)
+        self._bytes += size
+        self._evict()
+
+    def invalidate(self, server: str, tags: FrozenSet[str] = frozenset()):
+        """
+        Drop entries a write may have made stale.
+
+        Args:
+            server: MCP server the write went to
+            tags: Resources the write touched; every entry of the server is dropped when empty
+        """
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if key[0] == server and (not tags or not entry.tags or entry.tags & tags)
+            ]
+            for key in stale:
+                self._remove(key)
+            # Results of reads racing with the write must not be stored, nor joined by later reads
+            self._generations[server] = self._generations.get(server, 0) + 1
+            self.invalidations += len(stale)
+        self._flights.forget(lambda key: key[0] == server)
+        if stale:
+            logger.info(f"Invalidated {len(stale)} cached {server} MCP results for {', '.join(sorted(tags)) or '*'}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and occupancy."""
+        flights = self._flights.stats()
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "in_flight": flights["in_flight"],
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": flights["coalesced"],
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+mcp_cache = McpResultCache(
+    max_entries=config.MCP_CACHE_MAX_ENTRIES,
+    max_bytes=config.MCP_CACHE_MAX_BYTES,
+    enabled=config.MCP_CACHE_ENABLED,
+    coalesce=config.SINGLE_FLIGHT_ENABLED,
+)
@@ -0,0 +1,132 @@
+"""MCP server definitions, read from a single servers file.
+
+Each server is reached directly over streamable HTTP or SSE. Going through
+``mcp-proxy`` adds a serialize/forward hop per proxy (two for Atlassian, whose
+proxy entry is itself a stdio bridge to the server's SSE endpoint), so the
+proxy is only needed for servers that speak stdio alone. Example::
+
+    {
+      "servers": {
+        "atlassian": {
+          "transport": "sse",
+          "url": "http://atlassian:9000/sse",
+          "keepalive_seconds": 30,
+          "proxied": {"transport": "sse", "url": "http://mcp-proxy:8090/servers/atlassian/sse"}
+        },
+        "jira-cloud": {
+          "transport": "streamable-http",
+          "url": "https://example.com/mcp",
+          "headers": {"Authorization": "Bearer ${JIRA_TOKEN}"}
+        }
+      }
+    }
+
+``${VAR}`` in URLs and header values is expanded from the environment. An
+optional ``cache`` map (tool name or glob -> TTL seconds) replaces the
+server's built-in allowlist of cacheable read-only tools. The optional
+``proxied`` route and ``benchmark_calls`` are only used by
+``benchmarks/mcp_latency.py``.
+"""
+
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from mcp.client.sse import sse_client
+
+from src import config
+
+try:
+    from mcp.client.streamable_http import streamablehttp_client
+except ImportError:  # mcp 2.x renamed the transport and moved HTTP settings onto the client
+    from mcp.client.streamable_http import streamable_http_client
+    from mcp.shared._httpx_utils import create_mcp_http_client
+    streamablehttp_client = None
+
+logger = logging.getLogger(__name__)
+
+TRANSPORTS = ("sse", "streamable-http")
+
+# Used when no servers file exists: the original routes through mcp-proxy
+DEFAULT_SERVERS = {
+    "atlassian": {"transport": "sse", "url": "http://mcp-proxy:8090/servers/atlassian/sse"},
+    "github": {"transport": "sse", "url": "http://mcp-proxy:8090/servers/github/sse"},
+}
+
+
+@dataclass
+class ServerSpec:
+    """How to reach one MCP server."""
+    name: str
+    transport: str
+    url: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    timeout: float = 30.0
+    read_timeout: float = 300.0
+    keepalive_seconds: Optional[float] = None
+    proxied: Optional["ServerSpec"] = None
+    benchmark_calls: List[Dict[str, Any]] = field(default_factory=list)
+    cache: Optional[Dict[str, float]] = None
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any]) -> "ServerSpec":
+        transport = data.get("transport", "sse")
+        if transport not in TRANSPORTS:
+            raise ValueError(f"MCP server {name}: unknown transport '{transport}', expected one of {TRANSPORTS}")
+        if not data.get("url"):
+            raise ValueError(f"MCP server {name}: missing url")
+        return cls(
+            name=name,
+            transport=transport,
+            url=os.path.expandvars(data["url"]),
+            headers={key: os.path.expandvars(str(value)) for key, value in (data.get("headers") or {}).items()},
+            timeout=float(data.get("timeout", 30.0)),
+            read_timeout=float(data.get("read_timeout", 300.0)),
+            keepalive_seconds=data.get("keepalive_seconds"),
+            proxied=cls.from_dict(f"{name} (proxied)", data["proxied"]) if data.get("proxied") else None,
+            benchmark_calls=list(data.get("benchmark_calls") or []),
+            cache={tool: float(ttl) for tool, ttl in data["cache"].items()} if data.get("cache") is not None else None,
+        )
+
+    def transport_factory(self) -> Callable[[], Any]:
+        """Callable returning a fresh transport context, as ``MCPClient`` expects."""
+        if self.transport == "sse":
+            return lambda: sse_client(self.url, headers=self.headers or None, timeout=self.timeout, sse_read_timeout=self.read_timeout)
+        return lambda: _streamable_http(self)
+
+
+@asynccontextmanager
+async def _streamable_http(spec: ServerSpec):
+    if streamablehttp_client is not None:
+        async with streamablehttp_client(
+            spec.url, headers=spec.headers or None, timeout=spec.timeout, sse_read_timeout=spec.read_timeout
+        ) as streams:
+            yield streams
+    else:
+        async with create_mcp_http_client(headers=spec.headers or None) as http_client:
+            async with streamable_http_client(spec.url, http_client=http_client) as streams:
+                yield streams
+
+
+def load_servers(path: Optional[str] = None) -> Dict[str, ServerSpec]:
+    """
+    Read the MCP servers file.
+
+    Args:
+        path: Servers file (defaults to SKY_AGENT_MCP_SERVERS_FILE)
+
+    Returns:
+        Server specs keyed by name; the built-in proxied routes if the file does not exist
+    """
+    path = path or config.MCP_SERVERS_FILE
+    try:
+        with open(path, encoding="utf-8") as f:
+            servers = json.load(f).get("servers", {})
+        logger.info(f"Loaded {len(servers)} MCP servers from {path}")
+    except FileNotFoundError:
+        logger.info(f"No MCP servers file at {path}, using the default mcp-proxy routes")
+        servers = DEFAULT_SERVERS
+    return {name: ServerSpec.from_dict(name, data) for name, data in servers.items()}
@@ -0,0 +1,290 @@
+"""Managed MCP server connections.
+
+Connecting to the MCP servers at import time meant the API could not start,
+or even answer ``/health``, until every server responded, and a dropped
+stream was never re-established. The manager instead:
+
+- builds each server's tools from a schema snapshot on disk, so agents can be
+  created immediately at boot (the snapshot is rewritten whenever the live
+  tool list is fetched);
+- connects every server in the background, in parallel, and lazily on the
+  first tool call if the background attempt has not finished yet;
+- reconnects with exponential backoff after a failed connect or a failed
+  periodic health check;
+- pings each live connection (``list_tools``) every keep-alive interval so
+  idle streams and pooled HTTP connections stay open;
+- reports readiness (tool schemas known, so agents can be built) separately
+  from liveness (connection currently up).
+
+The tools handed to agents are ``MCPAgentTool`` instances bound to the
+server wrapper rather than to one ``MCPClient``, so they keep working across
+reconnects. Calls go through the read-through result cache (``src.mcp_cache``).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from mcp.types import Tool as MCPTool
+from strands.tools.mcp.mcp_agent_tool import MCPAgentTool
+from strands.tools.mcp.mcp_client import MCPClient
+
+from src.mcp_cache import mcp_cache
+from src.metrics import MCP_DURATION
+from src.mcp_config import ServerSpec
+from src import config
+
+logger = logging.getLogger(__name__)
+
+
+class McpServer:
+    """One MCP server: its tools, its current client and the supervisor keeping it connected."""
+
+    def __init__(self, name: str, transport: Callable[[], Any], snapshot_dir: str,
+                 keepalive_seconds: Optional[float] = None):
+        self.name = name
+        self.transport = transport
+        self.keepalive_seconds = keepalive_seconds or config.MCP_HEALTH_CHECK_SECONDS
+        self.snapshot_path = os.path.join(snapshot_dir, f"{name}.json")
+        self._client: Optional[MCPClient] = None
+        self._tools: List[MCPAgentTool] = []
+        self._schema_source: Optional[str] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._connected = threading.Event()
+        self._stop = threading.Event()
+        self._started = False
+        self.attempts = 0
+        self.next_retry_at = 0.0
+        self.last_error: Optional[str] = None
+        self.last_ok_at = 0.0
+        self._load_snapshot()
+
+    # --- Tools ------------------------------------------------------------
+
+    @property
+    def tools(self) -> List[MCPAgentTool]:
+        with self._lock:
+            return list(self._tools)
+
+    def _set_tools(self, mcp_tools: List[MCPTool], source: str):
+        with self._lock:
+            self._tools = [MCPAgentTool(mcp_tool, self) for mcp_tool in mcp_tools]
+            self._schema_source = source
+
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                schemas = json.load(f)
+            self._set_tools([MCPTool.model_validate(schema) for schema in schemas], "snapshot")
+            logger.info(f"Loaded {len(schemas)} {self.name} MCP tool schemas from snapshot")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable {self.name} MCP schema snapshot: {str(e)}")
+
+    def _save_snapshot(self, mcp_tools: List[MCPTool]):
+        schemas = [mcp_tool.model_dump(mode="json", by_alias=True, exclude_none=True) for mcp_tool in mcp_tools]
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(schemas, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Could not write {self.name} MCP schema snapshot: {str(e)}")
+
+    # --- Connection -------------------------------------------------------
+
+    @property
+    def ready(self) -> bool:
+        """Tool schemas are known, so agents can be built with this server's tools."""
+        return self._schema_source is not None
+
+    @property
+    def live(self) -> bool:
+        """A connection is currently up."""
+        return self._connected.is_set()
+
+    def start(self, connect: bool = True):
+        """Start the supervisor thread; connect right away unless connect is False."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        if connect:
+            self._wake.set()
+        threading.Thread(target=self._supervise, name=f"mcp-{self.name}", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._disconnect()
+
+    def _supervise(self):
+        wanted = False
+        while not self._stop.is_set():
+            woken = self._wake.wait(timeout=1.0)
+            self._wake.clear()
+            wanted = wanted or woken
+            if self._stop.is_set():
+                return
+            now = time.time()
+            if not self.live:
+                # Connect once someone asked for it (startup or a tool call), honouring the backoff
+                if wanted and now >= self.next_retry_at:
+                    self._connect()
+            elif now - self.last_ok_at >= self.keepalive_seconds:
+                self._health_check()
+
+    def _connect(self):
+        started = time.time()
+        client = MCPClient(self.transport, startup_timeout=int(config.MCP_CONNECT_TIMEOUT_SECONDS))
+        try:
+            client.start()
+            mcp_tools = [tool.mcp_tool for tool in client.list_tools_sync()]
+        except Exception as e:
+            try:
+                client.stop(None, None, None)
+            except Exception:
+                pass
+            self._schedule_retry(e)
+            return
+        self._client = client
+        self._set_tools(mcp_tools, "live")
+        self._save_snapshot(mcp_tools)
+        self.attempts = 0
+        self.last_error = None
+        self.last_ok_at = time.time()
+        self._connected.set()
+        logger.info(f"Connected to {self.name} MCP server ({len(mcp_tools)} tools) in {time.time() - started:.1f}s")
+
+    def _health_check(self):
+        try:
+            mcp_tools = [tool.mcp_tool for tool in self._client.list_tools_sync()]
+        except Exception as e:
+            logger.warning(f"{self.name} MCP server health check failed, reconnecting: {str(e)}")
+            self._disconnect()
+            self._schedule_retry(e, immediate=True)
+            return
+        self.last_ok_at = time.time()
+        if [tool.name for tool in mcp_tools] != [tool.mcp_tool.name for tool in self.tools]:
+            logger.info(f"{self.name} MCP server tool list changed")
+            self._set_tools(mcp_tools, "live")
+            self._save_snapshot(mcp_tools)
+
+    def _disconnect(self):
+        self._connected.clear()
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.stop(None, None, None)
+            except Exception as e:
+                logger.debug(f"Error stopping {self.name} MCP client: {str(e)}")
+
+    def _schedule_retry(self, error: Exception, immediate: bool = False):
+        self.last_error = str(error) or type(error).__name__
+        delay = 0.0 if immediate else min(
+            config.MCP_RECONNECT_MAX_SECONDS, config.MCP_RECONNECT_MIN_SECONDS * (2 ** self.attempts)
+        ) * random.uniform(0.8, 1.2)
+        self.attempts += 1
+        # The supervisor keeps retrying once a connection has been requested
+        self.next_retry_at = time.time() + delay
+        logger.warning(f"Could not connect to {self.name} MCP server (attempt {self.attempts}), retrying in {delay:.1f}s: {self.last_error}")
+
+    def _wait_for_client(self, timeout: float) -> MCPClient:
+        if not self.live:
+            if time.time() + timeout < self.next_retry_at:
+                raise ConnectionError(
+                    f"{self.name} MCP server unavailable ({self.last_error}); retrying in {self.next_retry_at - time.time():.0f}s"
+                )
+            self.start()
+            self._wake.set()
+            if not self._connected.wait(timeout):
+                raise ConnectionError(f"{self.name} MCP server unavailable: {self.last_error or 'connection timed out'}")
+        client = self._client
+        if client is None:
+            raise ConnectionError(f"{self.name} MCP server disconnected: {self.last_error or 'reconnecting'}")
+        return client
+
+    # --- MCPClient interface used by MCPAgentTool --------------------------
+
+    async def call_tool_async(self, tool_use_id: str, name: str, arguments: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        """Call a tool, served from the result cache for read-only tools, connecting first if needed."""
+        async def execute():
+            started = time.perf_counter()
+            try:
+                client = await asyncio.to_thread(self._wait_for_client, config.MCP_CONNECT_TIMEOUT_SECONDS)
+                result = await client.call_tool_async(tool_use_id=tool_use_id, name=name, arguments=arguments, **kwargs)
+            except ConnectionError as e:
+                result = {"status": "error", "toolUseId": tool_use_id, "content": [{"text": f"Error: {str(e)}"}]}
+            MCP_DURATION.labels(self.name, result.get("status", "unknown")).observe(time.perf_counter() - started)
+            return result
+
+        return await mcp_cache.call(self.name, name, arguments, tool_use_id, execute)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "live": self.live,
+            "tools": len(self.tools),
+            "schema_source": self._schema_source,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "retry_in_seconds": max(0, round(self.next_retry_at - time.time())) if not self.live and self.last_error else None,
+        }
+
+
+class McpManager(Mapping):
+    """All configured MCP servers; maps server name to that server's current tools."""
+
+    def __init__(self, transports: Dict[str, Callable[[], Any]], snapshot_dir: Optional[str] = None,
+                 keepalive: Optional[Dict[str, float]] = None):
+        snapshot_dir = snapshot_dir or config.MCP_SNAPSHOT_DIR
+        self.servers = {
+            name: McpServer(name, transport, snapshot_dir, (keepalive or {}).get(name))
+            for name, transport in transports.items()
+        }
+
+    @classmethod
+    def from_specs(cls, specs: Dict[str, ServerSpec], snapshot_dir: Optional[str] = None) -> "McpManager":
+        """Manager for the servers defined in the MCP servers file."""
+        for name, spec in specs.items():
+            if spec.cache is not None:
+                mcp_cache.configure(name, spec.cache)
+        return cls(
+            {name: spec.transport_factory() for name, spec in specs.items()},
+            snapshot_dir=snapshot_dir,
+            keepalive={name: spec.keepalive_seconds for name, spec in specs.items() if spec.keepalive_seconds},
+        )
+
+    def __getitem__(self, name: str) -> List[MCPAgentTool]:
+        return self.servers[name].tools
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.servers)
+
+    def __len__(self) -> int:
+        return len(self.servers)
+
+    def start(self):
+        """Connect every server in the background, in parallel (or on first use if eager connect is off)."""
+        for server in self.servers.values():
+            server.start(connect=config.MCP_EAGER_CONNECT)
+
+    def stop(self):
+        for server in self.servers.values():
+            server.stop()
+
+    @property
+    def ready(self) -> bool:
+        return all(server.ready for server in self.servers.values())
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: server.status() for name, server in self.servers.items()}
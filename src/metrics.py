@@ -0,0 +1,159 @@
+"""Prometheus metrics, exposed at ``GET /metrics``.
+
+Covers every hop a request goes through so the one dominating the p95 can be
+found: HTTP requests, swarm handoffs and per-agent node durations, tool calls,
+``az``/``gcloud`` executions, MCP calls, model token usage per agent,
+cancelled runs, coalesced calls and the size of encoded CLI tool output.
+
+Agent-level metrics come from ``MetricsHook``, which every agent carries; run
+level metrics (handoffs) are recorded from the swarm or graph result.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from strands.hooks import (
+    AfterInvocationEvent,
+    AfterToolCallEvent,
+    BeforeInvocationEvent,
+    BeforeToolCallEvent,
+    HookProvider,
+    HookRegistry,
+)
+
+logger = logging.getLogger(__name__)
+
+# Swarm runs and agent nodes take seconds to many minutes
+RUN_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600, 1800, 3600)
+CALL_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+REQUEST_DURATION = Histogram(
+    "sky_agent_request_duration_seconds", "HTTP request latency (time to first byte for streams)",
+    ["route", "method", "status"], buckets=RUN_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge("sky_agent_requests_in_flight", "HTTP requests being handled", ["route"])
+RUN_DURATION = Histogram(
+    "sky_agent_run_duration_seconds", "Swarm or fan-out graph run duration", ["mode", "status"], buckets=RUN_BUCKETS,
+)
+HANDOFFS = Counter("sky_agent_swarm_handoffs_total", "Swarm handoffs between agents", ["from_agent", "to_agent"])
+NODE_DURATION = Histogram(
+    "sky_agent_node_duration_seconds", "Duration of one agent's turn in a run", ["agent"], buckets=RUN_BUCKETS,
+)
+TOOL_DURATION = Histogram(
+    "sky_agent_tool_duration_seconds", "Tool call latency", ["tool", "status"], buckets=CALL_BUCKETS,
+)
+TOOL_CALLS = Counter("sky_agent_tool_calls_total", "Tool calls", ["tool", "status"])
+CLI_DURATION = Histogram(
+    "sky_agent_cli_duration_seconds", "Wall time of az/gcloud executions, excluding queueing",
+    ["binary", "mode", "outcome"], buckets=CALL_BUCKETS,
+)
+MCP_DURATION = Histogram(
+    "sky_agent_mcp_call_duration_seconds", "MCP tool call latency (cache misses only)",
+    ["server", "status"], buckets=CALL_BUCKETS,
+)
+TOKENS = Counter("sky_agent_tokens_total", "Model tokens used", ["agent", "type"])
+CANCELLATIONS = Counter("sky_agent_cancellations_total", "Runs cancelled before they finished", ["reason"])
+CANCELLED_OPERATIONS = Counter(
+    "sky_agent_cancelled_operations_total", "Work stopped or skipped because its run was cancelled", ["kind"],
+)
+TOOL_OUTPUT_CHARS = Counter(
+    "sky_agent_tool_output_chars_total", "Characters of az/gcloud tool results before and after encoding",
+    ["encoding", "stage"],
+)
+COALESCED_CALLS = Counter(
+    "sky_agent_coalesced_calls_total", "Calls that joined an identical call already in flight", ["kind"],
+)
+
+
+def render() -> Tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, and its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def observe_cli(binary: str, mode: str, outcome: str, seconds: float):
+    """
+    Record one az/gcloud execution.
+
+    Args:
+        binary: CLI name ("az", "gcloud")
+        mode: "subprocess" or "worker" (warm in-process Azure CLI worker)
+        outcome: "ok", "error", "timeout" or "cancelled"
+        seconds: Wall time of the execution
+    """
+    CLI_DURATION.labels(binary, mode, outcome).observe(seconds)
+
+
+def observe_run(result: Any, mode: str, seconds: float):
+    """Record a finished swarm or graph run and the handoffs it made."""
+    status = getattr(getattr(result, "status", None), "value", "unknown")
+    RUN_DURATION.labels(mode, status).observe(seconds)
+    history = [node.node_id for node in getattr(result, "node_history", None) or []]
+    for from_agent, to_agent in zip(history, history[1:]):
+        HANDOFFS.labels(from_agent, to_agent).inc()
+
+
+def _usage(agent: Any) -> Dict[str, int]:
+    metrics = getattr(agent, "event_loop_metrics", None)
+    return dict(getattr(metrics, "accumulated_usage", None) or {})
+
+
+def _is_error(result: Dict[str, Any]) -> bool:
+    # Tools report most failures as "Error: ..." text rather than an error status
+    if result.get("status") == "error":
+        return True
+    content = result.get("content") or []
+    return bool(content) and str(content[0].get("text", "")).startswith("Error:")
+
+
+class MetricsHook(HookProvider):
+    """Records each agent's turn duration, token usage and tool call latencies."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # An agent never runs concurrently with itself, so its id keys its current turn
+        self._turns: Dict[int, Tuple[float, Dict[str, int]]] = {}
+        self._tool_calls: Dict[str, float] = {}
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self.before_invocation)
+        registry.add_callback(AfterInvocationEvent, self.after_invocation)
+        registry.add_callback(BeforeToolCallEvent, self.before_tool_call)
+        registry.add_callback(AfterToolCallEvent, self.after_tool_call)
+
+    def before_invocation(self, event: BeforeInvocationEvent) -> None:
+        with self._lock:
+            self._turns[id(event.agent)] = (time.perf_counter(), _usage(event.agent))
+
+    def after_invocation(self, event: AfterInvocationEvent) -> None:
+        with self._lock:
+            started = self._turns.pop(id(event.agent), None)
+        if started is None:
+            return
+        agent = event.agent.name
+        NODE_DURATION.labels(agent).observe(time.perf_counter() - started[0])
+        usage = _usage(event.agent)
+        for key, kind in (("inputTokens", "input"), ("outputTokens", "output"),
+                          ("cacheReadInputTokens", "cache_read"), ("cacheWriteInputTokens", "cache_write")):
+            used = usage.get(key, 0) - started[1].get(key, 0)
+            if used > 0:
+                TOKENS.labels(agent, kind).inc(used)
+
+    def before_tool_call(self, event: BeforeToolCallEvent) -> None:
+        with self._lock:
+            self._tool_calls[event.tool_use.get("toolUseId", "")] = time.perf_counter()
+
+    def after_tool_call(self, event: AfterToolCallEvent) -> None:
+        with self._lock:
+            started = self._tool_calls.pop(event.tool_use.get("toolUseId", ""), None)
+        if started is None:
+            return
+        tool = event.tool_use.get("name", "unknown")
+        status = "error" if getattr(event, "exception", None) is not None or _is_error(event.result or {}) else "success"
+        TOOL_DURATION.labels(tool, status).observe(time.perf_counter() - started)
+        TOOL_CALLS.labels(tool, status).inc()
+
+
+metrics_hook = MetricsHook()
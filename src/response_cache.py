@@ -0,0 +1,190 @@
+"""Response cache for whole agent runs at the API layer.
+
+Ops teams ask the same status questions many times a day ("list running GKE
+clusters", "show my Azure subscriptions"), and each one reruns the swarm and
+its LLM calls. Responses are cached per route, keyed on the normalized prompt
+(case, whitespace and trailing punctuation ignored), the conversation so far
+and the active cloud context (gcloud project/region, az subscription/location,
+AWS profile/region), so switching project or subscription never serves another
+context's answer.
+
+Only runs that completed and whose tool calls were all read-only (see
+``src.tool_audit``) are stored. A run that changed anything clears the cache,
+since any cached answer may now be out of date. Clients can skip the cache
+with ``Cache-Control: no-cache`` or ``X-Sky-Agent-Cache: bypass``; every
+response says ``hit``, ``miss`` or ``bypass`` in ``X-Sky-Agent-Cache``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from src.sessions import fingerprint
+from src.tool_audit import ToolAudit
+from src.tools.cloud_context import azure_scope, gcp_scope
+from src import config
+
+logger = logging.getLogger(__name__)
+
+CACHE_STATUS_HEADER = "X-Sky-Agent-Cache"
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Prompt text with case, whitespace and trailing punctuation normalized away."""
+    text = unicodedata.normalize("NFKC", prompt).lower()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip("?.! ")
+
+
+def cloud_context() -> Tuple:
+    """Active project/subscription/region of every cloud CLI, read from local config."""
+    return (
+        gcp_scope(),
+        azure_scope(),
+        ("aws", os.getenv("AWS_PROFILE"), os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION")),
+    )
+
+
+def bypass_requested(headers: Mapping[str, str]) -> bool:
+    """Whether the client asked not to be served from (or stored in) the cache."""
+    cache_control = headers.get("cache-control", "").lower()
+    return (
+        "no-cache" in cache_control
+        or "no-store" in cache_control
+        or headers.get(CACHE_STATUS_HEADER.lower(), "").lower() == "bypass"
+    )
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value: Any, size: int, expires_at: float):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """Size-bounded TTL cache of API responses for read-only runs."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttls: Dict[str, float], enabled: bool = True):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.ttls = ttls
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.skipped = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def key(self, route: str, prompt: str, history: Optional[List[Tuple[str, str]]] = None) -> Optional[str]:
+        """
+        Cache key for a request, or None if the route is not cached.
+
+        Args:
+            route: API route name ("invoke" or "chat")
+            prompt: The user's prompt
+            history: Earlier (role, content) messages of the conversation
+        """
+        if not self.enabled or self.ttls.get(route, 0) <= 0:
+            return None
+        material = json.dumps(
+            [route, normalize_prompt(prompt), fingerprint(history or []), cloud_context()], default=str
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: Optional[str]) -> Optional[Any]:
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def store(self, route: str, key: Optional[str], value: Any, audit: ToolAudit) -> bool:
+        """
+        Store a response if its run completed, only read state and read no secrets.
+
+        A run that used a state-changing tool clears the cache instead.
+
+        Returns:
+            Whether the response was stored
+        """
+        if not audit.read_only:
+            self.clear(reason=f"run used {', '.join(sorted(set(audit.mutating)))}")
+            return False
+        if key is None:
+            return False
+        if not audit.completed or audit.sensitive:
+            self.skipped += 1
+            return False
+        size = len(json.dumps(value, default=str))
+        with self._lock:
+            if size > self.max_bytes:
+                self.skipped += 1
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, size, time.monotonic() + self.ttls[route])
+            self._bytes += size
+            self.stores += 1
+            self._evict()
+        return True
+
+    def clear(self, reason: str = "cleared"):
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            self.invalidations += dropped
+        if dropped:
+            logger.info(f"Dropped {dropped} cached responses: {reason}")
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and occupancy."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "skipped": self.skipped,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+response_cache = ResponseCache(
+    max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=config.RESPONSE_CACHE_MAX_BYTES,
+    ttls={"invoke": config.RESPONSE_CACHE_INVOKE_TTL_SECONDS, "chat": config.RESPONSE_CACHE_CHAT_TTL_SECONDS},
+    enabled=config.RESPONSE_CACHE_ENABLED,
+)
@@ -0,0 +1,162 @@
+"""Fast-path routing of prompts to a specialist agent.
+
+The coordinator (``sky_agent``) only hands off to one of the specialists, which
+costs a full model round trip before any work starts. The router scores the
+prompt against a weighted keyword lexicon per specialist and, when a single
+specialist clearly owns the request, the swarm starts at that specialist
+instead. Requests that mention several providers, or nothing recognisable,
+still start at the coordinator, and specialists can still hand off as usual.
+
+Confidence is the top agent's share of the total score, scaled down until the
+top agent has at least one strong signal, so a lone weak keyword ("project",
+"ticket") never bypasses the coordinator. Every decision is logged with its
+confidence and matched terms so the lexicon and threshold can be tuned.
+"""
+
+import logging
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from src.agents import COORDINATOR
+from src import config
+
+logger = logging.getLogger(__name__)
+
+STRONG = 2.0
+WEAK = 1.0
+
+# (pattern, weight) per agent; patterns are matched case-insensitively on word boundaries
+LEXICON: Dict[str, List[Tuple[str, float]]] = {
+    "aws_agent": [
+        (r"aws|amazon web services|boto3?|arn:aws", STRONG),
+        (r"ec2|s3|lambda|cloudformation|cloudwatch|cloudtrail|dynamodb|route ?53|eks|ecs|fargate|sqs|sns|kinesis|"
+         r"redshift|aurora|elasticache|bedrock|sagemaker|iam role|iam user|security hub|guardduty", STRONG),
+        (r"(us|eu|ap|sa|ca|me|af)-(east|west|north|south|central|northeast|southeast)-\d", STRONG),
+        (r"rds|vpc|elb|alb|ami", WEAK),
+    ],
+    "azure_agent": [
+        (r"azure|az cli|entra( id)?|azure ad", STRONG),
+        (r"resource groups?|aks|vnets?|nsgs?|app service|function app|cosmos ?db|key ?vault|arm template|bicep|"
+         r"storage accounts?|blob (storage|container)s?|scale sets?|vmss|log analytics|application insights", STRONG),
+        (r"eastus2?|westus[23]?|westeurope|northeurope|uksouth|southeastasia|centralus", STRONG),
+        (r"subscriptions?|tenant", WEAK),
+    ],
+    "gcp_agent": [
+        (r"gcp|google cloud|gcloud|gsutil|gs://\S+", STRONG),
+        (r"gke|bigquery|cloud run|cloud sql|cloud functions|compute engine|pub/?sub|gcs|cloud storage|"
+         r"firestore|spanner|dataflow|dataproc|cloud build|artifact registry|vertex ai", STRONG),
+        (r"(us|europe|asia|australia|northamerica|southamerica)-[a-z]+\d(-[a-c])?", STRONG),
+        (r"projects?", WEAK),
+    ],
+    "atlassian_agent": [
+        (r"jira|confluence|atlassian|jql|cql", STRONG),
+        # Issue keys: upper-case, letters-only project keys (unlike region names), minus standards and hashes
+        (r"(?-i:(?!(?:RFC|SHA|CVE|TLS|SSL|ISO|IEC|UTF|AES|RSA|MD|HTTP|IPV|PCI|SOC|NIST|FIPS|GDPR)-)[A-Z]{2,10}-\d+)", STRONG),
+        (r"tickets?|epics?|sprints?|backlog|stor(y|ies)|wiki pages?", WEAK),
+    ],
+    "coding_agent": [
+        (r"github|pull requests?|prs?|git|repos?|repositor(y|ies)|refactor|codebase|unit tests?", STRONG),
+        (r"code|bugs?|commits?|branch(es)?|merge|script|python|typescript|javascript|golang", WEAK),
+    ],
+}
+
+_COMPILED = {
+    agent: [(re.compile(rf"(?<![\w-])(?:{pattern})(?![\w-])", re.IGNORECASE), weight) for pattern, weight in rules]
+    for agent, rules in LEXICON.items()
+}
+
+CLOUD_AGENTS = ("aws_agent", "azure_agent", "gcp_agent")
+
+
+@dataclass
+class RouteDecision:
+    """Where a run starts and why."""
+    agent: str
+    confidence: float
+    scores: Dict[str, float] = field(default_factory=dict)
+    matches: Dict[str, List[str]] = field(default_factory=dict)
+    providers: List[str] = field(default_factory=list)
+    reason: str = ""
+
+    @property
+    def fast_path(self) -> bool:
+        return self.agent != COORDINATOR
+
+
+def score(prompt: str) -> Tuple[Dict[str, float], Dict[str, List[str]]]:
+    """Keyword scores and matched terms per agent."""
+    scores: Dict[str, float] = {}
+    matches: Dict[str, List[str]] = {}
+    for agent, rules in _COMPILED.items():
+        for pattern, weight in rules:
+            found = {match.group(0).lower() for match in pattern.finditer(prompt)}
+            if found:
+                scores[agent] = scores.get(agent, 0.0) + weight * min(len(found), 3)
+                matches.setdefault(agent, []).extend(sorted(found))
+    return scores, matches
+
+
+class Router:
+    """Chooses the entry agent for a run and keeps counts of its decisions."""
+
+    def __init__(self, enabled: bool, min_confidence: float):
+        self.enabled = enabled
+        self.min_confidence = min_confidence
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def classify(self, prompt: str) -> RouteDecision:
+        scores, matches = score(prompt)
+        if not scores:
+            return RouteDecision(COORDINATOR, 0.0, reason="no provider signals")
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        top, top_score = ranked[0]
+        confidence = (top_score / sum(scores.values())) * min(1.0, top_score / STRONG)
+        decision = RouteDecision(top, round(confidence, 2), scores, matches)
+
+        clouds = decision.providers = [agent for agent in CLOUD_AGENTS if scores.get(agent, 0.0) >= STRONG]
+        if len(clouds) > 1:
+            decision.agent, decision.reason = COORDINATOR, f"cross-cloud ({', '.join(clouds)})"
+        elif confidence < self.min_confidence:
+            decision.agent, decision.reason = COORDINATOR, f"ambiguous (best {top} at {confidence:.2f})"
+        else:
+            decision.reason = f"matched {', '.join(matches[top][:5])}"
+        return decision
+
+    def route(self, prompt: str) -> RouteDecision:
+        """
+        Pick the agent a run should start at.
+
+        Args:
+            prompt: The task for the swarm
+
+        Returns:
+            The decision; its agent is the coordinator unless one specialist clearly owns the prompt
+        """
+        decision = self.classify(prompt)
+        if not self.enabled:
+            # Still report the providers involved, so cross-cloud fan-out keeps working
+            decision.agent, decision.confidence, decision.reason = COORDINATOR, 0.0, "router disabled"
+            return decision
+        with self._lock:
+            self._counts[decision.agent] += 1
+        logger.info(
+            f"Routing to {decision.agent} (confidence {decision.confidence:.2f}, {decision.reason}); "
+            f"scores={decision.scores}"
+        )
+        return decision
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "min_confidence": self.min_confidence,
+                "routes": dict(self._counts),
+            }
+
+
+router = Router(enabled=config.ROUTER_ENABLED, min_confidence=config.ROUTER_MIN_CONFIDENCE)
+
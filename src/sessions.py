@@ -0,0 +1,281 @@
+"""Conversation-scoped session pool.
+
+A session holds the conversation history for one chat and a warm swarm whose
+agents already carry that history. Sessions are keyed either by an explicit
+conversation id header or by a hash of the message prefix that precedes the
+newest user turn; after each turn the session is re-keyed under the hash of the
+conversation including that turn, so the next request from the same chat finds
+it again. Follow-up turns only append the new user/assistant pair to the warm
+swarm instead of rebuilding it.
+
+Idle sessions are evicted by TTL, and the pool is bounded both by session count
+(least recently used first) and by the total size of the stored history.
+"""
+
+import copy
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from src.agents import create_swarm
+from src import config
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(messages: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    return [(role, (content or "").strip()) for role, content in messages]
+
+
+def fingerprint(messages: List[Tuple[str, str]]) -> str:
+    """Stable hash of a list of (role, content) chat messages."""
+    digest = hashlib.sha256()
+    for role, content in _normalize(messages):
+        digest.update(role.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(content.encode("utf-8"))
+        digest.update(b"\x01")
+    return digest.hexdigest()
+
+
+def to_agent_messages(messages: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Convert chat messages into Strands conversation messages.
+
+    System messages are dropped (every agent has its own system prompt), leading
+    assistant messages are skipped and consecutive messages from the same role are
+    merged, since Strands expects a conversation that starts with the user and
+    alternates between user and assistant.
+    """
+    agent_messages: List[Dict[str, Any]] = []
+    for role, content in _normalize(messages):
+        if role not in ("user", "assistant") or not content:
+            continue
+        if not agent_messages and role != "user":
+            continue
+        if agent_messages and agent_messages[-1]["role"] == role:
+            agent_messages[-1]["content"].append({"text": content})
+        else:
+            agent_messages.append({"role": role, "content": [{"text": content}]})
+    # A trailing user message would be followed by the next task; keep turns paired
+    if agent_messages and agent_messages[-1]["role"] == "user":
+        agent_messages.pop()
+    return agent_messages
+
+
+def _paired_length(history: List[Tuple[str, str]]) -> int:
+    """Length of the history prefix that ends with an assistant reply."""
+    for i in range(len(history) - 1, -1, -1):
+        role, content = history[i]
+        if role == "assistant" and content:
+            return i + 1
+    return 0
+
+
+class Session:
+    """History and warm swarm for a single conversation."""
+
+    def __init__(self, key: str, history: List[Tuple[str, str]]):
+        self.key = key
+        # Stable across re-keying, so per-conversation state (Claude Code sessions) follows the chat
+        self.id = uuid.uuid4().hex
+        self.history: List[Tuple[str, str]] = _normalize(history)
+        self.last_used = time.monotonic()
+        self.turns = 0
+        self._swarm = None
+        self._swarm_history_len = 0
+        self._swarm_stale = False
+        self._run_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """Approximate memory footprint of the session history in bytes."""
+        return sum(len(content) for _, content in self.history)
+
+    @property
+    def fingerprint(self) -> str:
+        return fingerprint(self.history)
+
+    def agent_messages(self) -> List[Dict[str, Any]]:
+        """The conversation so far as agent messages."""
+        with self._state_lock:
+            return to_agent_messages(list(self.history))
+
+    def acquire(self, mcp_tools: Mapping[str, List[Any]]):
+        """
+        Check out a swarm for one run of this conversation.
+
+        Returns the warm swarm with any new turns appended to its agents' history.
+        If another run of the same conversation is already using it, a fresh swarm
+        seeded with the current history is returned instead.
+        """
+        with self._state_lock:
+            history = list(self.history)
+
+        if not self._run_lock.acquire(blocking=False):
+            logger.info(f"Session {self.key[:12]} is busy, running on a fresh swarm")
+            return create_swarm(mcp_tools, messages=to_agent_messages(history))
+
+        try:
+            # A trailing user turn without its reply is added once the reply is known
+            paired = _paired_length(history)
+            if self._swarm is None or self._swarm_stale:
+                self._swarm = create_swarm(mcp_tools, messages=to_agent_messages(history[:paired]))
+                self._swarm_stale = False
+            elif paired > self._swarm_history_len:
+                _append_history(self._swarm, to_agent_messages(history[self._swarm_history_len:paired]))
+            self._swarm_history_len = paired
+            return self._swarm
+        except Exception:
+            self._run_lock.release()
+            raise
+
+    def release(self, swarm):
+        """Return a swarm obtained from ``acquire``."""
+        if swarm is self._swarm:
+            self._run_lock.release()
+
+    def record_turn(self, prompt: str, reply: str):
+        """Append a completed user/assistant turn to the conversation history."""
+        with self._state_lock:
+            self.history.extend(_normalize([("user", prompt), ("assistant", reply)]))
+            self.turns += 1
+            self.last_used = time.monotonic()
+
+    def reset(self, history: List[Tuple[str, str]]):
+        """Replace the history (e.g. after an edited or regenerated message) and drop the warm swarm."""
+        with self._state_lock:
+            self.history = _normalize(history)
+            self.turns = 0
+            self._swarm_stale = True
+
+
+def _append_history(swarm, messages: List[Dict[str, Any]]):
+    """Append messages to the history every swarm node restores before it runs."""
+    if not messages:
+        return
+    for node in swarm.nodes.values():
+        # Swarm nodes reset their agent to a snapshot taken at construction time
+        # before every execution, so the snapshot is what has to grow.
+        initial = getattr(node, "_initial_messages", None)
+        if initial is not None:
+            initial.extend(copy.deepcopy(messages))
+
+
+class SessionStore:
+    """LRU/TTL-bounded pool of conversation sessions."""
+
+    def __init__(self, max_sessions: int, ttl_seconds: float, max_bytes: int):
+        self.max_sessions = max(1, max_sessions)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def prefix_key(history: List[Tuple[str, str]]) -> str:
+        return f"prefix:{fingerprint(history)}"
+
+    def resolve(self, conversation_id: Optional[str], history: List[Tuple[str, str]]) -> Session:
+        """
+        Find or create the session for an incoming request.
+
+        Args:
+            conversation_id: Explicit conversation id from the request headers, if any
+            history: Chat messages preceding the newest user turn
+
+        Returns:
+            A session whose history matches ``history``
+        """
+        key = f"conversation:{conversation_id}" if conversation_id else self.prefix_key(history)
+        with self._lock:
+            self._evict_expired()
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                session.last_used = time.monotonic()
+                if session.fingerprint == fingerprint(history):
+                    self.hits += 1
+                    return session
+                # The client's history diverged from ours (edited or regenerated message)
+                logger.info(f"Session {key[:24]} history diverged, reseeding")
+                session.reset(history)
+                self.misses += 1
+                return session
+
+            self.misses += 1
+            session = Session(key, history)
+            # Prefix-keyed sessions are only registered once their first turn commits,
+            # so unrelated chats that share a prefix (e.g. brand new chats) never collide
+            if conversation_id:
+                self._sessions[key] = session
+                self._enforce_limits()
+            return session
+
+    def commit(self, session: Session, history: List[Tuple[str, str]], prompt: str, reply: str):
+        """
+        Record a completed turn and re-key prefix-addressed sessions for the next turn.
+
+        Args:
+            session: Session returned by ``resolve`` for this request
+            history: The chat messages the request was resolved with
+            prompt: The user prompt of the turn
+            reply: The assistant reply as returned to the client
+        """
+        with self._lock:
+            if session.fingerprint != fingerprint(history):
+                # Another turn on the same history finished first; branch off it
+                session = Session(session.key, history)
+            if self._sessions.get(session.key) is session and session.key.startswith("prefix:"):
+                del self._sessions[session.key]
+            session.record_turn(prompt, reply)
+            if session.key.startswith("prefix:"):
+                session.key = self.prefix_key(session.history)
+            self._sessions[session.key] = session
+            self._sessions.move_to_end(session.key)
+            self._enforce_limits()
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        expired = [key for key, session in self._sessions.items() if now - session.last_used > self.ttl_seconds]
+        for key in expired:
+            del self._sessions[key]
+            self.evictions += 1
+
+    def _enforce_limits(self):
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+        total = sum(session.size for session in self._sessions.values())
+        while self._sessions and total > self.max_bytes:
+            _, session = self._sessions.popitem(last=False)
+            total -= session.size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Session pool occupancy and hit/miss counters."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": sum(session.size for session in self._sessions.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def create_session_store() -> SessionStore:
+    """Create a session store configured from the environment."""
+    return SessionStore(
+        max_sessions=config.SESSION_MAX_SESSIONS,
+        ttl_seconds=config.SESSION_TTL_SECONDS,
+        max_bytes=config.SESSION_MAX_BYTES,
+    )
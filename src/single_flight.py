@@ -0,0 +1,142 @@
+"""Single-flight execution of identical concurrent calls.
+
+When several users, or several agents of one run, ask for the same thing at
+the same moment (``az resource list``, ``gcloud projects describe``, a Jira
+search), only the first call executes; the others wait for it and receive the
+same result or exception. Callers choose the key, e.g. the canonical command
+line plus the subscription or project it runs against.
+
+Callers run on different threads and event loops, so the outcome is shared
+through a ``concurrent.futures.Future``. The execution runs as a task on the
+first caller's loop and belongs to no single waiter: a waiter that is
+cancelled just stops waiting, and the execution is only cancelled once every
+waiter has gone. If it is cancelled anyway (its loop shut down together with
+the first caller's run), the remaining waiters start it again.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from src.metrics import COALESCED_CALLS
+
+logger = logging.getLogger(__name__)
+
+
+class _Abandoned(Exception):
+    """The shared execution was cancelled while callers still waited for it."""
+
+
+class _Flight:
+    __slots__ = ("future", "waiters", "task", "loop")
+
+    def __init__(self):
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.waiters = 0
+        self.task: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls into one shared execution."""
+
+    def __init__(self, name: str, enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def do(self, key: Hashable, execute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``execute``, or wait for the identical call already in flight.
+
+        Args:
+            key: Identity of the call; calls with equal keys share one execution
+            execute: Coroutine function performing the call
+
+        Returns:
+            The result of the shared execution
+
+        Raises:
+            Whatever the shared execution raised
+        """
+        if not self.enabled:
+            return await execute()
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                    self.executions += 1
+                else:
+                    self.coalesced += 1
+                flight.waiters += 1
+            if leader:
+                flight.loop = asyncio.get_running_loop()
+                flight.task = flight.loop.create_task(execute())
+                flight.task.add_done_callback(lambda task, key=key, flight=flight: self._settle(key, flight, task))
+            else:
+                COALESCED_CALLS.labels(self.name).inc()
+            try:
+                # Shielded, so a cancelled waiter does not cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(flight.future))
+            except _Abandoned:
+                logger.debug(f"Shared {self.name} call was abandoned, starting it again")
+                continue
+            finally:
+                self._leave(key, flight)
+
+    def _settle(self, key: Hashable, flight: _Flight, task: asyncio.Task):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            abandoned = task.cancelled() and flight.waiters > 0
+            if abandoned:
+                self.abandoned += 1
+        if abandoned:
+            flight.future.set_exception(_Abandoned())
+        elif task.cancelled():
+            flight.future.cancel()
+        elif task.exception() is not None:
+            flight.future.set_exception(task.exception())
+        else:
+            flight.future.set_result(task.result())
+
+    def _leave(self, key: Hashable, flight: _Flight):
+        with self._lock:
+            flight.waiters -= 1
+            orphaned = flight.waiters == 0 and not flight.future.done()
+            if orphaned and self._flights.get(key) is flight:
+                del self._flights[key]
+        if orphaned:
+            # Nobody waits for the result any more
+            try:
+                flight.loop.call_soon_threadsafe(flight.task.cancel)
+            except RuntimeError:
+                pass
+
+    def forget(self, predicate: Callable[[Hashable], bool]):
+        """
+        Make later calls start a new execution instead of joining the in-flight ones whose key matches.
+
+        Callers already waiting still receive the result of the execution they joined.
+        """
+        with self._lock:
+            for key in [key for key in self._flights if predicate(key)]:
+                del self._flights[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Shared executions and the calls that joined them."""
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "abandoned": self.abandoned,
+            }
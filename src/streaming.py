@@ -0,0 +1,194 @@
+"""OpenAI-compatible SSE streaming for swarm runs.
+
+Translates swarm streaming events into ``chat.completion.chunk`` server-sent
+events so Open WebUI can render output while the swarm is still working:
+a handoff marker (e.g. "→ aws_agent") whenever a new agent takes over, and
+that agent's text deltas as the model produces them.
+
+Fan-out graph runs execute several agents at once. Only one agent streams
+live at a time; the output of agents running alongside it is buffered and
+written out, under its own marker, once the live agent finishes.
+"""
+
+import json
+import logging
+import time
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from src.token_usage import TokenUsage
+
+logger = logging.getLogger(__name__)
+
+
+def _chunk(completion_id: str, created: int, model: str, delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "delta": delta,
+                "finish_reason": finish_reason,
+            }
+        ],
+    }
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+def _usage_chunk(completion_id: str, created: int, model: str, usage: TokenUsage) -> str:
+    # Sent after the finish chunk when the client asked for stream_options.include_usage
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model,
+        "choices": [],
+        "usage": usage.openai_usage(),
+    }
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+def text_delta(event: Dict[str, Any]) -> Optional[str]:
+    """Extract the text delta from a swarm node stream event, if it carries one."""
+    if event.get("type") != "multiagent_node_stream":
+        return None
+    agent_event = event.get("event")
+    if isinstance(agent_event, dict) and isinstance(agent_event.get("data"), str):
+        return agent_event["data"]
+    return None
+
+
+async def chat_completion_chunks(
+    events: AsyncIterator[Dict[str, Any]],
+    model: str,
+    on_complete: Optional[Callable[[str], None]] = None,
+    usage: Optional[TokenUsage] = None,
+    include_usage: bool = False
+) -> AsyncIterator[str]:
+    """
+    Convert swarm streaming events into OpenAI ``chat.completion.chunk`` SSE lines.
+
+    Args:
+        events: Swarm streaming events from the execution engine
+        model: Model name to echo back in each chunk
+        on_complete: Called with the full streamed content after a successful run
+        usage: The run's token usage; a run stopped by its token budget says so at the end
+        include_usage: Send the run's token usage in a final chunk
+
+    Yields:
+        Server-sent event lines, terminated by ``data: [DONE]``
+    """
+    completion_id = f"chatcmpl-{str(uuid.uuid4())}"
+    created = int(time.time())
+    content_parts = []
+
+    def content(text: str) -> str:
+        content_parts.append(text)
+        return _chunk(completion_id, created, model, {"content": text})
+
+    yield _chunk(completion_id, created, model, {"role": "assistant", "content": ""})
+
+    current_node = None
+    live = False
+    # Output of agents running in parallel with the live one, in start order
+    buffered: Dict[str, List[str]] = {}
+    finished: List[str] = []
+
+    def marker(node_id: str) -> str:
+        prefix = "\n\n" if current_node else ""
+        return content(f"{prefix}→ **{node_id}**\n\n")
+
+    try:
+        async for event in events:
+            event_type = event.get("type")
+            node_id = event.get("node_id")
+
+            if event_type == "multiagent_node_start":
+                if live and node_id != current_node:
+                    buffered.setdefault(node_id, [])
+                else:
+                    if node_id != current_node:
+                        yield marker(node_id)
+                        current_node = node_id
+                    live = True
+
+            elif event_type == "multiagent_node_stream":
+                text = text_delta(event)
+                if text:
+                    if node_id in buffered:
+                        buffered[node_id].append(text)
+                    else:
+                        yield content(text)
+
+            elif event_type == "multiagent_node_stop":
+                if node_id in buffered:
+                    finished.append(node_id)
+                elif node_id == current_node:
+                    live = False
+                    for done in finished:
+                        yield marker(done)
+                        current_node = done
+                        yield content("".join(buffered.pop(done)))
+                    finished.clear()
+                    # An agent still running takes over the live stream
+                    if buffered:
+                        next_node = next(iter(buffered))
+                        yield marker(next_node)
+                        current_node = next_node
+                        yield content("".join(buffered.pop(next_node)))
+                        live = True
+
+            elif event_type == "multiagent_result":
+                result = event.get("result")
+                node_history = getattr(result, "node_history", None) or getattr(result, "execution_order", None)
+                if node_history:
+                    agents_used = [node.node_id for node in node_history]
+                    footer = f"\n\n**Agents involved:** {' → '.join(agents_used)}"
+                    yield content(footer)
+                if usage is not None and usage.exceeded:
+                    yield content(f"\n\n**Stopped:** {usage.exceeded}")
+
+        if on_complete is not None:
+            on_complete("".join(content_parts))
+
+    except Exception as e:
+        logger.error(f"Error while streaming swarm events: {str(e)}")
+        yield _chunk(completion_id, created, model, {"content": f"\n\nError: {str(e)}"})
+
+    yield _chunk(completion_id, created, model, {}, finish_reason="stop")
+    if include_usage and usage is not None:
+        yield _usage_chunk(completion_id, created, model, usage)
+    yield "data: [DONE]\n\n"
+
+
+async def cached_completion_chunks(
+    reply: str,
+    model: str,
+    on_complete: Optional[Callable[[str], None]] = None,
+    usage: Optional[TokenUsage] = None
+) -> AsyncIterator[str]:
+    """
+    Replay a cached reply as ``chat.completion.chunk`` SSE lines.
+
+    Args:
+        reply: The cached assistant reply
+        model: Model name to echo back in each chunk
+        on_complete: Called with the reply once it has been sent
+        usage: Token usage to send in a final chunk, if the client asked for it
+
+    Yields:
+        Server-sent event lines, terminated by ``data: [DONE]``
+    """
+    completion_id = f"chatcmpl-{str(uuid.uuid4())}"
+    created = int(time.time())
+    yield _chunk(completion_id, created, model, {"role": "assistant", "content": ""})
+    yield _chunk(completion_id, created, model, {"content": reply})
+    if on_complete is not None:
+        on_complete(reply)
+    yield _chunk(completion_id, created, model, {}, finish_reason="stop")
+    if usage is not None:
+        yield _usage_chunk(completion_id, created, model, usage)
+    yield "data: [DONE]\n\n"
@@ -0,0 +1,162 @@
+"""Per-run model token accounting and token budgets.
+
+Every agent carries ``TokenBudgetHook``. A run passes a ``TokenUsage`` in its
+invocation state; the hook adds up the usage each model call reports (input,
+output and prompt-cache tokens, per agent) and, once the request's or an
+agent's budget is spent, cancels that agent's next model call. A cancelled
+call ends the agent's turn without a handoff, so the swarm or graph finishes
+cleanly with what it has and the response says why it stopped.
+
+Budgets come from the environment; a client may lower (never raise) the
+request budget with the ``X-Sky-Agent-Token-Budget`` header.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Mapping, Optional
+
+from strands.hooks import AfterModelCallEvent, BeforeModelCallEvent, HookProvider, HookRegistry
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+INVOCATION_STATE_KEY = "token_usage"
+TOKEN_BUDGET_HEADER = "X-Sky-Agent-Token-Budget"
+
+# Model usage keys and the names they are reported under
+USAGE_FIELDS = (
+    ("inputTokens", "input_tokens"),
+    ("outputTokens", "output_tokens"),
+    ("cacheReadInputTokens", "cache_read_tokens"),
+    ("cacheWriteInputTokens", "cache_write_tokens"),
+)
+
+
+def _empty() -> Dict[str, int]:
+    counts = {name: 0 for _, name in USAGE_FIELDS}
+    counts.update(total_tokens=0, model_calls=0)
+    return counts
+
+
+class TokenUsage:
+    """Model token usage of one run, and the budgets it runs under."""
+
+    def __init__(self, request_budget: int = 0, agent_budget: int = 0, agent_budgets: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            request_budget: Tokens the whole run may use (0 for no limit)
+            agent_budget: Tokens any one agent may use (0 for no limit)
+            agent_budgets: Per-agent overrides of agent_budget
+        """
+        self.request_budget = max(0, request_budget)
+        self.agent_budget = max(0, agent_budget)
+        self.agent_budgets = dict(agent_budgets or {})
+        self.agents: Dict[str, Dict[str, int]] = {}
+        self.exceeded: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def record(self, agent: str, usage: Mapping[str, Any]):
+        """Add the usage one model call reported."""
+        with self._lock:
+            counts = self.agents.setdefault(agent, _empty())
+            for key, name in USAGE_FIELDS:
+                counts[name] += int(usage.get(key) or 0)
+            counts["total_tokens"] += int(usage.get("totalTokens") or (usage.get("inputTokens", 0) + usage.get("outputTokens", 0)))
+            counts["model_calls"] += 1
+
+    def total(self, agent: Optional[str] = None) -> int:
+        """Tokens used by the run, or by one agent."""
+        with self._lock:
+            if agent is not None:
+                return self.agents.get(agent, {}).get("total_tokens", 0)
+            return sum(counts["total_tokens"] for counts in self.agents.values())
+
+    def check(self, agent: str, projected_input_tokens: Optional[int] = None) -> Optional[str]:
+        """
+        Why an agent may not call the model again, or None if it may.
+
+        Args:
+            agent: The agent about to call the model
+            projected_input_tokens: Estimated input size of that call, if known
+        """
+        upcoming = projected_input_tokens or 0
+        request_used = self.total()
+        agent_used = self.total(agent)
+        agent_budget = self.agent_budgets.get(agent, self.agent_budget)
+        next_call = f", next call ~{upcoming}" if upcoming else ""
+        reason = None
+        if self.request_budget and request_used + upcoming > self.request_budget:
+            reason = f"request token budget of {self.request_budget} reached ({request_used} used{next_call})"
+        elif agent_budget and agent_used + upcoming > agent_budget:
+            reason = f"{agent} token budget of {agent_budget} reached ({agent_used} used{next_call})"
+        if reason is not None:
+            with self._lock:
+                self.exceeded = self.exceeded or reason
+        return reason
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals and per-agent usage, for API responses."""
+        with self._lock:
+            totals = _empty()
+            for counts in self.agents.values():
+                for name in totals:
+                    totals[name] += counts[name]
+            return {
+                **totals,
+                "agents": {agent: dict(counts) for agent, counts in self.agents.items()},
+                "budget_exceeded": self.exceeded,
+            }
+
+    def openai_usage(self) -> Dict[str, int]:
+        """Totals as an OpenAI ``usage`` block; prompt tokens include prompt-cache reads and writes."""
+        summary = self.summary()
+        prompt_tokens = summary["input_tokens"] + summary["cache_read_tokens"] + summary["cache_write_tokens"]
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": summary["output_tokens"],
+            "total_tokens": prompt_tokens + summary["output_tokens"],
+        }
+
+    def invocation_state(self) -> Dict[str, Any]:
+        """Invocation state to pass to a swarm or graph run so its agents report to this usage."""
+        return {INVOCATION_STATE_KEY: self}
+
+
+def for_request(headers: Mapping[str, str]) -> TokenUsage:
+    """Token usage tracker with the configured budgets, lowered by the request's budget header if it has one."""
+    request_budget = config.TOKEN_BUDGET_PER_REQUEST
+    requested = headers.get(TOKEN_BUDGET_HEADER.lower(), "").strip()
+    if requested.isdigit() and int(requested) > 0:
+        request_budget = min(request_budget, int(requested)) if request_budget else int(requested)
+    return TokenUsage(request_budget, config.TOKEN_BUDGET_PER_AGENT, config.TOKEN_BUDGET_AGENTS)
+
+
+class TokenBudgetHook(HookProvider):
+    """Records each model call's token usage and stops agents whose budget is spent."""
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeModelCallEvent, self.before_model_call)
+        registry.add_callback(AfterModelCallEvent, self.after_model_call)
+
+    @staticmethod
+    def before_model_call(event: BeforeModelCallEvent) -> None:
+        usage: Optional[TokenUsage] = (event.invocation_state or {}).get(INVOCATION_STATE_KEY)
+        if usage is None:
+            return
+        reason = usage.check(event.agent.name, getattr(event, "projected_input_tokens", None))
+        if reason is not None:
+            logger.warning(f"Stopping {event.agent.name}: {reason}")
+            event.cancel = f"Stopped: {reason}."
+
+    @staticmethod
+    def after_model_call(event: AfterModelCallEvent) -> None:
+        usage: Optional[TokenUsage] = (event.invocation_state or {}).get(INVOCATION_STATE_KEY)
+        if usage is None or event.stop_response is None:
+            return
+        metadata = event.stop_response.message.get("metadata") or {}
+        if metadata.get("usage"):
+            usage.record(event.agent.name, metadata["usage"])
+
+
+token_budget_hook = TokenBudgetHook()
@@ -0,0 +1,149 @@
+"""Per-run record of the tools agents call and whether any of them changed state.
+
+Every agent carries ``ToolAuditHook``. A run that wants to know what its
+agents did passes a ``ToolAudit`` in the swarm's invocation state; the hook
+classifies each tool call before it executes and records the ones that may
+mutate cloud resources, Jira/Confluence/GitHub content, files or the active
+CLI context. Anything that cannot be shown to be read-only counts as a write.
+CLI commands whose output may contain secrets are recorded too, so their
+results are not cached.
+"""
+
+import logging
+import shlex
+import threading
+from typing import Any, Dict, List, Optional
+
+from strands.hooks import BeforeToolCallEvent, HookProvider, HookRegistry
+from strands.multiagent.base import Status
+
+from src.mcp_cache import mcp_cache
+from src.tools.cli_cache import is_read_only, is_sensitive
+
+logger = logging.getLogger(__name__)
+
+INVOCATION_STATE_KEY = "tool_audit"
+
+# Tools that never change anything
+READ_ONLY_TOOLS = {
+    "handoff_to_agent",
+    "inventory_search",
+    "azure_auth_status",
+    "azure_subscription_info",
+    "azure_list_subscriptions",
+    "azure_query_all_subscriptions",
+    "gcp_auth_status",
+    "gcp_project_info",
+    "gcp_query_all_projects",
+}
+CLI_TOOLS = {"use_azure": "az", "use_gcp": "gcloud"}
+CLI_BATCH_TOOLS = {"use_azure_batch": "az", "use_gcp_batch": "gcloud"}
+AWS_READ_PREFIXES = ("describe_", "list_", "get_", "head_", "lookup_", "search_", "batch_get_", "scan", "query")
+
+
+def _cli_read_only(binary: str, command: Any) -> bool:
+    try:
+        return is_read_only([binary] + shlex.split(str(command)))
+    except ValueError:
+        return False
+
+
+def reads_secrets(tool_use: Dict[str, Any]) -> bool:
+    """Whether a CLI tool call may return secrets, e.g. ``keyvault secret show``."""
+    name = tool_use.get("name", "")
+    tool_input = tool_use.get("input") or {}
+    if name in CLI_TOOLS:
+        commands, binary = [tool_input.get("command", "")], CLI_TOOLS[name]
+    elif name in CLI_BATCH_TOOLS:
+        commands, binary = tool_input.get("commands") or [], CLI_BATCH_TOOLS[name]
+    else:
+        return False
+    for command in commands:
+        try:
+            if is_sensitive([binary] + shlex.split(str(command))):
+                return True
+        except ValueError:
+            return True
+    return False
+
+
+def is_mutating(tool_use: Dict[str, Any], tool: Any = None) -> bool:
+    """
+    Whether a tool call may change state.
+
+    Args:
+        tool_use: The tool use (name and input) about to be executed
+        tool: The tool object that will run it, used to find an MCP tool's server
+    """
+    name = tool_use.get("name", "")
+    tool_input = tool_use.get("input") or {}
+    if name in READ_ONLY_TOOLS:
+        return False
+    if name in CLI_TOOLS:
+        return not _cli_read_only(CLI_TOOLS[name], tool_input.get("command", ""))
+    if name in CLI_BATCH_TOOLS:
+        commands = tool_input.get("commands") or []
+        return not commands or not all(_cli_read_only(CLI_BATCH_TOOLS[name], command) for command in commands)
+    if name == "use_aws":
+        return not str(tool_input.get("operation_name", "")).startswith(AWS_READ_PREFIXES)
+    # MCP tools are read-only exactly when their result may be cached
+    mcp_tool = getattr(tool, "mcp_tool", None)
+    server = getattr(getattr(tool, "mcp_client", None), "name", None)
+    if mcp_tool is not None and server is not None:
+        return mcp_cache.ttl(server, mcp_tool.name) is None
+    return True
+
+
+class ToolAudit:
+    """Tool calls made during one run."""
+
+    def __init__(self):
+        self.calls: List[str] = []
+        self.mutating: List[str] = []
+        self.sensitive: List[str] = []
+        self.status: Optional[Status] = None
+        self._lock = threading.Lock()
+
+    def record(self, name: str, mutating: bool, sensitive: bool = False):
+        with self._lock:
+            self.calls.append(name)
+            if mutating:
+                self.mutating.append(name)
+            if sensitive:
+                self.sensitive.append(name)
+
+    @property
+    def read_only(self) -> bool:
+        """No tool call in the run could have changed state."""
+        with self._lock:
+            return not self.mutating
+
+    @property
+    def completed(self) -> bool:
+        """The run finished successfully."""
+        return self.status == Status.COMPLETED
+
+    def finish(self, result: Any):
+        """Record the outcome of the run from its swarm or graph result."""
+        self.status = getattr(result, "status", None)
+
+    def invocation_state(self) -> Dict[str, Any]:
+        """Invocation state to pass to a swarm or graph run so its agents report to this audit."""
+        return {INVOCATION_STATE_KEY: self}
+
+
+class ToolAuditHook(HookProvider):
+    """Reports every tool call to the run's ``ToolAudit``, if the run has one."""
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeToolCallEvent, self.before_tool_call)
+
+    @staticmethod
+    def before_tool_call(event: BeforeToolCallEvent) -> None:
+        audit: Optional[ToolAudit] = (event.invocation_state or {}).get(INVOCATION_STATE_KEY)
+        if audit is None:
+            return
+        mutating = is_mutating(event.tool_use, event.selected_tool)
+        if mutating:
+            logger.info(f"Run used state-changing tool {event.tool_use.get('name')}")
+        audit.record(event.tool_use.get("name", ""), mutating, reads_secrets(event.tool_use))
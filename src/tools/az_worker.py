@@ -0,0 +1,72 @@
+"""Warm Azure CLI worker process.
+
+Runs under the Python interpreter bundled with the Azure CLI (not the server's
+interpreter), so it must not import anything from ``src``. The worker imports
+azure-cli once and then executes commands in-process, one per request, using
+a line-delimited JSON protocol on stdin/stdout:
+
+    request:  {"id": 1, "args": ["vm", "list", "--output", "json"]}
+    response: {"id": 1, "returncode": 0, "stdout": "...", "stderr": "..."}
+
+A ``{"ready": true}`` line is written once azure-cli has been imported, or
+``{"ready": false, "error": "..."}`` if it cannot be imported.
+"""
+
+import io
+import json
+import os
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+
+
+def main():
+    # Keep a private handle on the real stdout for the protocol and point fd 1 at
+    # stderr, so anything written straight to the file descriptor cannot corrupt it
+    protocol = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+    sys.stdout = io.TextIOWrapper(os.fdopen(1, "wb", closefd=False), encoding="utf-8")
+
+    try:
+        from azure.cli.core import get_default_cli
+    except ImportError as e:
+        # Not an Azure CLI interpreter: tell the server not to start more workers
+        protocol.write(json.dumps({"ready": False, "error": f"Cannot import azure-cli: {e}"}) + "\n")
+        protocol.flush()
+        sys.exit(1)
+
+    # Warm the command loader so the first real command does not pay for it
+    try:
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            get_default_cli().invoke(["version", "--output", "none"], out_file=io.StringIO())
+    except BaseException:
+        pass
+
+    protocol.write(json.dumps({"ready": True}) + "\n")
+    protocol.flush()
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        out, err = io.StringIO(), io.StringIO()
+        try:
+            with redirect_stdout(out), redirect_stderr(err):
+                # A fresh CLI object per command re-reads the profile and config from disk
+                returncode = get_default_cli().invoke(request["args"], out_file=out)
+        except SystemExit as e:
+            returncode = e.code if isinstance(e.code, int) else 1
+        except BaseException as e:
+            err.write(f"{type(e).__name__}: {e}\n")
+            returncode = 1
+        response = {
+            "id": request.get("id"),
+            "returncode": returncode if isinstance(returncode, int) else 0,
+            "stdout": out.getvalue(),
+            "stderr": err.getvalue(),
+        }
+        protocol.write(json.dumps(response) + "\n")
+        protocol.flush()
+
+
+if __name__ == "__main__":
+    main()
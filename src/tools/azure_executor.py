@@ -0,0 +1,290 @@
+"""Warm in-process Azure CLI executor.
+
+Forking ``az`` for every command pays for Python interpreter startup, the
+azure-cli import and the command table load each time. This module keeps a
+small pool of long-lived worker processes (see ``az_worker.py``) that have
+already imported azure-cli and run commands in-process through its core entry
+point. Each worker is a separate process, so a crash or leaked state cannot
+affect the server: crashed or timed-out workers are killed and replaced, and
+workers are recycled after a fixed number of commands.
+
+``run_az`` / ``run_az_async`` are drop-in replacements for
+``subprocess.run(["az", ...])`` that use the pool when it is available and
+fork ``az`` otherwise.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import queue
+import subprocess
+import threading
+import time
+from typing import Callable, List, Optional
+
+from src.metrics import CANCELLED_OPERATIONS, observe_cli
+from src.tools.cli_runner import run_blocking_async, run_command_async, run_on_cli_loop
+from src import config
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "az_worker.py")
+
+# Interpreter bundled with the Azure CLI Debian/RPM packages
+DEFAULT_AZ_PYTHON = "/opt/az/bin/python3"
+
+# Seconds to wait before spawning again after a worker failed to start, doubled per failure
+SPAWN_RETRY_INITIAL = 1.0
+SPAWN_RETRY_MAX = 60.0
+
+
+class WorkerError(Exception):
+    """Raised when a worker dies or misbehaves."""
+
+
+class WorkerUnavailableError(WorkerError):
+    """Raised when no warm worker can take a command; it was not started."""
+
+
+class WorkerImportError(WorkerError):
+    """Raised when the worker interpreter cannot run azure-cli at all."""
+
+
+class _Worker:
+    """One warm azure-cli process."""
+
+    def __init__(self, python: str, startup_timeout: float):
+        self.commands = 0
+        self._ids = itertools.count(1)
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self.process = subprocess.Popen(
+            [python, WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        threading.Thread(target=self._read, name="az-worker-reader", daemon=True).start()
+        ready = json.loads(self._next_line(startup_timeout))
+        if not ready.get("ready"):
+            self.kill()
+            raise WorkerImportError(ready.get("error") or "Azure CLI worker failed to start")
+
+    def _read(self):
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def _next_line(self, timeout: float) -> str:
+        try:
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            self.kill()
+            raise subprocess.TimeoutExpired(WORKER_SCRIPT, timeout)
+        if line is None:
+            try:
+                returncode = self.process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                returncode = None
+            raise WorkerError(f"Azure CLI worker exited with code {returncode}")
+        return line
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, args: List[str], timeout: float) -> subprocess.CompletedProcess:
+        request_id = next(self._ids)
+        try:
+            self.process.stdin.write(json.dumps({"id": request_id, "args": args}) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise WorkerError(f"Azure CLI worker is gone: {str(e)}")
+        response = json.loads(self._next_line(timeout))
+        if response.get("id") != request_id:
+            self.kill()
+            raise WorkerError("Azure CLI worker returned an out-of-order response")
+        self.commands += 1
+        return subprocess.CompletedProcess(
+            ["az"] + args, response["returncode"], response["stdout"], response["stderr"]
+        )
+
+    def kill(self):
+        if self.alive:
+            self.process.kill()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+
+
+class WarmAzureExecutor:
+    """Pool of warm azure-cli worker processes."""
+
+    def __init__(self, size: int, max_commands_per_worker: int, python: Optional[str], startup_timeout: float = 60.0):
+        self.size = max(0, size)
+        self.max_commands_per_worker = max(1, max_commands_per_worker)
+        self.python = python
+        self.startup_timeout = startup_timeout
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._slots = threading.BoundedSemaphore(self.size or 1)
+        self._disabled_reason: Optional[str] = None
+        self._spawn_failures = 0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._started = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0 and bool(self.python) and os.path.exists(self.python) and self._disabled_reason is None
+
+    def start(self):
+        """Pre-spawn the pool on a background thread."""
+        with self._lock:
+            if self._started or not self.enabled:
+                return
+            self._started = True
+
+        def warm_up():
+            for _ in range(self.size):
+                worker = self._spawn()
+                if worker is None:
+                    return
+                self._idle.put(worker)
+            logger.info(f"Started {self.size} warm Azure CLI workers")
+
+        threading.Thread(target=warm_up, name="az-worker-warmup", daemon=True).start()
+
+    def _spawn(self) -> Optional[_Worker]:
+        with self._lock:
+            if time.monotonic() < self._retry_at:
+                return None
+        try:
+            worker = _Worker(self.python, self.startup_timeout)
+        except (WorkerImportError, FileNotFoundError, PermissionError) as e:
+            # azure-cli is not importable from this interpreter; stop trying
+            logger.warning(f"Warm Azure CLI workers unavailable, forking az instead: {str(e)}")
+            self._disabled_reason = str(e)
+            return None
+        except Exception as e:
+            # A slow or crashed start, e.g. under load: fork az for a while and try again later
+            with self._lock:
+                self._spawn_failures += 1
+                delay = min(SPAWN_RETRY_INITIAL * 2 ** (self._spawn_failures - 1), SPAWN_RETRY_MAX)
+                self._retry_at = time.monotonic() + delay
+            logger.warning(f"Azure CLI worker failed to start, retrying in {delay:.0f}s: {str(e) or type(e).__name__}")
+            return None
+        with self._lock:
+            self._spawn_failures = 0
+            self._retry_at = 0.0
+        return worker
+
+    def run(self, args: List[str], timeout: float,
+            on_start: Optional[Callable[["_Worker"], None]] = None) -> subprocess.CompletedProcess:
+        """
+        Run an az command (without the ``az`` prefix) on a warm worker.
+
+        A worker that dies while running the command is replaced and the
+        command is reported as failed rather than retried, since it may have
+        partially executed.
+
+        Args:
+            args: Command arguments without the ``az`` prefix
+            timeout: Timeout in seconds
+            on_start: Called with the worker that runs the command, so a caller can kill it
+
+        Raises:
+            subprocess.TimeoutExpired: When the command exceeds the timeout
+            WorkerUnavailableError: When every worker is busy or none can be started
+        """
+        if not self._slots.acquire(blocking=False):
+            raise WorkerUnavailableError("All Azure CLI workers are busy")
+        try:
+            try:
+                worker = self._idle.get_nowait()
+                if not worker.alive:
+                    worker = self._spawn()
+            except queue.Empty:
+                worker = self._spawn()
+            # Spawning fails both for a fresh worker and when replacing a dead idle one
+            if worker is None:
+                raise WorkerUnavailableError(self._disabled_reason or "Azure CLI worker unavailable")
+
+            if on_start is not None:
+                on_start(worker)
+            started = time.perf_counter()
+            try:
+                result = worker.run(args, timeout)
+            except subprocess.TimeoutExpired:
+                worker.kill()
+                observe_cli("az", "worker", "timeout", time.perf_counter() - started)
+                raise
+            except (WorkerError, ValueError) as e:
+                worker.kill()
+                observe_cli("az", "worker", "error", time.perf_counter() - started)
+                logger.error(f"Azure CLI worker failed while running command: {str(e)}")
+                return subprocess.CompletedProcess(["az"] + args, 1, "", f"Azure CLI worker failed: {str(e)}")
+            observe_cli("az", "worker", "ok" if result.returncode == 0 else "error", time.perf_counter() - started)
+
+            if worker.commands >= self.max_commands_per_worker:
+                # Recycle long-lived workers so state cannot accumulate indefinitely
+                worker.kill()
+            else:
+                self._idle.put(worker)
+            return result
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                return
+
+
+azure_executor = WarmAzureExecutor(
+    size=config.AZURE_WARM_WORKERS,
+    max_commands_per_worker=config.AZURE_WORKER_MAX_COMMANDS,
+    python=os.getenv("AZURE_CLI_PYTHON", DEFAULT_AZ_PYTHON),
+)
+
+
+async def run_az_async(cmd_parts: List[str], timeout: float) -> subprocess.CompletedProcess:
+    """
+    Run an ``az ...`` command, preferring a warm worker over forking a new process.
+
+    Must be awaited on the CLI loop. Both paths share the CLI concurrency limiter.
+
+    Args:
+        cmd_parts: Full command line, starting with "az"
+        timeout: Timeout in seconds
+
+    Returns:
+        A CompletedProcess with text stdout/stderr, as ``subprocess.run`` would return
+
+    Raises:
+        subprocess.TimeoutExpired: When the command exceeds the timeout
+    """
+    if azure_executor.enabled:
+        running: List[_Worker] = []
+        try:
+            return await run_blocking_async(azure_executor.run, cmd_parts[1:], timeout, running.append)
+        except WorkerUnavailableError as e:
+            logger.debug(f"No warm Azure CLI worker, forking az instead: {str(e)}")
+        except asyncio.CancelledError:
+            # The command runs inside the worker; killing the worker is the only way to stop it
+            for worker in running:
+                worker.kill()
+                CANCELLED_OPERATIONS.labels("cli_process").inc()
+            raise
+    return await run_command_async(cmd_parts, timeout)
+
+
+def run_az(cmd_parts: List[str], timeout: float) -> subprocess.CompletedProcess:
+    """Synchronous ``run_az_async`` for tools that run a single command."""
+    return run_on_cli_loop(run_az_async(cmd_parts, timeout))
@@ -1,7 +1,11 @@
 import logging
-import asyncio
+import os
+import uuid
+from typing import Optional
 from strands import tool
 from src.prompts.claude_code import CLAUDE_CODE_PROMPT
+from src.tools.claude_sessions import ClaudeSessionPool, current_scope
+from src import config
 
 logger = logging.getLogger(__name__)
 
@@ -13,72 +17,68 @@ except ImportError:
     logger.warning("claude-code-sdk not available. Install with: pip install claude-code-sdk")
 
 
+def create_client(cwd: Optional[str] = None) -> "ClaudeSDKClient":
+    """Create a Claude Code SDK client configured for the coding agent."""
+    # Configure claude-code-sdk options
+    options = ClaudeCodeOptions(
+        system_prompt=CLAUDE_CODE_PROMPT,
+        allowed_tools=["Bash", "Read", "Edit", "WebSearch"],
+        permission_mode='acceptEdits',
+        max_turns=10,
+        model="apac.anthropic.claude-sonnet-4-20250514-v1:0",
+        cwd=cwd,
+    )
+    return ClaudeSDKClient(options=options)
 
-async def call_claude_sdk(prompt: str) -> str:
-    """Call claude-code-sdk and return the complete response"""
-    if not SDK_AVAILABLE:
-        return "Error: claude-code-sdk not installed. Please install with: pip install claude-code-sdk"
-
-    try:
-        logger.info(f"Calling claude-code-sdk with prompt: {prompt[:100]}...")
-
-        # Configure claude-code-sdk options
-        options = ClaudeCodeOptions(
-            system_prompt=CLAUDE_CODE_PROMPT,
-            allowed_tools=["Bash", "Read", "Edit", "WebSearch"],
-            permission_mode='acceptEdits',
-            max_turns=10,
-            model="apac.anthropic.claude-sonnet-4-20250514-v1:0",
-        )
-
-        response_text = ""
-
-        async with ClaudeSDKClient(options=options) as client:
-            # Send the query
-            await client.query(prompt)
 
-            # Stream and collect the response
-            async for message in client.receive_response():
-                if hasattr(message, 'content'):
-                    for block in message.content:
-                        if hasattr(block, 'text'):
-                            response_text += block.text
-
-        logger.info("Claude SDK executed successfully")
-        return response_text.strip()
-
-    except Exception as e:
-        logger.error(f"Error calling claude-code-sdk: {str(e)}")
-        return f"Error: {str(e)}"
+# Long-lived sessions keyed by conversation, task and repository; follow-up calls skip CLI startup and keep context
+claude_sessions = ClaudeSessionPool(
+    client_factory=create_client,
+    max_sessions=config.CLAUDE_MAX_SESSIONS,
+    idle_timeout=config.CLAUDE_SESSION_IDLE_SECONDS,
+    max_turns=config.CLAUDE_SESSION_MAX_TURNS,
+)
 
 
+def session_key(scope: str, session: str, working_directory: Optional[str]) -> str:
+    """Pool key for a task name within a repository, private to one conversation or run."""
+    return f"{scope}#{os.path.abspath(working_directory or os.getcwd())}#{session}"
 
 
 @tool
-def claude_code(prompt: str) -> str:
+def claude_code(prompt: str, session: Optional[str] = None, working_directory: Optional[str] = None) -> str:
     """
     Execute complex development tasks using Claude Code SDK with full tooling capabilities.
 
+    Calls in the same conversation with the same session name and working
+    directory continue the same Claude Code session, so follow-up steps keep
+    the files, commands and findings of earlier steps in context. Without a
+    session name the task runs on a fresh session that is closed afterwards.
+
     Args:
         prompt: A development task requiring code analysis, file operations, or system commands
+        session: Optional task name; pass the same name for follow-up steps of one task, a new name for a clean context
+        working_directory: Optional repository/directory to work in (defaults to the server's directory)
 
     Returns:
         Complete response from Claude Code SDK execution
     """
+    if not SDK_AVAILABLE:
+        return "Error: claude-code-sdk not installed. Please install with: pip install claude-code-sdk"
+
     try:
         logger.info(f"Claude Code tool received prompt: {prompt[:100]}...")
 
-        # Call claude-code-sdk asynchronously using the existing function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            claude_result = loop.run_until_complete(call_claude_sdk(prompt))
-        finally:
-            loop.close()
+        scope = current_scope()
+        if session and scope:
+            claude_result = claude_sessions.run(session_key(scope, session, working_directory), prompt, cwd=working_directory)
+        else:
+            # Nothing to continue: a shared default session would mix unrelated requests
+            claude_result = claude_sessions.run_once(f"one-off-{uuid.uuid4().hex[:12]}", prompt, cwd=working_directory)
 
         logger.info("Claude Code tool executed successfully")
         return claude_result
 
     except Exception as e:
         logger.error(f"Error in Claude Code assistant: {str(e)}")
-        return f"Error in Claude Code assistant: {str(e)}"
\ No newline at end of file
+        return f"Error in Claude Code assistant: {str(e)}"
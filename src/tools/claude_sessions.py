@@ -0,0 +1,272 @@
+"""Pool of long-lived Claude Code SDK sessions.
+
+Every ``ClaudeSDKClient`` spawns the Node ``claude`` CLI and runs its
+handshake, and a fresh client starts with an empty context. The pool keeps
+connected clients alive on one dedicated background event loop and hands the
+same client to follow-up calls with the same session key (task or
+repository), so later steps skip process startup and keep their working
+context.
+
+The SDK's clients hold anyio task groups that must be entered and exited from
+the same task, so each session is owned by one task on the loop that
+connects, answers prompts from its queue in order and disconnects. A caller
+that is cancelled (its run was cancelled) while its prompt is being answered
+cancels that task, which disconnects the client and stops its CLI process;
+the next prompt for the key starts a fresh session.
+
+Sessions are only shared within one conversation (or one run, for requests
+without a conversation): the engine makes the run's scope current with
+``session_scope`` and tools build their keys from ``current_scope()``.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from src.background_loop import BackgroundLoop
+from src.metrics import CANCELLED_OPERATIONS
+
+logger = logging.getLogger(__name__)
+
+claude_loop = BackgroundLoop("claude-code")
+
+_scope: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("claude_session_scope", default=None)
+
+
+@contextmanager
+def session_scope(scope: str) -> Iterator[None]:
+    """Make ``scope`` (a conversation or run id) current for tools started inside the block."""
+    token = _scope.set(scope)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def current_scope() -> Optional[str]:
+    """Conversation or run the calling tool belongs to, if any."""
+    return _scope.get()
+
+
+class ClaudeSession:
+    """One connected Claude Code client, owned by a task on the pool's loop."""
+
+    def __init__(self, key: str, client_factory: Callable[[], Any]):
+        self.key = key
+        self.turns = 0
+        self.pending = 0
+        self.last_used = time.monotonic()
+        self.closed = False
+        self.cancelled = False
+        self._client_factory = client_factory
+        self._active: Optional[asyncio.Future] = None
+        self._queue: "asyncio.Queue[Optional[Tuple[str, asyncio.Future]]]" = asyncio.Queue()
+        self._connected: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._serve(), name=f"claude-session:{key}")
+
+    async def _serve(self):
+        client = self._client_factory()
+        try:
+            await client.connect()
+        except BaseException as e:
+            self.closed = True
+            self._connected.set_exception(e)
+            self._fail_pending(e)
+            return
+        self._connected.set_result(None)
+        try:
+            while True:
+                request = await self._queue.get()
+                if request is None:
+                    break
+                prompt, future = request
+                if future.cancelled():
+                    continue
+                self._active = future
+                try:
+                    future.set_result(await self._ask(client, prompt))
+                except Exception as e:
+                    # The CLI process may be in an unknown state; retire the session
+                    if not future.done():
+                        future.set_exception(e)
+                    break
+                finally:
+                    self._active = None
+        finally:
+            self.closed = True
+            self._fail_pending(RuntimeError("Claude Code session closed"))
+            try:
+                await client.disconnect()
+            except Exception as e:
+                logger.debug(f"Error disconnecting Claude Code session {self.key}: {str(e)}")
+
+    @staticmethod
+    async def _ask(client: Any, prompt: str) -> str:
+        await client.query(prompt)
+        response_text = ""
+        async for message in client.receive_response():
+            if hasattr(message, 'content'):
+                for block in message.content:
+                    if hasattr(block, 'text'):
+                        response_text += block.text
+        return response_text.strip()
+
+    def _fail_pending(self, error: BaseException):
+        while not self._queue.empty():
+            request = self._queue.get_nowait()
+            if request is not None and not request[1].done():
+                request[1].set_exception(error)
+
+    async def ask(self, prompt: str) -> str:
+        """Send a prompt after any earlier prompts on this session and wait for the reply."""
+        # Count the caller before waiting for the connection so it is not evicted as idle
+        self.pending += 1
+        self.last_used = time.monotonic()
+        try:
+            await asyncio.shield(self._connected)
+            if self.closed:
+                raise RuntimeError("Claude Code session closed")
+            future = asyncio.get_running_loop().create_future()
+            self._queue.put_nowait((prompt, future))
+            try:
+                result = await future
+            except asyncio.CancelledError:
+                if self._active is future:
+                    # Nothing can interrupt the CLI mid-answer; disconnect it instead
+                    self.cancelled = True
+                    self._task.cancel()
+                    CANCELLED_OPERATIONS.labels("claude_session").inc()
+                    logger.info(f"Closing Claude Code session {self.key}: its caller was cancelled")
+                raise
+            self.turns += 1
+            return result
+        finally:
+            self.pending -= 1
+            self.last_used = time.monotonic()
+
+    async def close(self):
+        """Finish queued prompts and disconnect."""
+        if not self._task.done():
+            self._queue.put_nowait(None)
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+class ClaudeSessionPool:
+    """Keyed pool of Claude Code sessions with idle timeout and max-sessions limits."""
+
+    def __init__(self, client_factory: Callable[[Optional[str]], Any], max_sessions: int,
+                 idle_timeout: float, max_turns: int):
+        self.client_factory = client_factory
+        self.max_sessions = max(1, max_sessions)
+        self.idle_timeout = idle_timeout
+        self.max_turns = max(1, max_turns)
+        self._sessions: "OrderedDict[str, ClaudeSession]" = OrderedDict()
+        self._reaper: Optional[asyncio.Task] = None
+        self._counters = {"created": 0, "reused": 0, "expired": 0, "evicted": 0, "one_off": 0, "cancelled": 0}
+
+    def run(self, key: str, prompt: str, cwd: Optional[str] = None) -> str:
+        """Synchronous ``ask`` for tools; runs on the pool's background loop."""
+        return claude_loop.run(self.ask(key, prompt, cwd))
+
+    def run_once(self, key: str, prompt: str, cwd: Optional[str] = None) -> str:
+        """Synchronous ``ask_once`` for tools; runs on the pool's background loop."""
+        return claude_loop.run(self.ask_once(key, prompt, cwd))
+
+    async def ask_once(self, key: str, prompt: str, cwd: Optional[str] = None) -> str:
+        """Send a prompt to a one-off session that is closed afterwards (key is only used for logging)."""
+        self._counters["one_off"] += 1
+        one_off = ClaudeSession(key, lambda: self.client_factory(cwd))
+        try:
+            return await self._ask(one_off, prompt)
+        finally:
+            await one_off.close()
+
+    async def ask(self, key: str, prompt: str, cwd: Optional[str] = None) -> str:
+        """
+        Send a prompt to the session for key, creating it if needed.
+
+        Must be awaited on the pool's loop. When every slot is held by a busy
+        session the prompt runs on a one-off session that is closed afterwards.
+        """
+        self._start_reaper()
+        session = self._sessions.get(key)
+        if session is not None and (session.closed or session.turns >= self.max_turns):
+            # Recycle sessions that died or whose context has grown too long
+            self._sessions.pop(key)
+            asyncio.create_task(session.close())
+            session = None
+
+        if session is not None:
+            self._counters["reused"] += 1
+            self._sessions.move_to_end(key)
+            return await self._ask(session, prompt)
+
+        if len(self._sessions) >= self.max_sessions and not await self._evict_idle():
+            return await self.ask_once(key, prompt, cwd)
+
+        self._counters["created"] += 1
+        session = ClaudeSession(key, lambda: self.client_factory(cwd))
+        self._sessions[key] = session
+        return await self._ask(session, prompt)
+
+    async def _ask(self, session: ClaudeSession, prompt: str) -> str:
+        try:
+            return await session.ask(prompt)
+        except asyncio.CancelledError:
+            if session.cancelled:
+                self._counters["cancelled"] += 1
+                if self._sessions.get(session.key) is session:
+                    self._sessions.pop(session.key)
+            raise
+
+    async def _evict_idle(self) -> bool:
+        # Least recently used first
+        for key, session in list(self._sessions.items()):
+            if session.pending == 0:
+                self._sessions.pop(key)
+                self._counters["evicted"] += 1
+                asyncio.create_task(session.close())
+                return True
+        return False
+
+    def _start_reaper(self):
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap(), name="claude-session-reaper")
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(max(1.0, min(self.idle_timeout / 4, 60.0)))
+            now = time.monotonic()
+            for key, session in list(self._sessions.items()):
+                if session.pending == 0 and now - session.last_used > self.idle_timeout:
+                    logger.info(f"Closing idle Claude Code session {key}")
+                    self._sessions.pop(key)
+                    self._counters["expired"] += 1
+                    await session.close()
+
+    async def close_all(self):
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        if self._reaper is not None:
+            self._reaper.cancel()
+        await asyncio.gather(*(session.close() for session in sessions), return_exceptions=True)
+
+    def shutdown(self, timeout: float = 10.0):
+        """Disconnect every session (stops their CLI processes)."""
+        if claude_loop.started:
+            try:
+                claude_loop.run(self.close_all(), timeout=timeout)
+            except Exception as e:
+                logger.warning(f"Error closing Claude Code sessions: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "busy": sum(1 for session in self._sessions.values() if session.pending),
+            "max_sessions": self.max_sessions,
+            **self._counters,
+        }
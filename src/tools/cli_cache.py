@@ -0,0 +1,239 @@
+"""TTL result cache for read-only az / gcloud commands.
+
+Agents tend to issue the same ``vm list`` or ``compute instances list`` several
+times within one swarm run and across users, and every call is a multi-second
+CLI round trip. Successful results of read-only commands (list/show/describe/get)
+are cached, keyed on the normalized command line plus the subscription/project
+and location it ran against. Each verb family has its own TTL and the cache is
+bounded by entry count and total size (least recently used first).
+
+Any other command is treated as mutating: after it runs, cached entries for the
+same command group (e.g. ``vm`` or ``compute``) and for the provider's
+aggregate listings are invalidated.
+
+Reads that return secret material (Key Vault secrets, account keys, connection
+strings, Secret Manager payloads, credentials) are never cached: the cache is
+shared by every conversation in the process.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+Scope = Tuple[str, Optional[str], Optional[str]]
+
+# Verbs that read state. "get-credentials" and "get-access-token" are excluded:
+# the first writes a kubeconfig, the second returns short-lived secrets.
+READ_VERBS = {"list", "show", "describe", "get", "get-value"}
+READ_VERB_PREFIXES = ("list-", "show-", "describe-", "get-")
+NEVER_CACHE_VERBS = {"get-credentials", "get-access-token", "print-access-token"}
+
+# Command words whose output carries secrets, e.g. ``keyvault secret show``,
+# ``storage account keys list``, ``redis list-keys``, ``secrets versions access``
+SENSITIVE_WORD = re.compile(r"secret|credential|password|token|connection-string|publishing|keys?$|(^|-)sas$")
+
+# Common mutating verbs; they end the command group even when a positional
+# resource name that follows them happens to look like a read verb
+WRITE_VERBS = {
+    "create", "delete", "update", "set", "unset", "add", "remove", "start", "stop",
+    "restart", "deallocate", "redeploy", "reset", "resize", "scale", "upgrade",
+    "deploy", "attach", "detach", "assign", "enable", "disable", "import", "export",
+    "move", "copy", "cp", "mv", "rm", "upload", "download", "purge", "restore",
+    "run", "invoke", "submit", "cancel", "apply", "patch", "replace", "rollback",
+    "login", "logout", "activate", "ssh", "scp", "tag", "untag",
+}
+
+# Command groups whose listings span every resource type
+AGGREGATE_GROUPS = {
+    "azure": {"resource", "group"},
+    "gcp": {"asset", "projects"},
+}
+
+CLI_BINARIES = {"az", "gcloud"}
+
+
+def split_command(argv: List[str]) -> Tuple[List[str], Optional[str]]:
+    """
+    Split a CLI argv into its command group and verb.
+
+    The verb is the first read or write verb among the positional words before
+    the first flag (or the last positional word if none is recognised), e.g.
+    ``az vm list -g rg`` -> (["vm"], "list") and
+    ``gcloud compute instances describe my-vm`` -> (["compute", "instances"], "describe").
+    """
+    words = []
+    for part in argv:
+        if part.startswith("-"):
+            break
+        words.append(part)
+    if words and words[0] in CLI_BINARIES:
+        words = words[1:]
+    # gcloud takes resource names positionally after the verb
+    for i, word in enumerate(words):
+        if word in WRITE_VERBS or word in NEVER_CACHE_VERBS or is_read_verb(word) or i == len(words) - 1:
+            return words[:i], word
+    return [], None
+
+
+def is_read_verb(verb: Optional[str]) -> bool:
+    if not verb or verb in NEVER_CACHE_VERBS:
+        return False
+    return verb in READ_VERBS or verb.startswith(READ_VERB_PREFIXES)
+
+
+def is_read_only(argv: List[str]) -> bool:
+    """Whether a CLI command only reads state."""
+    _, verb = split_command(argv)
+    return is_read_verb(verb)
+
+
+def is_sensitive(argv: List[str]) -> bool:
+    """Whether a CLI command's output may contain secrets."""
+    group, verb = split_command(argv)
+    return any(SENSITIVE_WORD.search(word) for word in group + [verb] if word)
+
+
+def is_cacheable(argv: List[str]) -> bool:
+    """Whether a CLI command's output may be cached or shared with other callers."""
+    return is_read_only(argv) and not is_sensitive(argv)
+
+
+def verb_ttl(verb: str) -> float:
+    if verb == "list" or verb.startswith("list-"):
+        return config.CLI_CACHE_LIST_TTL_SECONDS
+    return config.CLI_CACHE_SHOW_TTL_SECONDS
+
+
+class _Entry:
+    __slots__ = ("output", "expires_at", "group")
+
+    def __init__(self, output: str, expires_at: float, group: List[str]):
+        self.output = output
+        self.expires_at = expires_at
+        self.group = group
+
+
+class CommandCache:
+    """Size-bounded TTL cache of read-only CLI command output."""
+
+    def __init__(self, max_entries: int, max_bytes: int, enabled: bool = True):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(scope: Scope, argv: List[str]) -> Tuple:
+        return scope + (" ".join(argv),)
+
+    def get(self, scope: Scope, argv: List[str]) -> Optional[str]:
+        """Cached output of a read-only command, or None."""
+        if not self.enabled or not is_cacheable(argv):
+            return None
+        key = self._key(scope, argv)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.output
+
+    def update(self, scope: Scope, argv: List[str], output: str, succeeded: bool):
+        """
+        Record a command that was executed.
+
+        Successful read-only commands are stored unless they return secrets; any
+        other command invalidates the entries it may have made stale, whether or
+        not it succeeded.
+        """
+        if not self.enabled:
+            return
+        group, verb = split_command(argv)
+        if not is_read_verb(verb):
+            self.invalidate(scope[0], group)
+            return
+        if not succeeded or len(output) > self.max_bytes or is_sensitive(argv):
+            return
+        key = self._key(scope, argv)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(output, time.monotonic() + verb_ttl(verb), group)
+            self._bytes += len(output)
+            self._evict()
+
+    def invalidate(self, provider: str, group: Optional[List[str]] = None):
+        """
+        Drop cached entries a mutation of ``group`` may have made stale.
+
+        Args:
+            provider: "azure" or "gcp"
+            group: Command group of the mutating command; every entry of the
+                provider is dropped when omitted
+        """
+        top = group[0] if group else None
+        aggregates = AGGREGATE_GROUPS.get(provider, set())
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if key[0] == provider and (
+                    top is None
+                    or (entry.group and entry.group[0] in ({top} | aggregates))
+                )
+            ]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+        if stale:
+            logger.info(f"Invalidated {len(stale)} cached {provider} results for {' '.join(group or ['*'])}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Tuple):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.output)
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and occupancy."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+command_cache = CommandCache(
+    max_entries=config.CLI_CACHE_MAX_ENTRIES,
+    max_bytes=config.CLI_CACHE_MAX_BYTES,
+    enabled=config.CLI_CACHE_ENABLED,
+)
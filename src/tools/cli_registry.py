@@ -0,0 +1,158 @@
+"""Startup capability registry for the cloud CLIs.
+
+Both ``az`` and ``gcloud`` are Python programs that take a second or two to
+start, so probing them with ``az version`` / ``gcloud version`` before every
+tool call roughly doubled tool latency. The registry detects each CLI's binary,
+version, installed extensions/components and authentication state once at
+startup and refreshes them on a background thread; tools consult the registry
+instead of forking a probe.
+"""
+
+import json
+import logging
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CliCapability:
+    """What is known about one CLI installation."""
+    name: str
+    path: Optional[str] = None
+    version: Optional[str] = None
+    extensions: Dict[str, str] = field(default_factory=dict)
+    authenticated: Optional[bool] = None
+    account: Optional[str] = None
+    error: Optional[str] = None
+    checked_at: float = 0.0
+
+    @property
+    def available(self) -> bool:
+        return self.path is not None
+
+
+def _run_json(argv: List[str], timeout: int = 60) -> Any:
+    result = subprocess.run(argv, capture_output=True, text=True, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"exit code {result.returncode}")
+    return json.loads(result.stdout or "null")
+
+
+def probe_az(capability: CliCapability):
+    """Fill in version, extensions and login state for the Azure CLI."""
+    versions = _run_json([capability.path, "version", "--output", "json"])
+    capability.version = versions.get("azure-cli")
+    capability.extensions = dict(versions.get("extensions") or {})
+    try:
+        account = _run_json([capability.path, "account", "show", "--output", "json"], timeout=30)
+        capability.authenticated = True
+        capability.account = (account.get("user") or {}).get("name")
+    except (RuntimeError, ValueError):
+        capability.authenticated = False
+        capability.account = None
+
+
+def probe_gcloud(capability: CliCapability):
+    """Fill in version, components and credential state for the Google Cloud CLI."""
+    versions = _run_json([capability.path, "version", "--format", "json"])
+    capability.version = versions.pop("Google Cloud SDK", None)
+    capability.extensions = {name: str(version) for name, version in versions.items()}
+    try:
+        accounts = _run_json([capability.path, "auth", "list", "--format", "json"], timeout=30)
+        active = [entry.get("account") for entry in accounts or [] if entry.get("status") == "ACTIVE"]
+        capability.authenticated = bool(active)
+        capability.account = active[0] if active else None
+    except (RuntimeError, ValueError):
+        capability.authenticated = False
+        capability.account = None
+
+
+PROBES: Dict[str, Callable[[CliCapability], None]] = {
+    "az": probe_az,
+    "gcloud": probe_gcloud,
+}
+
+INSTALL_HINTS = {
+    "az": "Error: az CLI not installed. Please install Azure CLI",
+    "gcloud": "Error: gcloud CLI not installed. Please install Google Cloud SDK",
+}
+
+
+class CapabilityRegistry:
+    """Detects CLI capabilities once and keeps them fresh in the background."""
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._capabilities: Dict[str, CliCapability] = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self._stop = threading.Event()
+
+    def start(self):
+        """Run an initial detection and keep refreshing on a daemon thread."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._refresh_loop, name="cli-capabilities", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.refresh_interval)
+
+    def refresh(self, name: Optional[str] = None):
+        """Re-detect one CLI (or all of them)."""
+        for cli in ([name] if name else list(PROBES)):
+            capability = CliCapability(name=cli, path=shutil.which(cli), checked_at=time.time())
+            if capability.available:
+                try:
+                    PROBES[cli](capability)
+                except Exception as e:
+                    logger.warning(f"Could not probe {cli}: {str(e)}")
+                    capability.error = str(e)
+            with self._lock:
+                self._capabilities[cli] = capability
+            logger.info(
+                f"CLI capability: {cli} path={capability.path} version={capability.version} "
+                f"authenticated={capability.authenticated}"
+            )
+
+    def get(self, name: str) -> CliCapability:
+        """
+        Current capability record for a CLI.
+
+        Before the first background detection has finished only the binary
+        lookup (a PATH search, no process) is performed.
+        """
+        self.start()
+        with self._lock:
+            capability = self._capabilities.get(name)
+        if capability is None:
+            capability = CliCapability(name=name, path=shutil.which(name))
+        return capability
+
+    def require(self, name: str) -> Optional[str]:
+        """Error message if the CLI is not installed, otherwise None."""
+        if self.get(name).available:
+            return None
+        return INSTALL_HINTS.get(name, f"Error: {name} CLI not installed")
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """All capability records as plain dicts."""
+        with self._lock:
+            return {name: asdict(capability) for name, capability in self._capabilities.items()}
+
+
+cli_registry = CapabilityRegistry(refresh_interval=config.CLI_CAPABILITY_REFRESH_SECONDS)
@@ -0,0 +1,237 @@
+"""Asynchronous subprocess engine for the cloud CLIs.
+
+Commands run as asyncio subprocesses on a shared background loop, behind a
+concurrency limiter so a batch fan-out cannot fork an unbounded number of CLI
+processes. Each command runs in its own process group, so a timeout or a
+cancelled run kills the CLI together with any helpers it started. ``run_command`` gives synchronous tools the same
+``subprocess.CompletedProcess`` / ``subprocess.TimeoutExpired`` behaviour as
+``subprocess.run``, and batch tools gather many ``run_command_async`` calls.
+
+Identical read-only commands against the same subscription or project that
+are already running share one execution (``run_shared``), so a burst of
+``az resource list`` calls from several users forks a single CLI process.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import subprocess
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.background_loop import BackgroundLoop
+from src.metrics import CANCELLED_OPERATIONS, observe_cli
+from src.single_flight import SingleFlight
+from src.tools.cli_cache import is_cacheable
+from src.tools.output_encoding import encode_document, encode_value, record_savings
+from src import config
+
+logger = logging.getLogger(__name__)
+
+cli_loop = BackgroundLoop("cli-runner")
+
+_limiter: Optional[asyncio.Semaphore] = None
+
+cli_flights = SingleFlight("cli", enabled=config.SINGLE_FLIGHT_ENABLED)
+
+
+def _get_limiter() -> asyncio.Semaphore:
+    # Created lazily so it binds to the background loop
+    global _limiter
+    if _limiter is None:
+        _limiter = asyncio.Semaphore(config.CLI_MAX_PARALLEL)
+    return _limiter
+
+
+def _kill(process: asyncio.subprocess.Process):
+    """Kill a CLI process and its process group."""
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
+async def run_command_async(argv: List[str], timeout: float) -> subprocess.CompletedProcess:
+    """
+    Run a command as an asyncio subprocess and capture its text output.
+
+    Must be awaited on the CLI loop (see ``run_on_cli_loop``).
+
+    Raises:
+        subprocess.TimeoutExpired: When the command exceeds the timeout
+        FileNotFoundError: When the executable does not exist
+    """
+    async with _get_limiter():
+        started = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            *argv,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=os.name == "posix",
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            _kill(process)
+            await process.wait()
+            observe_cli(os.path.basename(argv[0]), "subprocess", "timeout", time.perf_counter() - started)
+            raise subprocess.TimeoutExpired(argv, timeout)
+        except asyncio.CancelledError:
+            _kill(process)
+            await process.wait()
+            observe_cli(os.path.basename(argv[0]), "subprocess", "cancelled", time.perf_counter() - started)
+            CANCELLED_OPERATIONS.labels("cli_process").inc()
+            logger.info(f"Killed cancelled command: {' '.join(argv)}")
+            raise
+    observe_cli(os.path.basename(argv[0]), "subprocess", "ok" if process.returncode == 0 else "error",
+                time.perf_counter() - started)
+    return subprocess.CompletedProcess(
+        argv,
+        process.returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
+
+
+async def run_blocking_async(fn, *args: Any) -> Any:
+    """Run a blocking callable under the same concurrency limiter."""
+    async with _get_limiter():
+        return await asyncio.to_thread(fn, *args)
+
+
+def run_on_cli_loop(coro: Awaitable[Any]) -> Any:
+    """Run a coroutine on the CLI loop from synchronous code and wait for it."""
+    return cli_loop.run(coro)
+
+
+def run_command(argv: List[str], timeout: float) -> subprocess.CompletedProcess:
+    """Synchronous drop-in for ``subprocess.run(argv, capture_output=True, text=True, timeout=timeout)``."""
+    return run_on_cli_loop(run_command_async(argv, timeout))
+
+
+async def run_shared(
+    scope: Tuple[str, Optional[str], Optional[str]],
+    argv: List[str],
+    execute: Callable[[], Awaitable[subprocess.CompletedProcess]],
+) -> subprocess.CompletedProcess:
+    """
+    Execute a command, joining an identical read-only command already in flight.
+
+    Commands that change state or return secrets always run on their own.
+    Callers that join an execution share its timeout as well as its result.
+
+    Args:
+        scope: Provider, subscription/project and location the command runs against
+        argv: Full command line
+        execute: Coroutine function running the command
+
+    Raises:
+        subprocess.TimeoutExpired: When the shared execution times out
+    """
+    if not is_cacheable(argv):
+        return await execute()
+    return await cli_flights.do(scope + (" ".join(argv),), execute)
+
+
+def check_batch_size(commands: List[str]) -> Optional[str]:
+    """Error message if a batch is empty or too large, otherwise None."""
+    if not commands:
+        return "Error: No commands provided"
+    if len(commands) > config.CLI_BATCH_MAX_COMMANDS:
+        return f"Error: At most {config.CLI_BATCH_MAX_COMMANDS} commands can be run in one batch"
+    return None
+
+
+def _parse_output(output: str) -> Any:
+    if output.startswith("Error:"):
+        return output
+    try:
+        return json.loads(output)
+    except ValueError:
+        return output
+
+
+async def run_batch(commands: List[str], run_one: Callable[[str], Awaitable[str]],
+                    encoding: Optional[str] = None) -> str:
+    """
+    Run independent commands concurrently and merge their results.
+
+    Args:
+        commands: Commands to run
+        run_one: Coroutine function executing a single command and returning its output
+        encoding: How the merged document is encoded (see ``src.tools.output_encoding``)
+
+    Returns:
+        JSON object keyed by command; JSON outputs are embedded parsed, errors as strings
+    """
+    unique = list(dict.fromkeys(command.strip() for command in commands))
+    outputs = await asyncio.gather(*(run_one(command) for command in unique))
+    results: Dict[str, Any] = {command: _parse_output(output) for command, output in zip(unique, outputs)}
+    encoded = encode_value(results, encoding)
+    record_savings(encoding or config.CLI_OUTPUT_ENCODING, sum(len(output) for output in outputs), len(encoded))
+    return encoded
+
+
+def _tag(output: Any, label: str, scope_id: str) -> List[Any]:
+    # Tag every returned resource with the scope it came from
+    items = output if isinstance(output, list) else [output]
+    return [{label: scope_id, **item} if isinstance(item, dict) else {label: scope_id, "value": item} for item in items]
+
+
+async def run_across_scopes(
+    command: str,
+    scopes: Dict[str, Optional[str]],
+    run_one: Callable[[str], Awaitable[str]],
+    scope_flag: str,
+    label: str,
+    encoding: Optional[str] = None,
+) -> str:
+    """
+    Run one command against many subscriptions/projects concurrently and merge the results.
+
+    Args:
+        command: Command to run (without the CLI prefix)
+        scopes: Scope ids mapped to display names
+        run_one: Coroutine function executing a single command and returning its output
+        scope_flag: Per-invocation flag selecting the scope, e.g. "--subscription"
+        label: Key each merged item is tagged with, e.g. "subscriptionId"
+        encoding: How the merged document is encoded; with "auto" or "table" the
+            results may follow the summary as a table
+
+    Returns:
+        JSON document with the merged, tagged items plus a per-scope status
+        entry, so a failure in one scope does not hide the others' results
+    """
+    scope_ids = list(scopes)
+    outputs = await asyncio.gather(
+        *(run_one(f"{command.strip()} {scope_flag} {scope_id}") for scope_id in scope_ids)
+    )
+
+    items: List[Any] = []
+    status: Dict[str, Dict[str, Any]] = {}
+    for scope_id, output in zip(scope_ids, outputs):
+        entry: Dict[str, Any] = {"name": scopes[scope_id]}
+        parsed = _parse_output(output)
+        if isinstance(parsed, str) and parsed.startswith("Error:"):
+            entry.update(status="error", error=parsed[len("Error:"):].strip())
+        else:
+            tagged = _tag(parsed, label, scope_id) if parsed not in ("", None) else []
+            items.extend(tagged)
+            entry.update(status="ok", count=len(tagged))
+        status[scope_id] = entry
+
+    failed = [scope_id for scope_id, entry in status.items() if entry["status"] == "error"]
+    encoded = encode_document({
+        "command": command.strip(),
+        "scopes": status,
+        "succeeded": len(scope_ids) - len(failed),
+        "failed": len(failed),
+        "results": items,
+    }, "results", encoding)
+    record_savings(encoding or config.CLI_OUTPUT_ENCODING, sum(len(output) for output in outputs), len(encoded))
+    return encoded
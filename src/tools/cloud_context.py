@@ -0,0 +1,119 @@
+"""Active Azure / GCP CLI context, read from the CLIs' local configuration.
+
+Reading ``azureProfile.json`` and the gcloud configuration files directly is
+cheap, whereas asking ``az account show`` or ``gcloud config get-value`` costs
+a full CLI start. The scope returned here identifies which subscription or
+project (and default location) a command will run against.
+"""
+
+import configparser
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _flag_value(argv: List[str], *flags: str) -> Optional[str]:
+    """Return the value of the first matching ``--flag value`` or ``--flag=value`` in argv."""
+    for i, part in enumerate(argv):
+        for flag in flags:
+            if part == flag and i + 1 < len(argv):
+                return argv[i + 1]
+            if part.startswith(f"{flag}="):
+                return part.split("=", 1)[1]
+    return None
+
+
+def _read_ini(path: str) -> configparser.ConfigParser:
+    parser = configparser.ConfigParser()
+    try:
+        parser.read(path, encoding="utf-8")
+    except (configparser.Error, OSError) as e:
+        logger.debug(f"Could not read {path}: {str(e)}")
+    return parser
+
+
+def azure_config_dir() -> str:
+    return os.getenv("AZURE_CONFIG_DIR", os.path.expanduser("~/.azure"))
+
+
+def azure_subscriptions() -> List[Dict[str, Any]]:
+    """Subscriptions in the az profile (as ``az account list`` would report them)."""
+    path = os.path.join(azure_config_dir(), "azureProfile.json")
+    try:
+        # az writes this file with a UTF-8 BOM
+        with open(path, encoding="utf-8-sig") as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return profile.get("subscriptions", [])
+
+
+def azure_default_subscription() -> Optional[str]:
+    """Id of the default subscription in the az profile, if any."""
+    for subscription in azure_subscriptions():
+        if subscription.get("isDefault"):
+            return subscription.get("id")
+    return None
+
+
+def azure_default_location() -> Optional[str]:
+    """Default location set with ``az config set defaults.location=...``, if any."""
+    parser = _read_ini(os.path.join(azure_config_dir(), "config"))
+    return parser.get("defaults", "location", fallback=None)
+
+
+def azure_scope(argv: Optional[List[str]] = None) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Scope an az command runs in: ("azure", subscription, location).
+
+    An explicit ``--subscription`` in the command takes precedence over the
+    default subscription.
+    """
+    subscription = _flag_value(argv or [], "--subscription") or azure_default_subscription()
+    return ("azure", subscription, azure_default_location())
+
+
+def gcloud_config_dir() -> str:
+    return os.getenv("CLOUDSDK_CONFIG", os.path.expanduser("~/.config/gcloud"))
+
+
+def gcloud_active_properties() -> configparser.ConfigParser:
+    """Properties of the active gcloud configuration."""
+    config_dir = gcloud_config_dir()
+    name = os.getenv("CLOUDSDK_ACTIVE_CONFIG_NAME")
+    if not name:
+        try:
+            with open(os.path.join(config_dir, "active_config"), encoding="utf-8") as f:
+                name = f.read().strip() or "default"
+        except OSError:
+            name = "default"
+    return _read_ini(os.path.join(config_dir, "configurations", f"config_{name}"))
+
+
+def gcp_default_project() -> Optional[str]:
+    """Active gcloud project, honouring ``CLOUDSDK_CORE_PROJECT``."""
+    return os.getenv("CLOUDSDK_CORE_PROJECT") or gcloud_active_properties().get("core", "project", fallback=None)
+
+
+def gcp_scope(argv: Optional[List[str]] = None) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Scope a gcloud command runs in: ("gcp", project, region/zone).
+
+    An explicit ``--project`` in the command takes precedence over the active
+    configuration.
+    """
+    properties = gcloud_active_properties()
+    project = (
+        _flag_value(argv or [], "--project")
+        or os.getenv("CLOUDSDK_CORE_PROJECT")
+        or properties.get("core", "project", fallback=None)
+    )
+    location = (
+        os.getenv("CLOUDSDK_COMPUTE_REGION")
+        or properties.get("compute", "region", fallback=None)
+        or properties.get("compute", "zone", fallback=None)
+    )
+    return ("gcp", project, location)
@@ -0,0 +1,83 @@
+import logging
+from typing import Optional
+from strands import tool
+from src.inventory import inventory, PROVIDERS
+from src.tools.output_encoding import check_encoding, encode_document
+from src import config
+
+logger = logging.getLogger(__name__)
+
+LIVE_TOOLS = {"aws": "use_aws", "azure": "use_azure", "gcp": "use_gcp"}
+
+
+@tool
+def inventory_search(
+    query: str,
+    provider: Optional[str] = None,
+    resource_type: Optional[str] = None,
+    region: Optional[str] = None,
+    limit: int = 20,
+    encoding: Optional[str] = None
+) -> str:
+    """
+    Search the local cloud inventory index for resources by name, tag, IP, type or region.
+
+    Answers lookups such as "which VM has IP 10.0.0.4" or "buckets named logs"
+    in milliseconds without calling the cloud CLIs. Stale parts of the index
+    are re-collected live before searching.
+
+    Args:
+        query: Search terms matched as prefixes against names, types, regions, tags, IPs and
+            subscription/project/region ids (e.g. "10.0.0.4", "logs", "env prod")
+        provider: Optional provider filter: "aws", "azure" or "gcp"
+        resource_type: Optional type filter, e.g. "virtualMachines", "compute.instances", "s3:bucket"
+        region: Optional region/location prefix filter, e.g. "eastus", "us-central1", "eu-west-1"
+        limit: Maximum number of results (default 20)
+        encoding: How the results are returned: "auto" (default; a table below the JSON summary
+            when that is shorter), "table", "json" (minified) or "raw" (indented JSON)
+
+    Returns:
+        Matching resources and, if some data could not be refreshed, which sources are
+        stale and should be confirmed with the live cloud tools
+
+    Examples:
+        inventory_search("10.0.0.4")
+        inventory_search("logs", provider="gcp", resource_type="buckets")
+        inventory_search("env prod", provider="azure", region="eastus")
+    """
+    try:
+        if not inventory.enabled:
+            return "Error: Inventory index is disabled; use the live cloud tools instead"
+        error = check_encoding(encoding)
+        if error:
+            return error
+        if provider and provider not in PROVIDERS:
+            return f"Error: Unknown provider '{provider}'. Use one of: {', '.join(PROVIDERS)}"
+        providers = [provider] if provider else list(PROVIDERS)
+        # Keep the index fresh in the background from now on
+        inventory.start()
+
+        # Fall back to live collection for anything missing or too old
+        stale = inventory.stale_sources(providers)
+        if stale:
+            logger.info(f"Refreshing stale inventory sources before searching: {stale}")
+            stale = inventory.refresh_now(stale, timeout=config.INVENTORY_LIVE_REFRESH_TIMEOUT_SECONDS)
+
+        results = inventory.store.search(
+            query, provider=provider, resource_type=resource_type, region=region, limit=max(1, min(limit, 200))
+        )
+        response = {"count": len(results), "results": results}
+        if stale:
+            stale_providers = sorted({source.split(":", 1)[0] for source in stale})
+            response["stale_sources"] = stale
+            response["note"] = (
+                "Inventory data for these sources could not be refreshed and may be out of date; confirm with "
+                + ", ".join(LIVE_TOOLS[name] for name in stale_providers)
+            )
+        elif not results:
+            response["note"] = "No matching resources in the inventory"
+        return encode_document(response, "results", encoding)
+
+    except Exception as e:
+        logger.error(f"Error searching inventory: {str(e)}")
+        return f"Error: {str(e)}"
@@ -0,0 +1,174 @@
+"""Compact encodings of az / gcloud JSON output for the model context.
+
+The CLIs are asked for JSON so their output can be parsed, but pretty-printed
+JSON is mostly indentation and repeated keys, and every character of a tool
+result is paid for again on each later model call of the run. Tool results
+are therefore encoded before they are returned:
+
+- ``json``: minified JSON;
+- ``table``: a list of objects as a tab-separated table. Nested objects are
+  flattened into dotted columns, columns that are empty in every row are
+  dropped, and columns with the same value in every row are stated once above
+  the table. Anything that is not a list of objects falls back to ``json``;
+- ``auto``: whichever of the two is shorter;
+- ``raw``: the CLI's output unchanged.
+
+Output that is not JSON (``--output table``, ``--format value(...)``, errors)
+is always passed through unchanged. Characters before and after encoding are
+counted in ``sky_agent_tool_output_chars_total``.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from src.metrics import TOOL_OUTPUT_CHARS
+from src import config
+
+logger = logging.getLogger(__name__)
+
+ENCODINGS = ("auto", "table", "json", "raw")
+
+# Nested objects deeper than this are kept as JSON in a single cell
+MAX_FLATTEN_DEPTH = 3
+
+
+def check_encoding(encoding: Optional[str]) -> Optional[str]:
+    """Error message if an encoding name is not supported, otherwise None."""
+    if encoding and encoding not in ENCODINGS:
+        return f"Error: Unknown encoding '{encoding}'; use one of {', '.join(ENCODINGS)}"
+    return None
+
+
+def minify(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _flatten(row: Dict[str, Any], prefix: str = "", depth: int = 1) -> Dict[str, Any]:
+    flat: Dict[str, Any] = {}
+    for key, value in row.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and value and depth < MAX_FLATTEN_DEPTH:
+            flat.update(_flatten(value, f"{name}.", depth + 1))
+        else:
+            flat[name] = value
+    return flat
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if not isinstance(value, str):
+        value = str(value) if isinstance(value, (int, float)) else minify(value)
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def encode_table(value: Any) -> Optional[str]:
+    """
+    Encode a list of objects as a tab-separated table.
+
+    Returns:
+        The table, or None if the value is not a list of at least two objects
+    """
+    if not isinstance(value, list) or len(value) < 2 or not all(isinstance(row, dict) for row in value):
+        return None
+    rows = [_flatten(row) for row in value]
+    columns: Dict[str, None] = {}
+    for row in rows:
+        columns.update(dict.fromkeys(row))
+    useful = [column for column in columns if any(not _empty(row.get(column)) for row in rows)]
+    constant = [
+        column for column in useful
+        if all(column in row and row[column] == rows[0][column] for row in rows)
+    ]
+    varying = [column for column in useful if column not in constant]
+
+    header = f"# {len(rows)} rows"
+    if constant:
+        header += "; same in every row: " + ", ".join(f"{column}={_cell(rows[0][column])}" for column in constant)
+    lines = [header]
+    if varying:
+        lines.append("\t".join(varying))
+        lines.extend("\t".join(_cell(row.get(column)) for column in varying) for row in rows)
+    return "\n".join(lines)
+
+
+def encode_value(value: Any, encoding: Optional[str] = None) -> str:
+    """
+    Encode parsed JSON output for a tool result.
+
+    Args:
+        value: The parsed output
+        encoding: "auto", "table", "json" or "raw"; the configured default when omitted
+
+    Returns:
+        The encoded output ("raw" is pretty-printed JSON, as the CLIs print it)
+    """
+    encoding = encoding or config.CLI_OUTPUT_ENCODING
+    if encoding == "raw":
+        return json.dumps(value, indent=2, ensure_ascii=False, default=str)
+    compact = minify(value)
+    if encoding == "json":
+        return compact
+    table = encode_table(value)
+    if table is None or (encoding == "auto" and len(table) >= len(compact)):
+        return compact
+    return table
+
+
+def encode_document(document: Dict[str, Any], table_key: str, encoding: Optional[str] = None) -> str:
+    """
+    Encode an object whose ``table_key`` member lists results, such as a merged cross-scope query.
+
+    With "auto" or "table", the other members are written as minified JSON
+    on the first line and the list as a table below it (for "auto" only if
+    that is shorter than minified JSON).
+    """
+    encoding = encoding or config.CLI_OUTPUT_ENCODING
+    encoded = encode_value(document, encoding)
+    table = encode_table(document.get(table_key)) if encoding in ("auto", "table") else None
+    if table is not None:
+        summary = minify({key: value for key, value in document.items() if key != table_key})
+        tabular = f"{summary}\n{table_key}:\n{table}"
+        if encoding == "table" or len(tabular) < len(encoded):
+            return tabular
+    return encoded
+
+
+def encode_output(output: str, encoding: Optional[str] = None) -> str:
+    """
+    Encode a CLI's JSON output for a tool result, parsing it once.
+
+    Output that is not JSON is returned unchanged.
+
+    Args:
+        output: The CLI's standard output
+        encoding: "auto", "table", "json" or "raw"; the configured default when omitted
+    """
+    encoding = encoding or config.CLI_OUTPUT_ENCODING
+    if encoding == "raw" or not output or output[0] not in "[{":
+        return output
+    try:
+        value = json.loads(output)
+    except ValueError:
+        return output
+    encoded = encode_value(value, encoding)
+    record_savings(encoding, len(output), len(encoded))
+    return encoded
+
+
+def record_savings(encoding: str, original_chars: int, encoded_chars: int):
+    """Count the characters of a tool result before and after encoding."""
+    TOOL_OUTPUT_CHARS.labels(encoding, "original").inc(original_chars)
+    TOOL_OUTPUT_CHARS.labels(encoding, "encoded").inc(encoded_chars)
+    if original_chars:
+        logger.debug(
+            f"Encoded tool output as {encoding}: {original_chars} -> {encoded_chars} characters "
+            f"(~{(original_chars - encoded_chars) // 4} tokens saved)"
+        )
@@ -1,31 +1,31 @@
 import logging
 import subprocess
+from typing import List, Optional
 from strands import tool
+from src.tools.cli_cache import command_cache, is_read_only
+from src.tools.cli_registry import cli_registry
+from src.tools.azure_executor import run_az, run_az_async
+from src.tools.cli_runner import run_on_cli_loop, run_batch, check_batch_size, run_across_scopes, run_shared
+from src.inventory import inventory
+from src.tools.cloud_context import azure_scope, azure_subscriptions
+from src.tools.output_encoding import check_encoding, encode_output
 
 logger = logging.getLogger(__name__)
 
 
-@tool
-def use_azure(command: str) -> str:
+def run_az_shared(cmd_parts: List[str], timeout: float) -> subprocess.CompletedProcess:
+    """``run_az`` for read-only account queries, joining an identical query already in flight."""
+    return run_on_cli_loop(run_shared(azure_scope(cmd_parts), cmd_parts, lambda: run_az_async(cmd_parts, timeout)))
+
+
+async def run_azure_command(command: str) -> str:
     """
-    Execute Azure CLI (az) commands for Azure operations.
+    Execute one Azure CLI command on the CLI loop and return its output or error message.
 
     Args:
         command: Azure command to execute (without 'az' prefix)
-
-    Returns:
-        Command output or error message
-
-    Examples:
-        use_az("vm list")
-        use_az("storage account list")
-        use_az("aks list")
-        use_az("resource list")
     """
     try:
-        # Ensure az CLI is available
-        subprocess.run(["az", "version"], capture_output=True, check=True)
-
         # Prepare the full az command
         cmd_parts = ["az"] + command.strip().split()
 
@@ -33,15 +33,28 @@ def use_azure(command: str) -> str:
         if "--output" not in command and "-o" not in command:
             cmd_parts.extend(["--output", "json"])
 
+        # Serve repeated read-only commands from the cache
+        scope = azure_scope(cmd_parts)
+        cached = command_cache.get(scope, cmd_parts)
+        if cached is not None:
+            logger.info(f"Serving cached result for Azure command: {' '.join(cmd_parts)}")
+            return cached
+
+        # Ensure az CLI is available (detected once at startup, no probe process)
+        missing = cli_registry.require("az")
+        if missing:
+            return missing
+
         logger.info(f"Executing Azure command: {' '.join(cmd_parts)}")
 
-        # Execute the command
-        result = subprocess.run(
+        # Execute the command, sharing it with identical reads already in flight
+        result = await run_shared(scope, cmd_parts, lambda: run_az_async(
             cmd_parts,
-            capture_output=True,
-            text=True,
             timeout=300  # 5 minute timeout
-        )
+        ))
+        command_cache.update(scope, cmd_parts, result.stdout.strip(), result.returncode == 0)
+        if not is_read_only(cmd_parts):
+            inventory.mark_stale("azure", scope[1])
 
         if result.returncode == 0:
             logger.info("Azure command executed successfully")
@@ -61,6 +74,125 @@ def use_azure(command: str) -> str:
         return f"Error: {str(e)}"
 
 
+@tool
+def use_azure(command: str, encoding: Optional[str] = None) -> str:
+    """
+    Execute Azure CLI (az) commands for Azure operations.
+
+    Args:
+        command: Azure command to execute (without 'az' prefix)
+        encoding: How JSON output is returned: "auto" (default; a table for lists of resources when
+            that is shorter, otherwise minified JSON), "table", "json" (minified) or "raw" (as printed)
+
+    Returns:
+        Command output or error message
+
+    Examples:
+        use_az("vm list")
+        use_az("storage account list")
+        use_az("aks list")
+        use_az("resource list")
+        use_az("vm show -g rg -n vm1", encoding="json")
+    """
+    try:
+        error = check_encoding(encoding)
+        if error:
+            return error
+        return encode_output(run_on_cli_loop(run_azure_command(command)), encoding)
+    except Exception as e:
+        logger.error(f"Error executing Azure command: {str(e)}")
+        return f"Error: {str(e)}"
+
+
+@tool
+def use_azure_batch(commands: List[str], encoding: Optional[str] = None) -> str:
+    """
+    Execute several independent Azure CLI commands in parallel.
+
+    Use this instead of repeated use_azure calls when the commands do not
+    depend on each other, e.g. an inventory sweep across resource types.
+
+    Args:
+        commands: Azure commands to execute (each without 'az' prefix)
+        encoding: "raw" for indented JSON; any other value returns minified JSON (the default)
+
+    Returns:
+        JSON object mapping each command to its parsed output or error message
+
+    Examples:
+        use_azure_batch(["vm list", "storage account list", "aks list"])
+    """
+    try:
+        error = check_batch_size(commands) or check_encoding(encoding)
+        if error:
+            return error
+        return run_on_cli_loop(run_batch(commands, run_azure_command, encoding))
+    except Exception as e:
+        logger.error(f"Error executing Azure batch: {str(e)}")
+        return f"Error: {str(e)}"
+
+
+@tool
+def azure_query_all_subscriptions(command: str, subscriptions: Optional[List[str]] = None,
+                                  encoding: Optional[str] = None) -> str:
+    """
+    Run a read-only Azure CLI command against every subscription in parallel.
+
+    Each subscription is queried with its own --subscription flag, so the
+    active subscription is never changed. Prefer this over looping through
+    azure_set_subscription for questions that span subscriptions.
+
+    Args:
+        command: Read-only Azure command to execute (without 'az' prefix or --subscription)
+        subscriptions: Optional subscription ids or names to limit the query to
+        encoding: How the merged results are returned: "auto" (default; the results as a table below
+            the JSON summary when that is shorter), "table", "json" (minified) or "raw" (indented JSON)
+
+    Returns:
+        JSON document with the merged results, each tagged with its subscriptionId,
+        and a per-subscription status including any errors
+
+    Examples:
+        azure_query_all_subscriptions("storage account list")
+        azure_query_all_subscriptions("vm list", ["Production", "Staging"])
+    """
+    try:
+        parts = command.strip().split()
+        error = check_encoding(encoding)
+        if error:
+            return error
+        if "--subscription" in command:
+            return "Error: Do not pass --subscription; it is added for each subscription"
+        if not is_read_only(["az"] + parts):
+            return "Error: Only read-only commands (list/show/get) can be run across subscriptions"
+
+        missing = cli_registry.require("az")
+        if missing:
+            return missing
+
+        scopes = {
+            subscription["id"]: subscription.get("name")
+            for subscription in azure_subscriptions()
+            if subscription.get("state", "Enabled") == "Enabled" and subscription.get("id")
+        }
+        if subscriptions:
+            wanted = {value.lower() for value in subscriptions}
+            scopes = {
+                sub_id: name for sub_id, name in scopes.items()
+                if sub_id.lower() in wanted or (name or "").lower() in wanted
+            }
+        if not scopes:
+            return "Error: No matching Azure subscriptions found. Run 'az login' or check azure_list_subscriptions"
+
+        logger.info(f"Running Azure command across {len(scopes)} subscriptions: {command}")
+        return run_on_cli_loop(
+            run_across_scopes(command, scopes, run_azure_command, "--subscription", "subscriptionId", encoding)
+        )
+    except Exception as e:
+        logger.error(f"Error running Azure command across subscriptions: {str(e)}")
+        return f"Error: {str(e)}"
+
+
 @tool
 def azure_auth_status() -> str:
     """
@@ -70,15 +202,13 @@ def azure_auth_status() -> str:
         Current authentication status and active account info
     """
     try:
-        result = subprocess.run(
+        result = run_az_shared(
             ["az", "account", "show", "--output", "json"],
-            capture_output=True,
-            text=True,
             timeout=30
         )
 
         if result.returncode == 0:
-            return f"Authentication Status:\n{result.stdout.strip()}"
+            return f"Authentication Status:\n{encode_output(result.stdout.strip())}"
         else:
             return f"Error checking auth status: {result.stderr.strip()}"
 
@@ -98,12 +228,11 @@ def azure_set_subscription(subscription_id: str) -> str:
         Success or error message
     """
     try:
-        result = subprocess.run(
+        result = run_az(
             ["az", "account", "set", "--subscription", subscription_id],
-            capture_output=True,
-            text=True,
             timeout=30
         )
+        command_cache.invalidate("azure", ["account"])
 
         if result.returncode == 0:
             return f"Successfully set subscription to: {subscription_id}"
@@ -124,15 +253,13 @@ def azure_subscription_info() -> str:
     """
     try:
         # Get current subscription
-        result = subprocess.run(
+        result = run_az_shared(
             ["az", "account", "show", "--output", "json"],
-            capture_output=True,
-            text=True,
             timeout=30
         )
 
         if result.returncode == 0:
-            return f"Current Subscription Details:\n{result.stdout.strip()}"
+            return f"Current Subscription Details:\n{encode_output(result.stdout.strip())}"
         else:
             return f"Error getting subscription info: {result.stderr.strip()}"
 
@@ -149,15 +276,13 @@ def azure_list_subscriptions() -> str:
         List of available subscriptions
     """
     try:
-        result = subprocess.run(
+        result = run_az_shared(
             ["az", "account", "list", "--output", "json"],
-            capture_output=True,
-            text=True,
             timeout=30
         )
 
         if result.returncode == 0:
-            return f"Available Subscriptions:\n{result.stdout.strip()}"
+            return f"Available Subscriptions:\n{encode_output(result.stdout.strip())}"
         else:
             return f"Error listing subscriptions: {result.stderr.strip()}"
 
@@ -177,12 +302,11 @@ def azure_set_location(location: str) -> str:
         Success or error message
     """
     try:
-        result = subprocess.run(
+        result = run_az(
             ["az", "config", "set", f"defaults.location={location}"],
-            capture_output=True,
-            text=True,
             timeout=30
         )
+        command_cache.invalidate("azure", ["config"])
 
         if result.returncode == 0:
             return f"Successfully set default location to: {location}"
@@ -1,30 +1,31 @@
 import logging
 import subprocess
+import json
+from typing import List, Optional
 from strands import tool
+from src.tools.cli_cache import command_cache, is_read_only
+from src.tools.cli_registry import cli_registry
+from src.inventory import inventory
+from src.tools.cloud_context import gcp_scope
+from src.tools.output_encoding import check_encoding, encode_output
+from src.tools.cli_runner import run_command, run_command_async, run_on_cli_loop, run_batch, check_batch_size, run_across_scopes, run_shared
 
 logger = logging.getLogger(__name__)
 
 
-@tool
-def use_gcp(command: str) -> str:
+def run_gcloud_shared(cmd_parts: List[str], timeout: float) -> subprocess.CompletedProcess:
+    """``run_command`` for read-only gcloud queries, joining an identical query already in flight."""
+    return run_on_cli_loop(run_shared(gcp_scope(cmd_parts), cmd_parts, lambda: run_command_async(cmd_parts, timeout)))
+
+
+async def run_gcp_command(command: str) -> str:
     """
-    Execute Google Cloud CLI (gcloud) commands for GCP operations.
+    Execute one gcloud command on the CLI loop and return its output or error message.
 
     Args:
         command: GCP command to execute (without 'gcloud' prefix)
-
-    Returns:
-        Command output or error message
-
-    Examples:
-        use_gcp("compute instances list")
-        use_gcp("storage buckets list")
-        use_gcp("container clusters list")
     """
     try:
-        # Ensure gcloud is available
-        subprocess.run(["gcloud", "version"], capture_output=True, check=True)
-
         # Prepare the full gcloud command
         cmd_parts = ["gcloud"] + command.strip().split()
 
@@ -34,15 +35,28 @@ def use_gcp(command: str) -> str:
         if "--quiet" not in command and "-q" not in command:
             cmd_parts.append("--quiet")
 
+        # Serve repeated read-only commands from the cache
+        scope = gcp_scope(cmd_parts)
+        cached = command_cache.get(scope, cmd_parts)
+        if cached is not None:
+            logger.info(f"Serving cached result for GCP command: {' '.join(cmd_parts)}")
+            return cached
+
+        # Ensure gcloud is available (detected once at startup, no probe process)
+        missing = cli_registry.require("gcloud")
+        if missing:
+            return missing
+
         logger.info(f"Executing GCP command: {' '.join(cmd_parts)}")
 
-        # Execute the command
-        result = subprocess.run(
+        # Execute the command, sharing it with identical reads already in flight
+        result = await run_shared(scope, cmd_parts, lambda: run_command_async(
             cmd_parts,
-            capture_output=True,
-            text=True,
             timeout=300  # 5 minute timeout
-        )
+        ))
+        command_cache.update(scope, cmd_parts, result.stdout.strip(), result.returncode == 0)
+        if not is_read_only(cmd_parts):
+            inventory.mark_stale("gcp", scope[1])
 
         if result.returncode == 0:
             logger.info("GCP command executed successfully")
@@ -62,6 +76,124 @@ def use_gcp(command: str) -> str:
         return f"Error: {str(e)}"
 
 
+@tool
+def use_gcp(command: str, encoding: Optional[str] = None) -> str:
+    """
+    Execute Google Cloud CLI (gcloud) commands for GCP operations.
+
+    Args:
+        command: GCP command to execute (without 'gcloud' prefix)
+        encoding: How JSON output is returned: "auto" (default; a table for lists of resources when
+            that is shorter, otherwise minified JSON), "table", "json" (minified) or "raw" (as printed)
+
+    Returns:
+        Command output or error message
+
+    Examples:
+        use_gcp("compute instances list")
+        use_gcp("storage buckets list")
+        use_gcp("container clusters list")
+        use_gcp("compute instances describe my-vm --zone us-central1-a", encoding="json")
+    """
+    try:
+        error = check_encoding(encoding)
+        if error:
+            return error
+        return encode_output(run_on_cli_loop(run_gcp_command(command)), encoding)
+    except Exception as e:
+        logger.error(f"Error executing GCP command: {str(e)}")
+        return f"Error: {str(e)}"
+
+
+@tool
+def use_gcp_batch(commands: List[str], encoding: Optional[str] = None) -> str:
+    """
+    Execute several independent gcloud commands in parallel.
+
+    Use this instead of repeated use_gcp calls when the commands do not
+    depend on each other, e.g. describing several instances at once.
+
+    Args:
+        commands: GCP commands to execute (each without 'gcloud' prefix)
+        encoding: "raw" for indented JSON; any other value returns minified JSON (the default)
+
+    Returns:
+        JSON object mapping each command to its parsed output or error message
+
+    Examples:
+        use_gcp_batch(["compute instances list", "storage buckets list", "container clusters list"])
+    """
+    try:
+        error = check_batch_size(commands) or check_encoding(encoding)
+        if error:
+            return error
+        return run_on_cli_loop(run_batch(commands, run_gcp_command, encoding))
+    except Exception as e:
+        logger.error(f"Error executing GCP batch: {str(e)}")
+        return f"Error: {str(e)}"
+
+
+async def query_all_projects(command: str, projects: Optional[List[str]], encoding: Optional[str] = None) -> str:
+    listing = await run_gcp_command("projects list --filter=lifecycleState:ACTIVE")
+    if listing.startswith("Error:"):
+        return listing
+    scopes = {project["projectId"]: project.get("name") for project in json.loads(listing or "[]")}
+    if projects:
+        wanted = {value.lower() for value in projects}
+        scopes = {
+            project_id: name for project_id, name in scopes.items()
+            if project_id.lower() in wanted or (name or "").lower() in wanted
+        }
+    if not scopes:
+        return "Error: No matching GCP projects found. Run 'gcloud auth login' or check the project list"
+
+    logger.info(f"Running GCP command across {len(scopes)} projects: {command}")
+    return await run_across_scopes(command, scopes, run_gcp_command, "--project", "projectId", encoding)
+
+
+@tool
+def gcp_query_all_projects(command: str, projects: Optional[List[str]] = None, encoding: Optional[str] = None) -> str:
+    """
+    Run a read-only gcloud command against every active project in parallel.
+
+    Each project is queried with its own --project flag, so the active
+    project is never changed. Prefer this over looping through
+    gcp_set_project for questions that span projects.
+
+    Args:
+        command: Read-only GCP command to execute (without 'gcloud' prefix or --project)
+        projects: Optional project ids or names to limit the query to
+        encoding: How the merged results are returned: "auto" (default; the results as a table below
+            the JSON summary when that is shorter), "table", "json" (minified) or "raw" (indented JSON)
+
+    Returns:
+        JSON document with the merged results, each tagged with its projectId,
+        and a per-project status including any errors
+
+    Examples:
+        gcp_query_all_projects("storage buckets list")
+        gcp_query_all_projects("compute instances list", ["prod-project", "staging-project"])
+    """
+    try:
+        parts = command.strip().split()
+        error = check_encoding(encoding)
+        if error:
+            return error
+        if "--project" in command:
+            return "Error: Do not pass --project; it is added for each project"
+        if not is_read_only(["gcloud"] + parts):
+            return "Error: Only read-only commands (list/describe/get) can be run across projects"
+
+        missing = cli_registry.require("gcloud")
+        if missing:
+            return missing
+
+        return run_on_cli_loop(query_all_projects(command, projects, encoding))
+    except Exception as e:
+        logger.error(f"Error running GCP command across projects: {str(e)}")
+        return f"Error: {str(e)}"
+
+
 @tool
 def gcp_auth_status() -> str:
     """
@@ -71,15 +203,13 @@ def gcp_auth_status() -> str:
         Current authentication status and active account info
     """
     try:
-        result = subprocess.run(
+        result = run_gcloud_shared(
             ["gcloud", "auth", "list", "--format", "json"],
-            capture_output=True,
-            text=True,
             timeout=30
         )
 
         if result.returncode == 0:
-            return f"Authentication Status:\n{result.stdout.strip()}"
+            return f"Authentication Status:\n{encode_output(result.stdout.strip())}"
         else:
             return f"Error checking auth status: {result.stderr.strip()}"
 
@@ -99,12 +229,11 @@ def gcp_set_project(project_id: str) -> str:
         Success or error message
     """
     try:
-        result = subprocess.run(
+        result = run_command(
             ["gcloud", "config", "set", "project", project_id],
-            capture_output=True,
-            text=True,
             timeout=30
         )
+        command_cache.invalidate("gcp", ["config"])
 
         if result.returncode == 0:
             return f"Successfully set project to: {project_id}"
@@ -127,25 +256,21 @@ def gcp_project_info() -> str:
     """
     try:
         # Get current project
-        project_result = subprocess.run(
+        project_result = run_gcloud_shared(
             ["gcloud", "config", "get-value", "project"],
-            capture_output=True,
-            text=True,
             timeout=30
         )
 
         # Get project details
         if project_result.returncode == 0:
             project_id = project_result.stdout.strip()
-            details_result = subprocess.run(
+            details_result = run_gcloud_shared(
                 ["gcloud", "projects", "describe", project_id, "--format", "json"],
-                capture_output=True,
-                text=True,
                 timeout=30
             )
 
             if details_result.returncode == 0:
-                return f"Current Project Details:\n{details_result.stdout.strip()}"
+                return f"Current Project Details:\n{encode_output(details_result.stdout.strip())}"
             else:
                 return f"Current Project: {project_id}\nError getting details: {details_result.stderr.strip()}"
         else:
@@ -0,0 +1,99 @@
+import pytest
+
+from src.tools.cli_cache import CommandCache, is_cacheable, is_read_only, is_sensitive, split_command
+
+AZURE = ("azure", "sub-1", None)
+GCP = ("gcp", "project-1", None)
+
+
+@pytest.mark.parametrize("argv, group, verb", [
+    ("az vm list -g rg", ["vm"], "list"),
+    ("az network vnet subnet show -g rg --vnet-name v -n s", ["network", "vnet", "subnet"], "show"),
+    ("gcloud compute instances describe my-vm --zone us-central1-a", ["compute", "instances"], "describe"),
+    ("gcloud compute instances delete list", ["compute", "instances"], "delete"),
+    ("az account get-access-token", ["account"], "get-access-token"),
+    ("az", [], None),
+])
+def test_split_command(argv, group, verb):
+    assert split_command(argv.split()) == (group, verb)
+
+
+@pytest.mark.parametrize("argv, read_only", [
+    ("az vm list", True),
+    ("az webapp config appsettings list-slots", True),
+    ("gcloud config get-value project", True),
+    ("az vm start -n vm -g rg", False),
+    ("az aks get-credentials -n c -g rg", False),
+    ("gcloud auth print-access-token", False),
+])
+def test_is_read_only(argv, read_only):
+    assert is_read_only(argv.split()) is read_only
+
+
+@pytest.mark.parametrize("argv", [
+    "az keyvault secret show --vault-name v -n s",
+    "az storage account keys list -n acct",
+    "az storage account show-connection-string -n acct",
+    "az redis list-keys -n r -g rg",
+    "az acr credential show -n registry",
+    "gcloud secrets versions access latest --secret s",
+    "gcloud iam service-accounts keys list --iam-account sa@p.iam.gserviceaccount.com",
+])
+def test_secret_reads_are_never_cacheable(argv):
+    assert is_sensitive(argv.split())
+    assert not is_cacheable(argv.split())
+
+
+@pytest.mark.parametrize("argv", ["az keyvault list", "az vm show -n token-vm -g rg", "gcloud compute instances list"])
+def test_ordinary_reads_are_cacheable(argv):
+    assert is_cacheable(argv.split())
+
+
+def test_stores_successful_reads_only():
+    cache = CommandCache(max_entries=10, max_bytes=1024)
+    cache.update(AZURE, ["az", "vm", "list"], "[1]", succeeded=True)
+    cache.update(AZURE, ["az", "disk", "list"], "error", succeeded=False)
+    assert cache.get(AZURE, ["az", "vm", "list"]) == "[1]"
+    assert cache.get(AZURE, ["az", "disk", "list"]) is None
+    assert cache.get(("azure", "sub-2", None), ["az", "vm", "list"]) is None
+
+
+def test_never_stores_secret_reads():
+    cache = CommandCache(max_entries=10, max_bytes=1024)
+    argv = "az keyvault secret show --vault-name v -n s".split()
+    cache.update(AZURE, argv, '{"value": "hunter2"}', succeeded=True)
+    assert cache.get(AZURE, argv) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_mutation_invalidates_its_group_and_aggregate_listings():
+    cache = CommandCache(max_entries=10, max_bytes=1024)
+    for argv in (["az", "vm", "list"], ["az", "resource", "list"], ["az", "storage", "account", "list"]):
+        cache.update(AZURE, argv, "[]", succeeded=True)
+    cache.update(GCP, ["gcloud", "compute", "instances", "list"], "[]", succeeded=True)
+
+    cache.update(AZURE, ["az", "vm", "start", "-n", "vm"], "", succeeded=False)
+
+    assert cache.get(AZURE, ["az", "vm", "list"]) is None
+    assert cache.get(AZURE, ["az", "resource", "list"]) is None
+    assert cache.get(AZURE, ["az", "storage", "account", "list"]) == "[]"
+    assert cache.get(GCP, ["gcloud", "compute", "instances", "list"]) == "[]"
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_evicts_least_recently_used_beyond_limits():
+    cache = CommandCache(max_entries=2, max_bytes=1024)
+    cache.update(AZURE, ["az", "vm", "list"], "a", succeeded=True)
+    cache.update(AZURE, ["az", "disk", "list"], "b", succeeded=True)
+    cache.get(AZURE, ["az", "vm", "list"])
+    cache.update(AZURE, ["az", "group", "list"], "c", succeeded=True)
+    assert cache.get(AZURE, ["az", "disk", "list"]) is None
+    assert cache.get(AZURE, ["az", "vm", "list"]) == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    cache = CommandCache(max_entries=10, max_bytes=1024)
+    cache.update(AZURE, ["az", "vm", "list"], "[]", succeeded=True)
+    monkeypatch.setattr("src.tools.cli_cache.time.monotonic", lambda: float("inf"))
+    assert cache.get(AZURE, ["az", "vm", "list"]) is None
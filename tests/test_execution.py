@@ -0,0 +1,45 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.execution import EngineSaturatedError, EngineUnavailableError, ExecutionEngine
+
+
+def test_admission_rejects_beyond_running_and_queued_capacity():
+    async def main():
+        engine = ExecutionEngine({}, max_concurrency=1, max_queue_depth=1)
+        gate = threading.Event()
+        running = asyncio.ensure_future(engine.submit(gate.wait))
+        queued = asyncio.ensure_future(engine.submit(time.sleep, 0))
+        await asyncio.sleep(0.05)
+        with pytest.raises(EngineSaturatedError):
+            await engine.submit(time.sleep, 0)
+        gate.set()
+        await asyncio.gather(running, queued)
+        assert engine.stats()["running"] == 0 and engine.stats()["queued"] == 0
+        engine.shutdown()
+
+    asyncio.run(main())
+
+
+def test_shutdown_settles_queued_runs_it_drops():
+    async def main():
+        engine = ExecutionEngine({}, max_concurrency=1, max_queue_depth=2)
+        gate = threading.Event()
+        running = asyncio.ensure_future(engine.submit(gate.wait))
+        queued = asyncio.ensure_future(engine.submit(time.sleep, 0))
+        await asyncio.sleep(0.05)
+        assert engine.stats()["queued"] == 1
+
+        engine.shutdown()
+        gate.set()
+        await running
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert engine.stats()["running"] == 0 and engine.stats()["queued"] == 0
+        with pytest.raises(EngineUnavailableError):
+            await engine.submit(time.sleep, 0)
+
+    asyncio.run(main())
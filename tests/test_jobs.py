@@ -0,0 +1,176 @@
+import asyncio
+import json
+
+import pytest
+
+from src.cancellation import Cancellation
+from src.jobs import CANCELLED, COMPLETED, DONE_EVENT, FAILED, QUEUED, RUNNING, JobManager, JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.db"))
+
+
+def test_events_are_numbered_per_job_and_end_with_done(store):
+    job = store.create("list vms")
+    other = store.create("list buckets")
+    assert job["status"] == QUEUED
+
+    store.start(job["id"])
+    store.add_events(job["id"], [("node_start", {"node": "azure_agent"}), ("text", {"node": "azure_agent", "text": "hi"})])
+    store.add_events(other["id"], [("node_start", {"node": "gcp_agent"})])
+    store.add_events(job["id"], [])
+    store.finish(job["id"], COMPLETED, {"text": "done"}, usage={"total_tokens": 5})
+
+    events = store.events(job["id"])
+    assert [(event["seq"], event["type"]) for event in events] == [(1, "node_start"), (2, "text"), (3, DONE_EVENT)]
+    assert events[-1]["data"] == {"status": COMPLETED, "error": None}
+    assert [event["seq"] for event in store.events(other["id"])] == [1]
+    finished = store.get(job["id"])
+    assert finished["status"] == COMPLETED
+    assert finished["result"] == {"text": "done"} and finished["usage"] == {"total_tokens": 5}
+
+
+def test_events_resume_after_a_sequence_number(store):
+    job_id = store.create("list vms")["id"]
+    store.add_events(job_id, [("text", {"text": str(i)}) for i in range(5)])
+    assert [event["seq"] for event in store.events(job_id, after=3)] == [4, 5]
+    assert [event["seq"] for event in store.events(job_id, after=1, limit=2)] == [2, 3]
+
+
+def test_interrupt_unfinished_fails_queued_and_running_jobs(store):
+    queued = store.create("a")["id"]
+    running = store.create("b")["id"]
+    done = store.create("c")["id"]
+    store.start(running)
+    store.finish(done, COMPLETED)
+
+    assert store.interrupt_unfinished("restarted") == 2
+    assert store.get(queued)["status"] == FAILED
+    assert store.events(running)[-1]["data"] == {"status": FAILED, "error": "restarted"}
+    assert store.get(done)["status"] == COMPLETED
+    assert store.counts() == {FAILED: 2, COMPLETED: 1}
+
+
+def test_prune_removes_finished_jobs_with_their_events(store):
+    old = store.create("a")["id"]
+    live = store.create("b")["id"]
+    store.finish(old, COMPLETED)
+    assert store.prune(older_than=float("inf")) == 1
+    assert store.get(old) is None and store.events(old) == []
+    assert store.get(live)["status"] == QUEUED
+
+
+class FakeEngine:
+    """Streams scripted swarm events, then optionally keeps the run going until it is cancelled."""
+
+    def __init__(self, events, finish=True):
+        self.events = events
+        self.finish = finish
+
+    def stream(self, prompt, usage, cancellation):
+        async def events():
+            for event in self.events:
+                yield event
+            while not self.finish and not cancellation.cancelled:
+                await asyncio.sleep(0.01)
+        return events()
+
+
+def manager(tmp_path, engine, flush_interval=60.0):
+    return JobManager(str(tmp_path / "jobs.db"), engine, render=lambda result: {"text": result},
+                      retention=3600, flush_interval=flush_interval, keepalive_interval=15)
+
+
+def stream_event(node, text):
+    return {"type": "multiagent_node_stream", "node_id": node, "event": {"data": text}}
+
+
+def test_completed_job_records_progress_and_result(tmp_path):
+    engine = FakeEngine([
+        {"type": "multiagent_node_start", "node_id": "azure_agent"},
+        stream_event("azure_agent", "vm-1, "),
+        stream_event("azure_agent", "vm-2"),
+        {"type": "multiagent_node_stop", "node_id": "azure_agent"},
+        {"type": "multiagent_result", "result": "vm-1, vm-2"},
+    ])
+
+    async def main():
+        jobs = manager(tmp_path, engine)
+        job = await jobs.submit("list vms")
+        await asyncio.gather(*jobs._tasks.values())
+        return jobs, job["id"]
+
+    jobs, job_id = asyncio.run(main())
+    job = jobs.store.get(job_id)
+    assert job["status"] == COMPLETED and job["result"] == {"text": "vm-1, vm-2"}
+    events = jobs.store.events(job_id)
+    assert [event["type"] for event in events] == ["node_start", "text", "node_stop", DONE_EVENT]
+    assert events[1]["data"] == {"node": "azure_agent", "text": "vm-1, vm-2"}
+
+
+def test_follow_resumes_after_last_event_id(tmp_path):
+    async def main():
+        jobs = manager(tmp_path, FakeEngine([]))
+        job_id = jobs.store.create("list vms")["id"]
+        jobs.store.add_events(job_id, [("text", {"text": "a"}), ("text", {"text": "b"})])
+        jobs.store.finish(job_id, COMPLETED)
+        return [chunk async for chunk in jobs.follow(job_id, after=1)]
+
+    chunks = asyncio.run(main())
+    assert [chunk.split("\n")[:2] for chunk in chunks] == [["id: 2", "event: text"], ["id: 3", f"event: {DONE_EVENT}"]]
+    assert json.loads(chunks[0].split("data: ", 1)[1])["text"] == "b"
+
+
+def test_cancelled_job_keeps_its_partial_output(tmp_path):
+    async def main():
+        jobs = manager(tmp_path, FakeEngine([stream_event("azure_agent", "partial")], finish=False), flush_interval=0)
+        job_id = (await jobs.submit("list vms"))["id"]
+        await asyncio.sleep(0.05)
+        assert jobs.cancel(job_id)
+        await asyncio.gather(*jobs._tasks.values())
+        assert not jobs.cancel(job_id)
+        return jobs, job_id
+
+    jobs, job_id = asyncio.run(main())
+    assert jobs.store.get(job_id)["status"] == CANCELLED
+    events = jobs.store.events(job_id)
+    assert events[0]["data"] == {"node": "azure_agent", "text": "partial"}
+    assert events[-1]["data"]["status"] == CANCELLED
+
+
+def test_shutdown_records_running_jobs_as_failed(tmp_path):
+    async def main():
+        jobs = manager(tmp_path, FakeEngine([{"type": "multiagent_node_start", "node_id": "azure_agent"}], finish=False))
+        job_id = (await jobs.submit("list vms"))["id"]
+        await asyncio.sleep(0.05)
+        assert jobs.store.get(job_id)["status"] == RUNNING
+        await jobs.stop()
+        return jobs, job_id
+
+    jobs, job_id = asyncio.run(main())
+    assert jobs.store.get(job_id)["status"] == FAILED
+    assert jobs.store.events(job_id)[-1]["type"] == DONE_EVENT
+    assert not jobs._tasks
+
+
+def test_failed_job_creation_cancels_the_dispatched_run(tmp_path, monkeypatch):
+    cancellations = []
+
+    class RecordingEngine(FakeEngine):
+        def stream(self, prompt, usage, cancellation: Cancellation):
+            cancellations.append(cancellation)
+            return super().stream(prompt, usage, cancellation)
+
+    def create(prompt):
+        raise OSError("disk full")
+
+    async def main():
+        jobs = manager(tmp_path, RecordingEngine([]))
+        monkeypatch.setattr(jobs.store, "create", create)
+        with pytest.raises(OSError):
+            await jobs.submit("list vms")
+
+    asyncio.run(main())
+    assert cancellations[0].cancelled
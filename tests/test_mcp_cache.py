@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from src.mcp_cache import McpResultCache, canonical_arguments, resource_tags
+
+
+@pytest.fixture
+def cache():
+    return McpResultCache(max_entries=100, max_bytes=1 << 20)
+
+
+def call(cache, tool, arguments, server="atlassian", status="success", delay=0.0):
+    """Call a tool through the cache; returns the result and how many times the tool really ran."""
+    calls = []
+
+    async def execute():
+        calls.append(tool)
+        await asyncio.sleep(delay)
+        return {"toolUseId": "original", "status": status, "content": [{"text": f"{tool} {len(calls)}"}]}
+
+    result = asyncio.run(cache.call(server, tool, arguments, "tool-use-1", execute))
+    return result, len(calls)
+
+
+def test_canonical_arguments_ignore_key_order():
+    assert canonical_arguments({"b": 1, "a": [2]}) == canonical_arguments({"a": [2], "b": 1}) == '{"a":[2],"b":1}'
+    assert canonical_arguments(None) == "{}"
+
+
+def test_resource_tags():
+    assert resource_tags({"issue_key": "ops-12"}) == {"issue:OPS-12", "project:OPS"}
+    assert resource_tags({"project_key": "ops", "space_key": "eng", "page_id": 7}) == {"project:OPS", "space:ENG", "page:7"}
+    assert resource_tags({"owner": "Acme", "repo": "Sky"}) == {"repo:acme/sky"}
+    assert resource_tags({"jql": "project = OPS"}) == frozenset()
+
+
+def test_ttl_uses_exact_names_and_globs(cache):
+    assert cache.ttl("atlassian", "jira_get_issue") == 60
+    assert cache.ttl("github", "list_branches") == 30
+    assert cache.ttl("github", "create_issue") is None
+    cache.configure("github", {})
+    assert cache.ttl("github", "list_branches") is None
+
+
+def test_reads_are_cached_with_the_callers_tool_use_id(cache):
+    _, executed = call(cache, "jira_get_issue", {"issue_key": "OPS-1"})
+    result, executed_again = call(cache, "jira_get_issue", {"issue_key": "OPS-1"})
+    assert (executed, executed_again) == (1, 0)
+    assert result["toolUseId"] == "tool-use-1"
+    assert cache.stats()["hits"] == 1
+
+
+def test_failed_reads_are_not_cached(cache):
+    call(cache, "jira_get_issue", {"issue_key": "OPS-1"}, status="error")
+    _, executed = call(cache, "jira_get_issue", {"issue_key": "OPS-1"})
+    assert executed == 1
+
+
+def test_write_drops_entries_for_the_same_resource_and_untagged_searches(cache):
+    call(cache, "jira_get_issue", {"issue_key": "OPS-1"})
+    call(cache, "jira_get_issue", {"issue_key": "OPS-2"})
+    call(cache, "jira_get_issue", {"issue_key": "DEV-1"})
+    call(cache, "jira_search", {"jql": "assignee = me"})
+    call(cache, "get_issue", {"owner": "acme", "repo": "sky", "issue_number": 1}, server="github")
+
+    call(cache, "jira_update_issue", {"issue_key": "OPS-1", "fields": {}})
+
+    assert call(cache, "jira_get_issue", {"issue_key": "OPS-1"})[1] == 1
+    assert call(cache, "jira_search", {"jql": "assignee = me"})[1] == 1
+    assert call(cache, "jira_get_issue", {"issue_key": "DEV-1"})[1] == 0
+    assert call(cache, "get_issue", {"owner": "acme", "repo": "sky", "issue_number": 1}, server="github")[1] == 0
+
+
+def test_write_to_a_project_drops_its_issues(cache):
+    call(cache, "jira_get_issue", {"issue_key": "OPS-2"})
+    call(cache, "jira_create_issue", {"project_key": "OPS", "summary": "new"})
+    assert call(cache, "jira_get_issue", {"issue_key": "OPS-2"})[1] == 1
+
+
+def test_untargeted_write_drops_the_whole_server(cache):
+    call(cache, "jira_get_issue", {"issue_key": "DEV-1"})
+    call(cache, "jira_batch_create_issues", {"issues": "[]"})
+    assert call(cache, "jira_get_issue", {"issue_key": "DEV-1"})[1] == 1
+
+
+def test_read_racing_with_a_write_is_not_stored(cache):
+    async def main():
+        release = asyncio.Event()
+
+        async def slow_read():
+            await release.wait()
+            return {"status": "success", "content": [{"text": "before the write"}]}
+
+        async def write():
+            return {"status": "success", "content": []}
+
+        read = asyncio.ensure_future(cache.call("atlassian", "jira_get_issue", {"issue_key": "OPS-1"}, "a", slow_read))
+        await asyncio.sleep(0.01)
+        await cache.call("atlassian", "jira_update_issue", {"issue_key": "OPS-1"}, "b", write)
+        release.set()
+        await read
+
+    asyncio.run(main())
+    assert cache.stats()["entries"] == 0
+
+
+def test_identical_concurrent_reads_share_one_call():
+    cache = McpResultCache(max_entries=100, max_bytes=1 << 20, enabled=False)
+    calls = 0
+
+    async def execute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"toolUseId": "first", "status": "success", "content": []}
+
+    async def main():
+        return await asyncio.gather(*(
+            cache.call("atlassian", "jira_search", {"jql": "x"}, f"use-{i}", execute) for i in range(3)
+        ))
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert [result["toolUseId"] for result in results] == ["use-0", "use-1", "use-2"]
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from src.tools.output_encoding import check_encoding, encode_document, encode_output, encode_table, encode_value
+
+VMS = [
+    {"name": "vm-1", "location": "eastus", "tags": {}, "hardware": {"size": "B2s"}, "note": None},
+    {"name": "vm-2", "location": "eastus", "tags": {}, "hardware": {"size": "D4s"}, "note": None},
+]
+
+
+def test_table_flattens_nested_objects_and_states_constant_columns_once():
+    assert encode_table(VMS) == (
+        "# 2 rows; same in every row: location=eastus\n"
+        "name\thardware.size\n"
+        "vm-1\tB2s\n"
+        "vm-2\tD4s"
+    )
+
+
+def test_table_escapes_separators_in_cells():
+    table = encode_table([{"name": "a\tb", "text": "line\nbreak"}, {"name": "c", "text": "back\\slash"}])
+    assert table.splitlines()[2:] == ["a\\tb\tline\\nbreak", "c\tback\\\\slash"]
+
+
+def test_table_keeps_deep_and_list_values_as_json():
+    rows = [{"a": {"b": {"c": {"d": 1}}}, "ips": ["10.0.0.4"]}, {"a": {"b": {"c": {"d": 2}}}, "ips": []}]
+    assert encode_table(rows).splitlines()[1:] == ["a.b.c\tips", '{"d":1}\t["10.0.0.4"]', '{"d":2}\t[]']
+
+
+@pytest.mark.parametrize("value", [[], [{"name": "only"}], [{"a": 1}, "text"], {"a": 1}, "text"])
+def test_table_needs_a_list_of_at_least_two_objects(value):
+    assert encode_table(value) is None
+
+
+def test_auto_picks_the_shorter_encoding():
+    assert encode_value(VMS, "auto") == encode_table(VMS)
+    sparse = [{"a": 1}, {"b": 2}]
+    assert encode_value(sparse, "auto") == '[{"a":1},{"b":2}]'
+
+
+def test_json_and_raw_encodings():
+    assert encode_value({"a": [1, 2]}, "json") == '{"a":[1,2]}'
+    assert encode_value({"a": 1}, "raw") == '{\n  "a": 1\n}'
+
+
+@pytest.mark.parametrize("output", ["", "Name    Location\nvm-1    eastus", "{not json", "ERROR: denied"])
+def test_non_json_output_is_passed_through(output):
+    assert encode_output(output, "auto") == output
+
+
+def test_encode_output_round_trips_json():
+    output = json.dumps(VMS, indent=2)
+    assert encode_output(output, "json") == json.dumps(VMS, separators=(",", ":"))
+    assert encode_output(output, "raw") == output
+
+
+def test_document_puts_the_summary_above_its_table():
+    document = {"command": "vm list", "failed": 0, "results": VMS}
+    encoded = encode_document(document, "results", "table")
+    assert encoded.splitlines()[:2] == ['{"command":"vm list","failed":0}', "results:"]
+    assert encoded.endswith(encode_table(VMS))
+
+
+def test_check_encoding():
+    assert check_encoding(None) is None
+    assert check_encoding("table") is None
+    assert check_encoding("yaml").startswith("Error: Unknown encoding 'yaml'")
@@ -0,0 +1,64 @@
+import pytest
+
+from src.agents import COORDINATOR
+from src.router import Router
+
+
+@pytest.fixture
+def router():
+    return Router(enabled=True, min_confidence=0.6)
+
+
+@pytest.mark.parametrize("prompt, agent", [
+    ("list the VMs in resource group prod-rg", "azure_agent"),
+    ("show me all GKE clusters in europe-west1", "gcp_agent"),
+    ("which EC2 instances are running in us-east-1?", "aws_agent"),
+    ("summarize the open bugs in jira", "atlassian_agent"),
+    ("what is the status of OPS-1234?", "atlassian_agent"),
+    ("open a pull request that refactors the retry logic", "coding_agent"),
+])
+def test_single_provider_prompts_start_at_the_specialist(router, prompt, agent):
+    decision = router.classify(prompt)
+    assert decision.agent == agent
+    assert decision.fast_path
+
+
+def test_cross_cloud_prompts_go_to_the_coordinator_with_their_providers(router):
+    decision = router.classify("compare the AKS clusters in azure with the GKE clusters in gcp")
+    assert decision.agent == COORDINATOR
+    assert decision.providers == ["azure_agent", "gcp_agent"]
+    assert decision.reason.startswith("cross-cloud")
+
+
+@pytest.mark.parametrize("prompt", ["hello there", "list my projects", "close the ticket"])
+def test_unrecognised_or_weak_prompts_go_to_the_coordinator(router, prompt):
+    assert router.classify(prompt).agent == COORDINATOR
+
+
+@pytest.mark.parametrize("prompt, agent", [
+    ("is the azure vnet range RFC-1918 compliant?", "azure_agent"),
+    ("verify the SHA-256 digest of the image in gcp artifact registry", "gcp_agent"),
+])
+def test_standards_and_hashes_are_not_issue_keys(router, prompt, agent):
+    decision = router.classify(prompt)
+    assert decision.agent == agent
+    assert "atlassian_agent" not in decision.scores
+
+
+def test_region_names_are_not_issue_keys(router):
+    assert "atlassian_agent" not in router.classify("list buckets in us-central1").scores
+
+
+def test_disabled_router_starts_at_the_coordinator_but_keeps_providers():
+    router = Router(enabled=False, min_confidence=0.6)
+    decision = router.route("compare the AKS clusters in azure with the GKE clusters in gcp")
+    assert decision.agent == COORDINATOR
+    assert decision.providers == ["azure_agent", "gcp_agent"]
+    assert router.route("list my azure vms").agent == COORDINATOR
+    assert router.stats()["routes"] == {}
+
+
+def test_route_counts_decisions(router):
+    router.route("list my azure vms")
+    router.route("list my azure vms")
+    assert router.stats()["routes"] == {"azure_agent": 2}
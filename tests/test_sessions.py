@@ -0,0 +1,124 @@
+import pytest
+
+from src import sessions
+from src.sessions import Session, SessionStore, fingerprint, to_agent_messages
+
+FIRST_TURN = [("user", "list my vms"), ("assistant", "vm-1, vm-2")]
+
+
+class FakeNode:
+    def __init__(self, messages):
+        self._initial_messages = list(messages)
+
+
+class FakeSwarm:
+    def __init__(self, messages):
+        self.nodes = {"sky_agent": FakeNode(messages)}
+
+
+@pytest.fixture(autouse=True)
+def fake_swarms(monkeypatch):
+    monkeypatch.setattr(sessions, "create_swarm", lambda mcp_tools, messages: FakeSwarm(messages))
+
+
+@pytest.fixture
+def store():
+    return SessionStore(max_sessions=10, ttl_seconds=3600, max_bytes=1 << 20)
+
+
+def texts(messages):
+    return [(message["role"], [part["text"] for part in message["content"]]) for message in messages]
+
+
+def test_fingerprint_ignores_surrounding_whitespace():
+    assert fingerprint([("user", " hi ")]) == fingerprint([("user", "hi")])
+    assert fingerprint([("user", "hi")]) != fingerprint([("assistant", "hi")])
+
+
+def test_to_agent_messages_alternates_roles_starting_with_the_user():
+    messages = [
+        ("system", "be brief"), ("assistant", "hello"), ("user", "a"), ("user", "b"),
+        ("assistant", "c"), ("user", "unanswered"),
+    ]
+    assert texts(to_agent_messages(messages)) == [("user", ["a", "b"]), ("assistant", ["c"])]
+
+
+def test_prefix_sessions_are_registered_on_commit_and_found_by_the_next_turn(store):
+    session = store.resolve(None, [])
+    assert store.stats()["sessions"] == 0
+
+    store.commit(session, [], "list my vms", "vm-1, vm-2")
+
+    assert store.resolve(None, FIRST_TURN) is session
+    assert store.stats()["hits"] == 1
+
+
+def test_conversation_sessions_are_keyed_by_id(store):
+    session = store.resolve("chat-1", [])
+    store.commit(session, [], "list my vms", "vm-1, vm-2")
+    assert store.resolve("chat-1", FIRST_TURN) is session
+    assert store.resolve("chat-2", FIRST_TURN) is not session
+
+
+def test_diverged_history_reseeds_the_session(store):
+    session = store.resolve("chat-1", [])
+    store.commit(session, [], "list my vms", "vm-1, vm-2")
+    edited = [("user", "list my disks"), ("assistant", "disk-1")]
+    assert store.resolve("chat-1", edited) is session
+    assert session.history == edited
+    assert store.stats()["misses"] == 2
+
+
+def test_concurrent_turns_on_the_same_history_branch(store):
+    session = store.resolve(None, [])
+    store.commit(session, [], "list my vms", "vm-1, vm-2")
+    first = store.resolve(None, FIRST_TURN)
+    second = store.resolve(None, FIRST_TURN)
+    store.commit(first, FIRST_TURN, "start vm-1", "started")
+    store.commit(second, FIRST_TURN, "stop vm-2", "stopped")
+
+    started = FIRST_TURN + [("user", "start vm-1"), ("assistant", "started")]
+    stopped = FIRST_TURN + [("user", "stop vm-2"), ("assistant", "stopped")]
+    assert store.resolve(None, started).history == started
+    assert store.resolve(None, stopped).history == stopped
+
+
+def test_pool_is_bounded_by_session_count():
+    store = SessionStore(max_sessions=2, ttl_seconds=3600, max_bytes=1 << 20)
+    for chat in ("a", "b", "c"):
+        store.resolve(chat, [])
+    assert store.stats()["sessions"] == 2
+    assert store.stats()["evictions"] == 1
+
+
+def test_warm_swarm_gets_new_turns_appended():
+    session = Session("conversation:1", FIRST_TURN)
+    swarm = session.acquire({})
+    session.release(swarm)
+    session.record_turn("start vm-1", "started")
+
+    assert session.acquire({}) is swarm
+    assert texts(swarm.nodes["sky_agent"]._initial_messages)[-2:] == [("user", ["start vm-1"]), ("assistant", ["started"])]
+
+
+def test_unanswered_user_turn_is_kept_until_its_reply_arrives():
+    session = Session("conversation:1", FIRST_TURN + [("user", "are you there?")])
+    swarm = session.acquire({})
+    session.release(swarm)
+    assert len(swarm.nodes["sky_agent"]._initial_messages) == 2
+
+    session.record_turn("start vm-1", "started")
+    session.acquire({})
+    assert texts(swarm.nodes["sky_agent"]._initial_messages)[-2:] == [
+        ("user", ["are you there?", "start vm-1"]), ("assistant", ["started"]),
+    ]
+
+
+def test_busy_session_runs_on_a_fresh_swarm():
+    session = Session("conversation:1", FIRST_TURN)
+    warm = session.acquire({})
+    fresh = session.acquire({})
+    assert fresh is not warm
+    session.release(fresh)
+    session.release(warm)
+    assert session.acquire({}) is warm
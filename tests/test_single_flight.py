@@ -0,0 +1,179 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.single_flight import SingleFlight
+
+
+def test_identical_concurrent_calls_share_one_execution():
+    flights = SingleFlight("test")
+    calls = 0
+
+    async def execute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return calls
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", execute) for _ in range(5)))
+
+    assert asyncio.run(main()) == [1] * 5
+    assert calls == 1
+    assert flights.stats() == {"in_flight": 0, "executions": 1, "coalesced": 4, "abandoned": 0}
+
+
+def test_different_keys_and_later_calls_execute_separately():
+    flights = SingleFlight("test")
+
+    async def main():
+        first = await asyncio.gather(flights.do("a", lambda: asyncio.sleep(0, "a")), flights.do("b", lambda: asyncio.sleep(0, "b")))
+        second = await flights.do("a", lambda: asyncio.sleep(0, "again"))
+        return first, second
+
+    assert asyncio.run(main()) == (["a", "b"], "again")
+    assert flights.stats()["executions"] == 3
+
+
+def test_exceptions_reach_every_waiter():
+    flights = SingleFlight("test")
+
+    async def execute():
+        await asyncio.sleep(0.05)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", execute) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_disabled_never_coalesces():
+    flights = SingleFlight("test", enabled=False)
+    calls = 0
+
+    async def execute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(flights.do("key", execute) for _ in range(3)))
+
+    asyncio.run(main())
+    assert calls == 3
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_execution():
+    flights = SingleFlight("test")
+
+    async def main():
+        release = asyncio.Event()
+
+        async def execute():
+            await release.wait()
+            return "done"
+
+        leader = asyncio.ensure_future(flights.do("key", execute))
+        follower = asyncio.ensure_future(flights.do("key", execute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        await asyncio.sleep(0.01)
+        release.set()
+        return await follower
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_execution_is_cancelled_once_every_waiter_is_gone():
+    flights = SingleFlight("test")
+    cancelled = threading.Event()
+
+    async def main():
+        async def execute():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.ensure_future(flights.do("key", execute)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert cancelled.is_set()
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_waiters_on_other_loops_restart_an_execution_abandoned_by_its_loop():
+    flights = SingleFlight("test")
+    started = threading.Event()
+    calls = []
+
+    async def execute():
+        calls.append(threading.current_thread().name)
+        started.set()
+        await asyncio.sleep(0.2)
+        return len(calls)
+
+    async def leader():
+        task = asyncio.ensure_future(flights.do("key", execute))
+        await asyncio.sleep(0.05)
+        # Shut the leader's loop down under the execution, as when its run is torn down
+        for pending in asyncio.all_tasks() - {asyncio.current_task()}:
+            pending.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    thread = threading.Thread(target=lambda: asyncio.run(leader()), name="leader")
+    thread.start()
+    started.wait(5)
+
+    async def follower():
+        return await flights.do("key", execute)
+
+    result = asyncio.run(follower())
+    thread.join()
+    assert result == 2
+    assert calls[0] == "leader" and len(calls) == 2
+    assert flights.stats()["abandoned"] == 1
+
+
+def test_forget_starts_new_executions_for_matching_keys():
+    flights = SingleFlight("test")
+
+    async def main():
+        release = asyncio.Event()
+        results = iter(["stale", "fresh"])
+
+        async def execute():
+            value = next(results)
+            if value == "stale":
+                await release.wait()
+            return value
+
+        first = asyncio.ensure_future(flights.do(("jira", "ISSUE-1"), execute))
+        await asyncio.sleep(0.01)
+        flights.forget(lambda key: key[0] == "jira")
+        second = await flights.do(("jira", "ISSUE-1"), execute)
+        release.set()
+        return await first, second
+
+    assert asyncio.run(main()) == ("stale", "fresh")
+
+
+@pytest.mark.parametrize("waiters", [1, 3])
+def test_stats_count_executions_and_coalesced_calls(waiters):
+    flights = SingleFlight("test")
+
+    async def main():
+        await asyncio.gather(*(flights.do("key", lambda: asyncio.sleep(0.01)) for _ in range(waiters)))
+
+    asyncio.run(main())
+    assert flights.stats()["executions"] == 1
+    assert flights.stats()["coalesced"] == waiters - 1